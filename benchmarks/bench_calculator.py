@@ -0,0 +1,58 @@
+"""
+Benchmark of 'ExpressionCalculator.explore_data' on flat chains of mixed
+operators. Time per operator must stay flat if reduction is linear. Run
+from any directory:
+    python benchmarks/bench_calculator.py
+"""
+import random
+# 'suite' puts repository root into 'sys.path' before 'pycalc' is imported.
+from suite import measure
+from pycalc.tools.calculator import ExpressionCalculator
+from pycalc.tools.parser import ExpressionParser
+
+
+SIZES = (10 ** 3, 10 ** 4, 10 ** 5)
+OPERATORS = ('+', '-', '*', '/', '//', '<', '==')
+
+
+def generate(operators, seed=0):
+    """
+    Create flat chain with requested number of operators.
+    :param operators: int(number of operators).
+    :param seed: int(seed for random generator).
+    :return: str(expression).
+    """
+    rnd = random.Random(seed)
+    parts = ['1.5']
+    for _ in range(operators):
+        parts.append(rnd.choice(OPERATORS))
+        parts.append(str(rnd.randint(1, 3)))
+    return ''.join(parts)
+
+
+def calculate(expression):
+    """
+    :param expression: str(expression).
+    :return: callable calculating already parsed expression.
+    """
+    exp_list = ExpressionParser().parse_input(expression)
+
+    def run():
+        calc = ExpressionCalculator(expression, exp_list)
+        calc.explore_data(calc.exp_list)
+    return run
+
+
+def main():
+    """
+    Print calculation time and time per operator for every size.
+    """
+    print('{:>10} {:>12} {:>14}'.format('operators', 'seconds', 'us per op'))
+    for size in SIZES:
+        seconds = measure(calculate(generate(size)))
+        print('{:>10} {:>12.4f} {:>14.2f}'.format(size, seconds,
+                                                  seconds / size * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+"""
+Benchmark of code generation backend: evaluation of generated function is
+compared with evaluation of tree of nodes and with hand-written Python. Run
+from any directory:
+    python benchmarks/bench_codegen.py
+"""
+import math
+# 'suite' puts repository root into 'sys.path' before 'pycalc' is imported.
+from suite import measure
+from pycalc.tools.codegen import GeneratedExpression
+from pycalc.tools.compiler import compile_expression
+
+
+# Expressions with equivalent hand-written functions.
+CASES = (
+    ('2+3*4-5/2', lambda: 2 + 3 * 4 - 5 / 2),
+    ('x^2 + 2*x*y + y^2', lambda x, y: x ** 2 + 2 * x * y + y ** 2),
+    ('sin(x)*cos(y) + log(x+1)',
+     lambda x, y: math.sin(x) * math.cos(y) + math.log(x + 1)),
+    ('max(x, y, 1) - abs(x-y) // 2', lambda x, y: max(x, y, 1) -
+     abs(x - y) // 2))
+VALUES = {'x': 1.5, 'y': 2.5}
+
+
+def main():
+    """
+    Print time of one evaluation for every backend.
+    """
+    print('{:>30} {:>10} {:>10} {:>10}'.format('expression', 'tree us',
+                                               'codegen us', 'python us'))
+    for expression, native in CASES:
+        compiled = compile_expression(expression)
+        generated = GeneratedExpression(compiled)
+        bindings = {name: VALUES[name] for name in compiled.parameters}
+        args = [VALUES[name] for name in compiled.parameters]
+        print('{:>30} {:>10.3f} {:>10.3f} {:>10.3f}'.format(
+            expression, measure(lambda: compiled.evaluate(**bindings)) * 1e6,
+            measure(lambda: generated.function(*args)) * 1e6,
+            measure(lambda: native(*args)) * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,59 @@
+"""
+Benchmark of parameterized expressions: time of compilation is measured
+separately from time of binding values, and evaluation of many rows is
+compared with formatting values into expression string and compiling it for
+every row. Run from any directory:
+    python benchmarks/bench_parameters.py
+"""
+import random
+import re
+# 'suite' puts repository root into 'sys.path' before 'pycalc' is imported.
+from suite import measure
+from pycalc.tools.compiler import compile_expression
+
+
+EXPRESSION = 'a*sin(x)^2 + b*cos(x) - log(c+1)/(a+b)'
+PARAMETERS = ('a', 'b', 'c', 'x')
+# Expression with placeholders used to substitute values into string.
+TEMPLATE = re.sub(r'\b([abcx])\b', r'{\1}', EXPRESSION)
+ROWS = 10 ** 4
+
+
+def generate(rows, seed=0):
+    """
+    Create rows with values of parameters.
+    :param rows: int(number of rows).
+    :param seed: int(seed for random generator).
+    :return: list of tuples in order of 'PARAMETERS'.
+    """
+    rnd = random.Random(seed)
+    return [tuple(rnd.uniform(1, 10) for _ in PARAMETERS)
+            for _ in range(rows)]
+
+
+def main():
+    """
+    Print time per row for compilation, binding and recompilation.
+    """
+    rows = generate(ROWS)
+    compiled = compile_expression(EXPRESSION)
+
+    def substitute():
+        for row in rows:
+            text = TEMPLATE.format(**dict(zip(PARAMETERS, row)))
+            compile_expression(text, use_cache=False).evaluate()
+
+    cases = (
+        ('compile', lambda: compile_expression(EXPRESSION, use_cache=False)),
+        ('evaluate', lambda: [compiled.evaluate(**dict(zip(PARAMETERS, row)))
+                              for row in rows]),
+        ('evaluate_many', lambda: list(compiled.evaluate_many(rows))),
+        ('substitute', substitute))
+    print('{:>14} {:>12}'.format('case', 'us per row'))
+    for name, func in cases:
+        count = 1 if name == 'compile' else ROWS
+        print('{:>14} {:>12.2f}'.format(name, measure(func) / count * 1e6))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Benchmark of 'ExpressionParser.parse_input' on generated expressions from
+10k to 1M characters. Time per character must stay flat if parsing is
+linear. Run from any directory:
+    python benchmarks/bench_parser.py
+"""
+import random
+# 'suite' puts repository root into 'sys.path' before 'pycalc' is imported.
+from suite import measure
+from pycalc.tools.parser import ExpressionParser
+
+
+SIZES = (10 ** 4, 10 ** 5, 10 ** 6)
+PIECES = ('1.5', '+', '2', '*', '(3-4)', '//', 'sin(5)', '**', 'pow(6, 7)',
+          '-', '-8', '<=', 'pi', '==', '[9+1]')
+
+
+def generate(length, seed=0):
+    """
+    Create expression of approximately requested length out of operands
+    and operators from 'PIECES'.
+    :param length: int(minimal length of expression).
+    :param seed: int(seed for random generator).
+    :return: str(expression).
+    """
+    rnd = random.Random(seed)
+    operands = PIECES[0::2]
+    operators = PIECES[1::2]
+    parts = [rnd.choice(operands)]
+    size = len(parts[0])
+    while size < length:
+        parts.append(rnd.choice(operators))
+        parts.append(rnd.choice(operands))
+        size += len(parts[-1]) + len(parts[-2])
+    return ''.join(parts)
+
+
+def main():
+    """
+    Print parsing time and time per character for every size.
+    """
+    parser = ExpressionParser()
+    print('{:>10} {:>12} {:>14}'.format('chars', 'seconds', 'ns per char'))
+    for size in SIZES:
+        expression = generate(size)
+        seconds = measure(lambda: parser.parse_input(expression))
+        print('{:>10} {:>12.4f} {:>14.1f}'.format(
+            len(expression), seconds, seconds / len(expression) * 1e9))
+
+
+if __name__ == '__main__':
+    main()
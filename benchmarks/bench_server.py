@@ -0,0 +1,84 @@
+"""
+Benchmark of evaluation server: latency of single request per round trip
+and throughput of pipelined requests and concurrent clients. Server runs in
+a thread of this process. Run from any directory:
+    python benchmarks/bench_server.py
+"""
+import asyncio
+import os
+import tempfile
+import threading
+import time
+# 'suite' puts repository root into 'sys.path' before 'pycalc' is imported.
+from suite import measure
+from pycalc.tools.client import connect, query
+from pycalc.tools.server import EvaluationServer
+
+
+EXPRESSIONS = ['sin(pi/{})*{}+2^{}'.format(indx % 7 + 1, indx % 13, indx % 5)
+               for indx in range(10 ** 4)]
+CLIENTS = 8
+
+
+def run_server(path):
+    """
+    Start server in background thread.
+    :param path: str(path to socket file).
+    :return: tuple(event loop, server).
+    """
+    loop = asyncio.new_event_loop()
+    server = EvaluationServer(path)
+    started = threading.Event()
+
+    def run():
+        asyncio.set_event_loop(loop)
+        loop.call_soon(started.set)
+        loop.run_until_complete(server.run())
+
+    threading.Thread(target=run, daemon=True).start()
+    started.wait()
+    while not os.path.exists(path):
+        time.sleep(0.001)
+    return loop, server
+
+
+def send(path, window, clients=1):
+    """
+    Send all expressions from every client and wait for results.
+    :param path: str(path to socket file).
+    :param window: int(number of expressions per round trip).
+    :param clients: int(number of concurrent clients).
+    """
+    def client():
+        with connect(path) as sock:
+            for _ in query(sock, EXPRESSIONS, window):
+                pass
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+
+def main():
+    """
+    Print time per expression for every mode.
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'pycalc.sock')
+        loop, server = run_server(path)
+        send(path, 1024)
+        print('{:>24} {:>12}'.format('mode', 'us per expr'))
+        for name, window, clients in (('round trip per request', 1, 1),
+                                      ('pipelined', 1024, 1),
+                                      ('concurrent pipelined', 1024,
+                                       CLIENTS)):
+            seconds = measure(lambda: send(path, window, clients), 1)
+            print('{:>24} {:>12.2f}'.format(
+                name, seconds / len(EXPRESSIONS) / clients * 1e6))
+        loop.call_soon_threadsafe(server.stop)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,437 @@
+"""
+Benchmark suite of parser, calculator and command line utility on generated
+workloads. Every workload varies one property of expressions: length,
+nesting depth, mix of operators, density of function calls or number of
+custom modules, so results form scaling curves. Workload 'flat' has the same
+tokens as 'depth' without nesting, so their costs per character show whether
+deep nesting is slower. Workload 'grouped' has balanced brackets, it's also
+measured with single-digit edits evaluated incrementally. Results may be
+saved to JSON file and compared with baseline saved earlier, points which
+became slower than baseline by more than threshold are reported as
+regressions and the suite exits with status 1. Repository root is put into
+'sys.path', so the suite and single benchmarks sharing its 'measure' run
+from any directory:
+    python benchmarks/suite.py --save benchmarks/baseline.json
+    python benchmarks/suite.py --baseline benchmarks/baseline.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+from pycalc.main import main as cli_main  # noqa: E402
+from pycalc.tools.calculator import ExpressionCalculator  # noqa: E402
+from pycalc.tools.compiler import EXPRESSION_CACHE  # noqa: E402
+from pycalc.tools.incremental import IncrementalEvaluator  # noqa: E402
+from pycalc.tools.parser import ExpressionParser  # noqa: E402
+
+
+# Version of results file format.
+FORMAT = 1
+# Slowdown relative to baseline reported as regression.
+THRESHOLD = 0.25
+# Minimal duration of single measurement in seconds, fast workloads are run
+# several times in a loop.
+MIN_TIME = 0.05
+
+LENGTHS = (10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5)
+DEPTHS = (10, 100, 1000, 10000)
+DENSITIES = (0.0, 0.25, 0.5, 1.0)
+MODULES = (0, 1, 4, 16)
+# Length of expressions for workloads which don't vary it.
+LENGTH = 10 ** 4
+# Operands are positive and powers are only in 'power' mix, so random
+# expressions don't turn into huge or complex numbers.
+OPERANDS = ('1.5', '2', '3', '(4-1)', '7', '0.5', 'pi', '8')
+CALLS = ('sin(2)', 'pow(2, 3)', 'abs(-3)', 'log(5, 2)', 'sqrt(pi)')
+MIXES = {
+    'additive': (('+', '-'), OPERANDS),
+    'multiplicative': (('*', '/', '//', '%'), OPERANDS),
+    'power': (('^', '**'), ('1.01', '0.99', '1.001')),
+    'comparison': (('<', '<=', '==', '!=', '>=', '>'), OPERANDS),
+    'mixed': (('+', '-', '*', '/', '//', '%', '<', '=='), OPERANDS),
+}
+
+
+def generate(length, operators=MIXES['mixed'][0], operands=OPERANDS,
+             calls=0.0, seed=0):
+    """
+    Create flat expression of approximately requested length.
+    :param length: int(minimal length of expression).
+    :param operators: sequence of operators.
+    :param operands: sequence of operands.
+    :param calls: float(share of operands replaced with function calls).
+    :param seed: int(seed for random generator).
+    :return: str(expression).
+    """
+    rnd = random.Random(seed)
+
+    def operand():
+        if rnd.random() < calls:
+            return rnd.choice(CALLS)
+        return rnd.choice(operands)
+
+    parts = [operand()]
+    size = len(parts[0])
+    while size < length:
+        parts.append(rnd.choice(operators))
+        parts.append(operand())
+        size += len(parts[-1]) + len(parts[-2])
+    return ''.join(parts)
+
+
+def nested(depth):
+    """
+    Create expression with brackets and function calls nested to requested
+    depth.
+    :param depth: int(nesting depth).
+    :return: str(expression).
+    """
+    opening = ''.join('abs(' if indx % 2 else '(' for indx in range(depth))
+    closing = ''.join('+{})'.format(indx % 9 + 1)
+                      for indx in range(depth))
+    return opening + '1' + closing
+
+
+def flat(depth):
+    """
+    Create expression with the same tokens as 'nested' but with every
+    bracket closed at once, so its cost per token may be compared with cost
+    of deep nesting.
+    :param depth: int(number of bracketed operands).
+    :return: str(expression).
+    """
+    return '1' + ''.join('+{}{})'.format('abs(' if indx % 2 else '(',
+                                         indx % 9 + 1)
+                         for indx in range(depth))
+
+
+def grouped(length, width=4, seed=0):
+    """
+    Create sum of operands grouped by brackets into balanced tree, so every
+    level of brackets has at most 'width' operands and depth grows as
+    logarithm of length.
+    :param length: int(minimal length of expression).
+    :param width: int(number of operands or groups in brackets).
+    :param seed: int(seed for random generator).
+    :return: str(expression).
+    """
+    rnd = random.Random(seed)
+    parts = []
+    size = 0
+    while size < length:
+        parts.append(rnd.choice(OPERANDS))
+        size += len(parts[-1]) + width // 2
+    while len(parts) > 1:
+        parts = ['(' + ''.join(rnd.choice('+-') + part if indx else part
+                               for indx, part in
+                               enumerate(parts[start:start + width])) + ')'
+                 for start in range(0, len(parts), width)]
+    return parts[0]
+
+
+def make_modules(directory, count):
+    """
+    Create importable custom modules, expressions call functions of the last
+    one so names are searched through all of them.
+    :param directory: str(path to directory in 'sys.path').
+    :param count: int(number of modules).
+    :return: list with names of modules.
+    """
+    names = []
+    for indx in range(count):
+        name = 'pycalc_bench_{}_{}'.format(os.getpid(), indx)
+        with open(os.path.join(directory, name + '.py'), 'w') as module:
+            module.write('def f{0}(x):\n    return x + {0}\n'.format(indx))
+        names.append(name)
+    return names
+
+
+def module_expression(modules, length=LENGTH):
+    """
+    Create expression calling function of the last custom module.
+    :param modules: list with names of custom modules.
+    :param length: int(minimal length of expression).
+    :return: str(expression).
+    """
+    call = 'f{}(2)'.format(len(modules) - 1) if modules else 'sin(2)'
+    return generate(length, operands=OPERANDS + (call,) * 4, seed=1)
+
+
+def measure(func, repeat=3):
+    """
+    Measure function, fast ones are called in a loop until 'MIN_TIME'
+    passes. Best of several runs is taken. Shared by all benchmarks.
+    :param func: callable without arguments.
+    :param repeat: int(number of runs).
+    :return: float(seconds per call).
+    """
+    loops = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= MIN_TIME:
+            break
+        loops *= 10 if elapsed < MIN_TIME / 10 else 2
+    best = elapsed
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(loops):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best / loops
+
+
+def parser_target(expression, modules=None):
+    """
+    :param expression: str(expression).
+    :param modules: unused, parsing doesn't depend on modules.
+    :return: callable parsing expression.
+    """
+    return lambda: ExpressionParser().parse_input(expression)
+
+
+def calculator_target(expression, modules=None):
+    """
+    :param expression: str(expression).
+    :param modules: list with names of custom modules.
+    :return: callable calculating already parsed expression.
+    """
+    exp_list = ExpressionParser().parse_input(expression)
+
+    def run():
+        calc = ExpressionCalculator(expression, exp_list,
+                                    list(modules) if modules else None)
+        calc.explore_data(calc.exp_list)
+    return run
+
+
+def cli_target(expression, modules=None):
+    """
+    Run 'main' in this process the way command line utility does, cache of
+    compiled expressions is cleared so every run compiles from scratch.
+    Workload which fails with error message instead of result isn't
+    measured.
+    :param expression: str(expression).
+    :param modules: list with names of custom modules.
+    :return: callable running 'main'.
+    """
+    argv = [expression]
+    for module in modules or ():
+        argv.extend(['-m', module])
+
+    def run():
+        EXPRESSION_CACHE.clear()
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            cli_main(argv)
+        return output.getvalue()
+
+    if run().startswith('ERROR'):
+        raise ValueError('Workload fails: {}'.format(run()[:200]))
+    return run
+
+
+def incremental_target(expression, modules=None):
+    """
+    Change one digit in the middle of already evaluated expression, like
+    keystroke in interactive tool, and evaluate it again. Digit is changed
+    back and forth, so every call has the same work.
+    :param expression: str(expression).
+    :param modules: list with names of custom modules.
+    :return: callable evaluating edited expression.
+    """
+    evaluator = IncrementalEvaluator(modules)
+    evaluator.update(expression)
+    position = next(indx for indx in range(len(expression) // 2,
+                                           len(expression))
+                    if expression[indx] in '1234567')
+    digits = [expression[position], '9']
+
+    def run():
+        digits.reverse()
+        return evaluator.edit(position, position + 1, digits[0])
+    return run
+
+
+TARGETS = {
+    'parser': parser_target,
+    'calculator': calculator_target,
+    'cli': cli_target,
+    'incremental': incremental_target,
+}
+# Targets of workloads which don't depend on expression structure.
+COMMON = ('parser', 'calculator', 'cli')
+
+
+def workloads(directory):
+    """
+    Generate all workloads.
+    :param directory: str(path to directory for custom modules).
+    :return: generator of tuples(workload name, unit of x, list of tuples(x,
+             expression, modules), names of targets).
+    """
+    yield 'length', 'chars', [(length, generate(length), None)
+                              for length in LENGTHS], COMMON
+    yield 'depth', 'levels', [(depth, nested(depth), None)
+                              for depth in DEPTHS], COMMON
+    yield 'flat', 'operands', [(depth, flat(depth), None)
+                               for depth in DEPTHS], COMMON
+    yield 'grouped', 'chars', [(length, grouped(length), None)
+                               for length in LENGTHS], tuple(TARGETS)
+    yield 'operators', 'mix', [
+        (name, generate(LENGTH, operators, operands), None)
+        for name, (operators, operands) in MIXES.items()], COMMON
+    yield 'calls', 'share', [(density, generate(LENGTH, calls=density), None)
+                             for density in DENSITIES], COMMON
+    points = []
+    for count in MODULES:
+        modules = make_modules(directory, count)
+        points.append((count, module_expression(modules), modules))
+    yield 'modules', 'modules', points, ('calculator', 'cli')
+
+
+def startup(runs=10):
+    """
+    Measure full start of command line utility in new interpreter.
+    :param runs: int(number of runs).
+    :return: float(best seconds).
+    """
+    command = [sys.executable, '-m', 'pycalc', '1+2']
+    best = float('inf')
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, check=True,
+                       cwd=ROOT)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(only=None, log=print):
+    """
+    Run benchmarks.
+    :param only: str(substring of benchmark names to run) or None for all.
+    :param log: callable printing progress.
+    :return: dict with results in format of results file.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        sys.path.insert(0, directory)
+        try:
+            for workload, unit, points, targets in workloads(directory):
+                for target in targets:
+                    name = '{}.{}'.format(target, workload)
+                    if only is not None and only not in name:
+                        continue
+                    entry = results[name] = {'unit': unit, 'points': []}
+                    for x, expression, modules in points:
+                        seconds = measure(TARGETS[target](expression, modules))
+                        entry['points'].append({
+                            'x': x, 'chars': len(expression),
+                            'seconds': seconds,
+                            'chars_per_second': len(expression) / seconds})
+                        log('{:<24} {:>16} {:>12.6f} s {:>14.0f} chars/s'
+                            .format(name, '{}={}'.format(unit, x), seconds,
+                                    len(expression) / seconds))
+        finally:
+            sys.path.remove(directory)
+    if only is None or only in 'cli.startup':
+        seconds = startup()
+        results['cli.startup'] = {'unit': 'run', 'points': [
+            {'x': 1, 'chars': 3, 'seconds': seconds,
+             'chars_per_second': 3 / seconds}]}
+        log('{:<24} {:>16} {:>12.6f} s'.format('cli.startup', 'run=1',
+                                                 seconds))
+    return {'format': FORMAT, 'python': platform.python_version(),
+            'platform': platform.platform(), 'created': time.time(),
+            'benchmarks': results}
+
+
+def compare(results, baseline, threshold=THRESHOLD):
+    """
+    Compare every point with baseline and find points which became slower
+    than in baseline by more than threshold. Points missing in either file
+    are skipped.
+    :param results: dict with current results.
+    :param baseline: dict with baseline results.
+    :param threshold: float(allowed relative slowdown).
+    :return: list of tuples(benchmark name, x, ratio of current time to
+             baseline one, boolean, True if ratio is above 1 + threshold)
+             for every common point.
+    """
+    ratios = []
+    for name, entry in sorted(results['benchmarks'].items()):
+        base = baseline['benchmarks'].get(name)
+        if base is None:
+            continue
+        base_points = {str(point['x']): point for point in base['points']}
+        for point in entry['points']:
+            base_point = base_points.get(str(point['x']))
+            if base_point is not None:
+                ratio = point['seconds'] / base_point['seconds']
+                ratios.append((name, point['x'], ratio,
+                               ratio > 1 + threshold))
+    return ratios
+
+
+def parse_args(args=None):
+    """
+    :param args: list of command line arguments, 'sys.argv' if None.
+    :return: argparse.Namespace.
+    """
+    parser = argparse.ArgumentParser(description='Benchmark suite of pycalc')
+    parser.add_argument('--only', help='run benchmarks whose names contain '
+                                       'this string, e.g. "parser." or '
+                                       '".depth"')
+    parser.add_argument('--save', metavar='FILE',
+                        help='save results to JSON file')
+    parser.add_argument('--baseline', metavar='FILE',
+                        help='compare results with JSON file')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                        help='allowed relative slowdown, default %(default)s')
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    """
+    Run suite, save results and report regressions.
+    :param args: list of command line arguments, 'sys.argv' if None.
+    :return: int(exit status).
+    """
+    options = parse_args(args)
+    results = run(options.only)
+    if options.save is not None:
+        with open(options.save, 'w') as output:
+            json.dump(results, output, indent=1, sort_keys=True)
+            output.write('\n')
+    if options.baseline is None:
+        return 0
+    with open(options.baseline) as source:
+        baseline = json.load(source)
+    regressions = 0
+    print('\n{:<24} {:>16} {:>10}'.format('benchmark', 'x', 'vs base'))
+    for name, x, ratio, slower in compare(results, baseline,
+                                          options.threshold):
+        regressions += slower
+        print('{:<24} {:>16} {:>9.2f}x{}'.format(
+            name, str(x), ratio, '  REGRESSION' if slower else ''))
+    print('{} regression(s) beyond {:.0%}'.format(regressions,
+                                                  options.threshold))
+    return 1 if regressions > 0 else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,21 @@
+"""
+Pure-python calculator. Expression strings may be compiled once with
+'compile' function and evaluated many times. Tools are imported on first
+access to keep start of command line utility fast.
+"""
+
+
+__version__ = '1.0.1a1'
+
+
+def __getattr__(name):
+    """
+    Import 'compile' function on first access.
+    :param name: str(attribute name).
+    :return: attribute of package.
+    """
+    if name == 'compile':
+        from pycalc.tools.compiler import compile_expression
+        return compile_expression
+    raise AttributeError('module {!r} has no attribute {!r}'.format(__name__,
+                                                                     name))
@@ -0,0 +1,7 @@
+"""
+Allow to run calculator as 'python -m pycalc'.
+"""
+from pycalc.main import main
+
+
+main()
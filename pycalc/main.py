@@ -1,13 +1,15 @@
 """
 Module manages library tools to provide command line interface for the
-calculator. Intended to be called from command line.
+calculator. Intended to be called from command line. Modules are imported
+only when they are needed: the most common call with single expression and
+without options doesn't import 'argparse' at all.
 Contains functions:
 - parse_args;
+- evaluate;
+- remote;
 - main;
 """
-import argparse
-from pycalc.tools.calculator import ExpressionCalculator
-from pycalc.tools.parser import ExpressionParser
+import sys
 from pycalc.tools.exceptions import PyCalcBaseException
 
 
@@ -21,29 +23,136 @@ def parse_args(*args):
     :return: tuple(argparse.Namespace with module names as attributes,
              list with expression string.
     """
+    import argparse
     parser = argparse.ArgumentParser(description='Pure-python command-line '
                                                  'calculator.')
     parser.add_argument('-m', '--use-modules', dest='module', action='append',
                         help='Additional modules to use')
+    parser.add_argument('--batch', metavar='FILE',
+                        help='Evaluate expressions from file line by line, '
+                             '"-" to read standard input')
+    parser.add_argument('--jobs', type=int, default=1, metavar='N',
+                        help='Number of worker processes in batch mode')
+    parser.add_argument('--show-source', action='store_true',
+                        help='Print Python source generated for expression')
+    parser.add_argument('--repl', action='store_true',
+                        help='Start interactive session, results are '
+                             'reused through "_" and "name = expression"')
+    parser.add_argument('--memoize', action='store_true',
+                        help='Keep results of pure functions between '
+                             'expressions in batch mode and interactive '
+                             'session')
+    parser.add_argument('--concurrent', action='store_true',
+                        help='Evaluate arguments of custom functions '
+                             'concurrently on thread pool')
+    parser.add_argument('--profile', action='store_true',
+                        help='Print timings and counters of compilation and '
+                             'evaluation as JSON to standard error')
+    parser.add_argument('--serve', metavar='SOCKET',
+                        help='Run evaluation server on Unix socket')
+    parser.add_argument('--connect', metavar='SOCKET',
+                        help='Send expressions to evaluation server')
+    parser.add_argument('--autostart', action='store_true',
+                        help='Start evaluation server if it isn\'t running')
     args = parser.parse_known_args(*args)
-    if len(args[1]) == 0:
+    if args[0].profile and (args[0].concurrent or args[0].show_source):
+        parser.error('--profile can\'t be combined with --concurrent or '
+                     '--show-source')
+    if len(args[1]) == 0 and args[0].batch is None and \
+            args[0].serve is None and not args[0].repl:
         raise PyCalcBaseException('No expression was provided.')
     return args
 
 
+def _is_plain(argv):
+    """
+    Check if command line consists of single expression without options.
+    Expressions starting with sign of number are not options.
+    :param argv: list of command line arguments.
+    :return: boolean.
+    """
+    if len(argv) != 1:
+        return False
+    arg = argv[0]
+    return not arg.startswith('-') or \
+        not (arg[1:2].isalpha() or arg[1:2] == '-')
+
+
+def evaluate(expression, modules=None, show_source=False, profile=False,
+             concurrent=False):
+    """
+    Compile expression and print result of its evaluation.
+    :param expression: str(expression string).
+    :param modules: list with names of custom modules.
+    :param show_source: boolean, print source generated for expression.
+    :param profile: boolean, print timings and counters to stderr.
+    :param concurrent: boolean, evaluate expensive arguments of calls
+                       concurrently.
+    """
+    if profile:
+        from pycalc.tools.profiler import profile as run_profiled
+        result, report = run_profiled(expression, modules)
+        print(result)
+        print(report.to_json(), file=sys.stderr)
+        return
+    from pycalc.tools.compiler import compile_expression
+    compiled = compile_expression(expression, modules, concurrent=concurrent)
+    if show_source:
+        from pycalc.tools.codegen import GeneratedExpression
+        compiled = GeneratedExpression(compiled)
+        print(compiled.source)
+    print(compiled.evaluate())
+
+
+def remote(options, expressions):
+    """
+    Evaluate expression or batch file on evaluation server and print
+    results.
+    :param options: argparse.Namespace with parsed options.
+    :param expressions: list with expression string.
+    """
+    from pycalc.tools.client import connect, query, remote_evaluator
+    if options.batch is not None:
+        from pycalc.tools.batch import run_batch
+        run_batch(options.batch, evaluate_lines=remote_evaluator(
+            options.connect, options.autostart, options.module))
+        return
+    sock = connect(options.connect, options.autostart, options.module)
+    with sock:
+        print(next(query(sock, expressions[:1])))
+
+
 def main(*args):
     """
-    Orchestrate creation of 'ExpressionParser' and 'ExpressionCalculator'
-    classes and pass created instances parsed arguments.
-    Print results of expression. 
+    Compile expression from parsed arguments and print results of its
+    evaluation. In batch mode evaluate every line of provided file instead,
+    in interactive session every line of standard input.
     :param args: inserted to call from scripts.
     """
     try:
+        argv = args[0] if len(args) > 0 else sys.argv[1:]
+        if _is_plain(argv):
+            evaluate(argv[0])
+            return
         args = parse_args(*args)
-        parser = ExpressionParser()
-        calc = ExpressionCalculator(args[1][0], parser.parse_input(args[1][0]),
-                                    args[0].module)
-        print(calc.explore_data(calc.exp_list))
+        if args[0].serve is not None:
+            from pycalc.tools.server import serve
+            serve(args[0].serve, args[0].module)
+            return
+        if args[0].connect is not None:
+            remote(args[0], args[1])
+            return
+        if args[0].batch is not None:
+            from pycalc.tools.batch import run_batch
+            run_batch(args[0].batch, args[0].module, jobs=args[0].jobs,
+                      memoize=args[0].memoize)
+            return
+        if args[0].repl:
+            from pycalc.tools.repl import run_repl
+            run_repl(args[0].module, args[0].memoize)
+            return
+        evaluate(args[1][0], args[0].module, args[0].show_source,
+                 args[0].profile, args[0].concurrent)
     except PyCalcBaseException as err:
         print(err)
 
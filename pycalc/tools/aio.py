@@ -0,0 +1,257 @@
+"""
+Module contains asyncio interface of the calculator. Compilation and
+evaluation never run in the event loop: they're sent to worker processes
+which are killed when evaluation misses its deadline, or to executor
+provided by user where late evaluations are cancelled. Number of concurrent
+evaluations is limited by semaphore.
+Contains classes:
+- WorkerPool;
+- AsyncEvaluator;
+Contains functions:
+- evaluate;
+"""
+import asyncio
+import multiprocessing
+import os
+import signal
+from pycalc.tools.compiler import compile_expression
+from pycalc.tools.exceptions import PyCalcBaseException, EvaluationTimeout
+
+
+def _evaluate(modules, expression, bindings):
+    """
+    Compile and evaluate expression, used in executors and worker processes.
+    :param modules: tuple with names of custom modules.
+    :param expression: str(expression string).
+    :param bindings: dict with values of parameters.
+    :return: result of expression calculations.
+    """
+    return compile_expression(expression, modules).evaluate(**bindings)
+
+
+def _worker_main(conn, modules):
+    """
+    Loop of worker process: receive expressions and send back results or
+    exceptions until connection is closed.
+    :param conn: multiprocessing.connection.Connection.
+    :param modules: tuple with names of custom modules.
+    """
+    # Interrupts are handled by parent process which kills workers.
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    while True:
+        try:
+            expression, bindings = conn.recv()
+        except EOFError:
+            return
+        try:
+            reply = (True, _evaluate(modules, expression, bindings))
+        except Exception as err:
+            reply = (False, err)
+        try:
+            conn.send(reply)
+        except Exception as err:
+            # Result or exception can't be pickled.
+            conn.send((False, PyCalcBaseException(str(err) or
+                                                  type(err).__name__)))
+
+
+class _Worker:
+    """
+    Worker process with connection to it.
+    """
+    def __init__(self, context, modules):
+        """
+        Start worker process.
+        :param context: multiprocessing context.
+        :param modules: tuple with names of custom modules.
+        """
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_worker_main,
+                                       args=(child, modules), daemon=True)
+        self.process.start()
+        child.close()
+
+    async def call(self, expression, bindings):
+        """
+        Send expression to worker and wait for reply without blocking the
+        event loop. Event loop waits for the beginning of reply, its rest
+        may still be in transfer, so blocking 'recv' runs in default
+        executor.
+        :param expression: str(expression string).
+        :param bindings: dict with values of parameters.
+        :return: tuple(boolean success flag, result or exception).
+        """
+        loop = asyncio.get_running_loop()
+        ready = loop.create_future()
+        self.conn.send((expression, bindings))
+        try:
+            loop.add_reader(self.conn.fileno(), lambda: ready.done() or
+                            ready.set_result(None))
+        except NotImplementedError:
+            # Event loops without readers, e.g. proactor one on Windows.
+            ready.set_result(None)
+        else:
+            try:
+                await ready
+            finally:
+                loop.remove_reader(self.conn.fileno())
+        return await loop.run_in_executor(None, self.conn.recv)
+
+    def kill(self):
+        """
+        Stop worker process immediately.
+        """
+        self.process.kill()
+        self.process.join()
+        self.conn.close()
+
+
+class WorkerPool:
+    """
+    Fixed number of worker processes. Worker which didn't finish in time is
+    killed and replaced with a new one, other workers aren't affected.
+    """
+    def __init__(self, workers=None, modules=None, context=None):
+        """
+        :param workers: int(number of processes), number of CPUs by default.
+        :param modules: iterable with names of custom modules.
+        :param context: multiprocessing context, default one if None.
+        """
+        self.size = workers or os.cpu_count() or 1
+        self.modules = tuple(modules or ())
+        self.context = context or multiprocessing.get_context()
+        self._idle = None
+        self._workers = set()
+
+    def _start(self):
+        """
+        Start all workers on first use inside running event loop.
+        """
+        self._idle = asyncio.Queue()
+        for _ in range(self.size):
+            self._spawn()
+
+    def _spawn(self):
+        """
+        Start new worker and put it to idle ones.
+        """
+        worker = _Worker(self.context, self.modules)
+        self._workers.add(worker)
+        self._idle.put_nowait(worker)
+
+    async def run(self, expression, bindings, timeout=None):
+        """
+        Evaluate expression in idle worker.
+        :param expression: str(expression string).
+        :param bindings: dict with values of parameters.
+        :param timeout: float(seconds) or None to wait forever.
+        :return: result of expression calculations.
+        """
+        if self._idle is None:
+            self._start()
+        worker = await self._idle.get()
+        try:
+            success, result = await asyncio.wait_for(
+                worker.call(expression, bindings), timeout)
+        except BaseException as err:
+            # State of the worker is unknown after timeout, cancellation or
+            # its death, so it's replaced.
+            self._workers.discard(worker)
+            worker.kill()
+            self._spawn()
+            if isinstance(err, asyncio.TimeoutError):
+                raise EvaluationTimeout('Evaluation didn\'t finish in time',
+                                        expression)
+            if isinstance(err, (EOFError, OSError)):
+                raise PyCalcBaseException('Worker process died', expression)
+            raise
+        self._idle.put_nowait(worker)
+        if not success:
+            raise result
+        return result
+
+    def close(self):
+        """
+        Kill all workers.
+        """
+        for worker in self._workers:
+            worker.kill()
+        self._workers.clear()
+        self._idle = None
+
+
+class AsyncEvaluator:
+    """
+    Evaluate expressions from coroutines. Work runs in 'WorkerPool' or in
+    provided 'concurrent.futures' executor, at most 'max_concurrency'
+    expressions are evaluated at once, others wait for their turn.
+    """
+    def __init__(self, modules=None, executor=None, workers=None,
+                 max_concurrency=None, timeout=None):
+        """
+        :param modules: iterable with names of custom modules.
+        :param executor: concurrent.futures.Executor, late evaluations are
+                         only cancelled there. Own 'WorkerPool' is used if
+                         None.
+        :param workers: int(number of processes of own 'WorkerPool').
+        :param max_concurrency: int(maximal number of evaluations at once),
+                                number of workers by default.
+        :param timeout: float(default deadline in seconds) or None.
+        """
+        self.modules = tuple(modules or ())
+        self.executor = executor
+        self.pool = None if executor is not None else \
+            WorkerPool(workers, self.modules)
+        self.max_concurrency = max_concurrency or \
+            (self.pool.size if self.pool is not None else os.cpu_count() or 1)
+        self.timeout = timeout
+        self._semaphore = None
+
+    async def evaluate(self, expression, timeout=None, **bindings):
+        """
+        Evaluate expression without blocking the event loop.
+        :param expression: str(expression string).
+        :param timeout: float(seconds), default deadline of evaluator if
+                        None.
+        :param bindings: values of parameters.
+        :return: result of expression calculations.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            if self.pool is not None:
+                return await self.pool.run(expression, bindings, timeout)
+            loop = asyncio.get_running_loop()
+            future = loop.run_in_executor(self.executor, _evaluate,
+                                          self.modules, expression, bindings)
+            try:
+                return await asyncio.wait_for(future, timeout)
+            except asyncio.TimeoutError:
+                raise EvaluationTimeout('Evaluation didn\'t finish in time',
+                                        expression)
+
+    def close(self):
+        """
+        Kill workers of own pool, provided executor is left as is.
+        """
+        if self.pool is not None:
+            self.pool.close()
+
+
+_default_evaluator = None
+
+
+async def evaluate(expression, timeout=None, **bindings):
+    """
+    Evaluate expression with shared 'AsyncEvaluator' created on first call.
+    Evaluators with custom modules or limits should be created explicitly.
+    :param expression: str(expression string).
+    :param timeout: float(seconds) or None.
+    :param bindings: values of parameters.
+    :return: result of expression calculations.
+    """
+    global _default_evaluator
+    if _default_evaluator is None:
+        _default_evaluator = AsyncEvaluator()
+    return await _default_evaluator.evaluate(expression, timeout, **bindings)
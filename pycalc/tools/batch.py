@@ -0,0 +1,450 @@
+"""
+Module contains tools to evaluate many expressions in one process. Input is
+read line by line and results are written in the same order, so memory use
+doesn't depend on input length. Files are mapped to memory: lines are found
+in the mapping without copying and decoded only when they're evaluated,
+workers of parallel mode get byte ranges of the file instead of lines.
+Contains classes:
+- UndecodableLine;
+- BatchEvaluator;
+- MappedInput;
+Contains functions:
+- decode_line;
+- read_expressions;
+- write_results;
+- chunked;
+- evaluate_parallel;
+- evaluate_mapped;
+- run_batch;
+"""
+import mmap
+import os
+import sys
+from collections import deque
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import islice
+from pycalc.tools.compiler import ExpressionCompiler
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+# Number of results joined together before writing to output stream.
+WRITE_CHUNK = 1024
+# Number of lines sent to worker process at once.
+JOB_CHUNK = 2048
+# Size of byte range of mapped file sent to worker process at once, about
+# the same number of lines.
+JOB_BYTES = 2 ** 16
+
+# Evaluator and mapped input of worker process created once by
+# '_init_worker'.
+_worker_evaluator = None
+_worker_input = None
+
+
+class UndecodableLine(str):
+    """
+    Line of input which isn't valid UTF-8. Its text has replacement
+    characters instead of bad bytes, evaluators reply with error for it.
+    """
+    def __new__(cls, text, number):
+        """
+        :param text: str(line decoded with replacement characters).
+        :param number: int(number of line in input starting from 1).
+        """
+        line = super().__new__(cls, text)
+        line.number = number
+        return line
+
+    def __reduce__(self):
+        """
+        Lines are sent to worker processes with their numbers.
+        """
+        return UndecodableLine, (str(self), self.number)
+
+    @property
+    def message(self):
+        """
+        :return: str(error message for the line).
+        """
+        return PyCalcBaseException('Line {} isn\'t valid UTF-8, pycalc '
+                                   'can\'t read it'.format(
+                                       self.number)).message
+
+
+def decode_line(raw, number):
+    """
+    Decode line of input without stopping on bad bytes.
+    :param raw: bytes of line without line ending.
+    :param number: int(number of line in input starting from 1).
+    :return: str or UndecodableLine.
+    """
+    try:
+        return raw.decode('utf-8')
+    except UnicodeDecodeError:
+        return UndecodableLine(raw.decode('utf-8', 'replace'), number)
+
+
+class BatchEvaluator:
+    """
+    Evaluate expressions one by one reusing single compiler with already
+    imported modules and process-wide cache of compiled expressions.
+    """
+    def __init__(self, modules=None, memoize=False):
+        """
+        :param modules: iterable with names of custom modules.
+        :param memoize: boolean, keep results of pure functions between
+                        expressions.
+        """
+        self.compiler = ExpressionCompiler(modules, memoize=memoize)
+        self.modules = self.compiler.modules
+
+    def evaluate(self, expression):
+        """
+        Evaluate single expression and format its result. Errors are
+        formatted too, so one bad line doesn't stop the batch, even
+        'exit(3)' gets error instead of its result.
+        :param expression: str(expression string).
+        :return: str(result or error message).
+        """
+        if isinstance(expression, UndecodableLine):
+            return expression.message
+        try:
+            compiled = self.compiler.compile_cached(expression)
+            return str(compiled.evaluate())
+        except PyCalcBaseException as err:
+            return err.message
+        except SystemExit:
+            return PyCalcBaseException('Nice try, but the batch goes '
+                                       'on').message
+        except Exception as err:
+            return PyCalcBaseException(str(err) or type(err).__name__).message
+
+    def evaluate_lines(self, lines):
+        """
+        Lazily evaluate every line.
+        :param lines: iterable of expression strings.
+        :return: generator of formatted results.
+        """
+        for line in lines:
+            yield self.evaluate(line)
+
+
+class MappedInput:
+    """
+    Input file mapped to memory. Whole file is never read at once: lines are
+    found by search in the mapping and every line is decoded when its turn
+    comes, pages which were read are dropped by OS when memory is needed.
+    """
+    def __init__(self, path):
+        """
+        :param path: str(path to regular file with expressions in UTF-8).
+        """
+        self.path = path
+        stream = open(path, 'rb')
+        try:
+            # Empty files can't be mapped.
+            self._data = b''
+            if os.fstat(stream.fileno()).st_size > 0:
+                self._data = mmap.mmap(stream.fileno(), 0,
+                                       access=mmap.ACCESS_READ)
+        finally:
+            # Mapping stays valid after file is closed.
+            stream.close()
+        self.size = len(self._data)
+
+    def lines(self, start=0, end=None):
+        """
+        Lazily decode lines of byte range without line endings. Lines which
+        aren't valid UTF-8 become 'UndecodableLine'.
+        :param start: int(offset of the first line).
+        :param end: int(offset after the last line), end of file if None.
+        :return: generator of expression strings.
+        """
+        data = self._data
+        end = self.size if end is None else end
+        position = start
+        while position < end:
+            stop = data.find(b'\n', position, end)
+            if stop < 0:
+                stop = end
+            raw = data[position:stop].rstrip(b'\r')
+            try:
+                line = raw.decode('utf-8')
+            except UnicodeDecodeError:
+                line = decode_line(raw, self.line_number(position))
+            yield line
+            position = stop + 1
+
+    def line_number(self, offset):
+        """
+        Count lines before offset, it's needed only for error messages.
+        :param offset: int(offset of line start).
+        :return: int(number of line starting from 1).
+        """
+        data = self._data
+        return sum(data[indx:min(indx + JOB_BYTES, offset)].count(b'\n')
+                   for indx in range(0, offset, JOB_BYTES)) + 1
+
+    def line_start(self, offset):
+        """
+        :param offset: int(offset in file).
+        :return: int(offset of the first line starting at or after it).
+        """
+        if offset <= 0:
+            return 0
+        stop = self._data.find(b'\n', offset - 1)
+        return self.size if stop < 0 else stop + 1
+
+    def ranges(self, range_size=JOB_BYTES):
+        """
+        Split file into byte ranges of whole lines. Every range is at least
+        'range_size' bytes long except the last one.
+        :param range_size: int(minimal size of range in bytes).
+        :return: generator of tuple(int(start offset), int(end offset)).
+        """
+        start = 0
+        while start < self.size:
+            end = self.line_start(start + max(range_size, 1))
+            yield start, end
+            start = end
+
+    def split(self, parts):
+        """
+        Split file into byte ranges of whole lines for several workers.
+        :param parts: int(maximal number of ranges).
+        :return: list of tuple(int(start offset), int(end offset)).
+        """
+        return list(self.ranges(-(-self.size // parts)))
+
+    def close(self):
+        """
+        Unmap the file.
+        """
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def read_expressions(stream):
+    """
+    Read expressions from stream without loading it whole. Lines of binary
+    stream are decoded one by one, so line which isn't valid UTF-8 becomes
+    'UndecodableLine' instead of stopping the whole batch.
+    :param stream: file-like object opened in text or binary mode.
+    :return: generator of expression strings without line endings.
+    """
+    for number, line in enumerate(stream, 1):
+        if isinstance(line, bytes):
+            yield decode_line(line.rstrip(b'\r\n'), number)
+        else:
+            yield line.rstrip('\r\n')
+
+
+def write_results(results, output):
+    """
+    Write results line by line joining them into bigger chunks to reduce
+    number of writes. Results already received are written even if getting
+    the next one fails.
+    :param results: iterable of strings.
+    :param output: file-like object opened in text mode.
+    """
+    buffer = []
+    try:
+        for result in results:
+            buffer.append(result)
+            if len(buffer) == WRITE_CHUNK:
+                output.write('\n'.join(buffer) + '\n')
+                buffer.clear()
+    finally:
+        if len(buffer) > 0:
+            output.write('\n'.join(buffer) + '\n')
+        output.flush()
+
+
+def chunked(iterable, size):
+    """
+    Split iterable into lists of 'size' items, the last list may be shorter.
+    :param iterable: any iterable.
+    :param size: int(number of items in chunk).
+    :return: generator of lists.
+    """
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while len(chunk) > 0:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def _init_worker(modules, memoize=False, path=None):
+    """
+    Create evaluator once per worker process so modules and cache of
+    compiled expressions stay warm for all chunks.
+    :param modules: tuple with names of custom modules.
+    :param memoize: boolean, keep results of pure functions.
+    :param path: str(path to file mapped by worker) or None.
+    """
+    global _worker_evaluator, _worker_input
+    _worker_evaluator = BatchEvaluator(modules, memoize)
+    if path is not None:
+        _worker_input = MappedInput(path)
+
+
+def _evaluate_chunk(lines):
+    """
+    Evaluate chunk of lines in worker process.
+    :param lines: list of expression strings.
+    :return: list of formatted results.
+    """
+    return [_worker_evaluator.evaluate(line) for line in lines]
+
+
+def _evaluate_range(byte_range):
+    """
+    Evaluate lines of byte range of mapped file in worker process.
+    :param byte_range: tuple(int(start offset), int(end offset)).
+    :return: list of formatted results.
+    """
+    return [_worker_evaluator.evaluate(line)
+            for line in _worker_input.lines(*byte_range)]
+
+
+def _in_order(pool, func, tasks, max_pending):
+    """
+    Submit tasks to pool and yield their results in order of tasks. Next
+    task isn't taken until the oldest one is consumed when 'max_pending'
+    tasks are in flight.
+    :param pool: concurrent.futures.Executor.
+    :param func: callable returning list of results of a task.
+    :param tasks: iterable of arguments of 'func'.
+    :param max_pending: int(maximal number of tasks in flight).
+    :return: generator of results.
+    """
+    pending = deque()
+    for task in tasks:
+        pending.append(pool.submit(func, task))
+        if len(pending) >= max_pending:
+            yield from pending.popleft().result()
+    while len(pending) > 0:
+        yield from pending.popleft().result()
+
+
+def evaluate_parallel(lines, modules=None, jobs=2, chunk_size=JOB_CHUNK,
+                      max_pending=None, memoize=False):
+    """
+    Evaluate lines in pool of worker processes. Lines are sent in chunks and
+    results are yielded in input order. Number of chunks submitted but not
+    yet consumed is limited, so memory stays bounded for any input.
+    :param lines: iterable of expression strings.
+    :param modules: iterable with names of custom modules.
+    :param jobs: int(number of worker processes).
+    :param chunk_size: int(number of lines in one task).
+    :param max_pending: int(maximal number of chunks in flight), twice the
+                        number of workers by default.
+    :param memoize: boolean, keep results of pure functions, every worker
+                    has its own memo.
+    :return: generator of formatted results.
+    """
+    if max_pending is None:
+        max_pending = 2 * jobs
+    with ProcessPoolExecutor(jobs, initializer=_init_worker,
+                             initargs=(tuple(modules or ()),
+                                       memoize)) as pool:
+        yield from _in_order(pool, _evaluate_chunk,
+                             chunked(lines, chunk_size), max_pending)
+
+
+def evaluate_mapped(source, modules=None, jobs=2, range_size=JOB_BYTES,
+                    max_pending=None, memoize=False):
+    """
+    Evaluate mapped file in pool of worker processes. Every worker maps the
+    file itself and gets only byte ranges, so lines are neither decoded nor
+    copied by the parent process. Results are yielded in input order.
+    :param source: MappedInput instance.
+    :param modules: iterable with names of custom modules.
+    :param jobs: int(number of worker processes).
+    :param range_size: int(size of byte range in one task).
+    :param max_pending: int(maximal number of ranges in flight), twice the
+                        number of workers by default.
+    :param memoize: boolean, keep results of pure functions, every worker
+                    has its own memo.
+    :return: generator of formatted results.
+    """
+    if max_pending is None:
+        max_pending = 2 * jobs
+    with ProcessPoolExecutor(jobs, initializer=_init_worker,
+                             initargs=(tuple(modules or ()), memoize,
+                                       source.path)) as pool:
+        yield from _in_order(pool, _evaluate_range,
+                             source.ranges(range_size), max_pending)
+
+
+def _open_stdin():
+    """
+    Open standard input as binary stream with its own file descriptor:
+    'exit()' evaluated in the batch closes 'sys.stdin', but not this stream.
+    :return: file-like object opened in binary mode.
+    """
+    try:
+        fileno = os.dup(sys.stdin.fileno())
+    except (AttributeError, OSError, ValueError):
+        # Replaced standard input without file descriptor.
+        return nullcontext(getattr(sys.stdin, 'buffer', sys.stdin))
+    return open(fileno, 'rb')
+
+
+def run_batch(path, modules=None, output=None, jobs=1, evaluate_lines=None,
+              memoize=False):
+    """
+    Evaluate all expressions from file or standard input and write results
+    to output stream in input order. Regular files are mapped to memory,
+    in parallel mode workers get their byte ranges.
+    :param path: str(path to file) or '-' for standard input.
+    :param modules: iterable with names of custom modules.
+    :param output: file-like object, standard output by default.
+    :param jobs: int(number of worker processes), evaluate in current
+                 process if 1.
+    :param evaluate_lines: callable receiving iterable of lines and
+                           returning iterable of results, replaces local
+                           evaluation.
+    :param memoize: boolean, keep results of pure functions between lines.
+    """
+    output = sys.stdout if output is None else output
+    if path != '-' and os.path.isfile(path):
+        try:
+            source = MappedInput(path)
+        except (OSError, ValueError):
+            raise PyCalcBaseException('Can\'t read expressions from file',
+                                      path)
+        with source:
+            if evaluate_lines is None and jobs > 1:
+                results = evaluate_mapped(source, modules, jobs,
+                                          memoize=memoize)
+            elif evaluate_lines is None:
+                results = BatchEvaluator(modules, memoize).evaluate_lines(
+                    source.lines())
+            else:
+                results = evaluate_lines(source.lines())
+            write_results(results, output)
+        return
+    if evaluate_lines is None and jobs > 1:
+        evaluate_lines = partial(evaluate_parallel, modules=modules, jobs=jobs,
+                                 memoize=memoize)
+    elif evaluate_lines is None:
+        evaluate_lines = BatchEvaluator(modules, memoize).evaluate_lines
+    if path == '-':
+        with _open_stdin() as stream:
+            write_results(evaluate_lines(read_expressions(stream)), output)
+        return
+    try:
+        stream = open(path, 'rb')
+    except OSError:
+        raise PyCalcBaseException('Can\'t read expressions from file', path)
+    with stream:
+        write_results(evaluate_lines(read_expressions(stream)), output)
@@ -0,0 +1,112 @@
+"""
+Module contains bounded LRU cache used to keep compiled expressions between
+calls with the same expression strings.
+Contains classes:
+- CacheStats;
+- ExpressionCache;
+"""
+# 'threading' isn't imported to keep start of command line utility fast.
+from _thread import allocate_lock
+from collections import OrderedDict, namedtuple
+import pycalc.tools.settings as rules
+
+
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'evictions', 'size',
+                                       'memory'])
+
+
+class ExpressionCache:
+    """
+    Thread-safe LRU cache limited both by number of entries and by their
+    approximate memory footprint. Least recently used entries are evicted
+    first when any of limits is exceeded.
+    """
+    def __init__(self, capacity=rules.CACHE_CAPACITY,
+                 memory_limit=rules.CACHE_MEMORY_LIMIT,
+                 sizeof=lambda value: value.footprint()):
+        """
+        :param capacity: int(maximal number of entries).
+        :param memory_limit: int(maximal total size of entries in bytes).
+        :param sizeof: callable returning size of cached value in bytes.
+        """
+        self._entries = OrderedDict()
+        self._lock = allocate_lock()
+        self._sizeof = sizeof
+        self.capacity = capacity
+        self.memory_limit = memory_limit
+        self._memory = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key, factory):
+        """
+        Return cached value for 'key' or create it with 'factory' and store.
+        Values bigger than memory limit are returned but not stored.
+        :param key: hashable key.
+        :param factory: callable without arguments creating value.
+        :return: cached or created value.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return entry[0]
+            self._misses += 1
+        value = factory()
+        size = self._sizeof(value)
+        with self._lock:
+            if key not in self._entries and size <= self.memory_limit:
+                self._entries[key] = (value, size)
+                self._memory += size
+                self._evict()
+        return value
+
+    def configure(self, capacity=None, memory_limit=None):
+        """
+        Change limits of the cache and evict entries which don't fit anymore.
+        :param capacity: int(maximal number of entries) or None to keep.
+        :param memory_limit: int(maximal size in bytes) or None to keep.
+        """
+        with self._lock:
+            if capacity is not None:
+                self.capacity = capacity
+            if memory_limit is not None:
+                self.memory_limit = memory_limit
+            self._evict()
+
+    def _evict(self):
+        """
+        Remove least recently used entries while limits are exceeded. Must be
+        called with acquired lock.
+        """
+        while len(self._entries) > self.capacity or \
+                self._memory > self.memory_limit:
+            _, (_, size) = self._entries.popitem(last=False)
+            self._memory -= size
+            self._evictions += 1
+
+    def stats(self):
+        """
+        Collect counters of the cache.
+        :return: CacheStats instance.
+        """
+        with self._lock:
+            return CacheStats(self._hits, self._misses, self._evictions,
+                              len(self._entries), self._memory)
+
+    def clear(self):
+        """
+        Remove all entries and reset counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._memory = 0
+            self._hits = self._misses = self._evictions = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
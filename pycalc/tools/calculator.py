@@ -3,10 +3,9 @@ Module contains tools for calculations of previously parsed expression strings.
 Contains classes:
 - ExpressionCalculator;
 """
-import string
-from importlib import import_module
 import pycalc.tools.settings as rules
-from pycalc.tools.utils import sorting_function
+from pycalc.tools.symbols import symbol_table
+from pycalc.tools.utils import precedes
 from pycalc.tools.exceptions import PyCalcBaseException
 
 
@@ -32,6 +31,7 @@ class ExpressionCalculator:
             self.custom_module = standard_libs
         else:
             self.custom_module.extend(standard_libs)
+        self.symbols = None
         self.func_stack = []
         self.calc_args = False
 
@@ -59,35 +59,57 @@ class ExpressionCalculator:
 
     def explore_data(self, data):
         """
-        Recursively pass through parsed expression converting strings to Python
-        objects and calculate results at every recursion level.
+        Pass through parsed expression converting strings to Python objects
+        and calculate results at every level of brackets. Nested lists are
+        handled with explicit stack instead of recursion, so depth of
+        brackets is limited only by available memory.
         :param data: list with parsed expression as 'exp_list'.
         :return: int|float|complex results of expression calculations.
         """
-        result_list = []
-        operand = None
-        for item in data:
-            if isinstance(item, list):
-                operand = self.explore_data(item)
-                if len(result_list) > 0:
-                    if result_list[-1] == 'func':
-                        result_list.pop()
-                        try:
-                            if isinstance(operand, list):
-                                operand = self.func_stack.pop()(*operand)
-                            else:
-                                operand = self.func_stack.pop()(operand)
-                        except TypeError:
-                            raise PyCalcBaseException('Your function have '
-                                                      'another signature.')
-            if operand is not None:
-                self._append_result(result_list, operand)
-                operand = None
-            else:
+        stack = [(iter(data), [])]
+        while True:
+            items, result_list = stack[-1]
+            for item in items:
+                if isinstance(item, list):
+                    self._open_nested(result_list)
+                    stack.append((iter(item), []))
+                    break
                 item = self._convert_operator(item)
                 if item is not None:
                     self._append_result(result_list, item)
-        return self.calculate_exp(result_list)
+            else:
+                stack.pop()
+                operand = self.calculate_exp(result_list)
+                if len(stack) == 0:
+                    return operand
+                self._close_nested(stack[-1][1], operand)
+
+    def _open_nested(self, result_list):
+        """
+        Check what precedes expression in brackets before it's explored.
+        Calculator accepts anything, subclasses may reject it.
+        :param result_list: list with converted items of outer level.
+        """
+
+    def _close_nested(self, result_list, operand):
+        """
+        Put result of expression in brackets to outer level. Brackets after
+        function name contain its arguments, the function is called with
+        them.
+        :param result_list: list with converted items of outer level.
+        :param operand: result of expression in brackets.
+        """
+        if len(result_list) > 0 and result_list[-1] == 'func':
+            result_list.pop()
+            try:
+                if isinstance(operand, list):
+                    operand = self.func_stack.pop()(*operand)
+                else:
+                    operand = self.func_stack.pop()(operand)
+            except TypeError:
+                raise PyCalcBaseException('Your function have '
+                                          'another signature.')
+        self._append_result(result_list, operand)
 
     @staticmethod
     def _append_result(result_list, item):
@@ -145,7 +167,7 @@ class ExpressionCalculator:
         item = item.strip()
         if item in rules.MATH_MAP:
             return rules.MATH_MAP[item]
-        elif not any([sym in item for sym in string.ascii_letters]):
+        elif not any([sym.isascii() and sym.isalpha() for sym in item]):
             try:
                 return self._convert_number(item)
             except ValueError:
@@ -164,30 +186,18 @@ class ExpressionCalculator:
 
     def _import_functions(self, item):
         """
-        Import custom and base modules and search for requested name in them.
+        Search for requested name in shared table of custom and base modules.
         Raise exception if name wasn't found in modules.
         :param item: str(Python object name).
         :return: attribute of module with requested name.
         """
-        if isinstance(self.custom_module[0], str):
-            self.custom_module = [import_module(lib) for lib in self.custom_module]
-        for lib in self.custom_module:
-            if item in vars(lib):
-                return getattr(lib, item)
-        raise PyCalcBaseException('Dubious variable found: "{}"'.format(item))
-
-    @staticmethod
-    def _enumerate_list(exp_list):
-        """
-        Created list of mathematical operators and sort them in the right order.
-        During list creation attach do each operator its index in original
-        expression list.
-        :param exp_list: list with Python object from original expression.
-        :return: sorted list with functions corresponding to math operators.
-        """
-        func_list = [item for item in enumerate(exp_list) if isinstance(item[1],
-                                                                        tuple)]
-        return sorted(func_list, key=sorting_function)
+        if self.symbols is None:
+            self.symbols = symbol_table(self.custom_module)
+        try:
+            return self.symbols[item]
+        except KeyError:
+            raise PyCalcBaseException('Dubious variable found: "{}"'.format(
+                item))
 
     def _calc_func_args(self, exp_list):
         """
@@ -206,6 +216,61 @@ class ExpressionCalculator:
                 counter += 1
         return [self.calculate_exp(item) for item in args_exp]
 
+    @staticmethod
+    def _apply_operator(func, left, right):
+        """
+        Apply function of mathematical operator to its operands. Separated
+        from 'calculate_exp' to be redefined by subclasses which build
+        expression structure instead of calculating values.
+        :param func: function from 'settings.MATH_MAP'.
+        :param left: left operand.
+        :param right: right operand.
+        :return: result of operation.
+        """
+        return func(left, right)
+
+    def _reduce_operators(self, exp_list):
+        """
+        Calculate flat list of operands and operators in a single pass with
+        shunting-yard algorithm. Operators with higher priority from
+        'settings.MATH_MAP' are applied first, power is right-associative.
+        :param exp_list: list of Python objects (numbers and operators).
+        :return: result of calculations.
+        """
+        operands = []
+        operators = []
+        expect_operand = True
+        for item in exp_list:
+            is_operator = isinstance(item, tuple)
+            if is_operator == expect_operand:
+                break
+            if is_operator:
+                while len(operators) > 0 and precedes(operators[-1], item):
+                    self._pop_operator(operands, operators)
+                operators.append(item)
+            else:
+                operands.append(item)
+            expect_operand = is_operator
+        else:
+            if not expect_operand:
+                while len(operators) > 0:
+                    self._pop_operator(operands, operators)
+                return operands[0]
+        msg = 'Operand\'s missing in your ' \
+              'expression'
+        raise PyCalcBaseException(msg, self.exp_string)
+
+    def _pop_operator(self, operands, operators):
+        """
+        Apply operator from the top of operators stack to two operands from
+        the top of operands stack and put result back.
+        :param operands: list used as stack of operands.
+        :param operators: list used as stack of operators.
+        """
+        func = operators.pop()[0]
+        right = operands.pop()
+        operands[-1] = self._apply_operator(func, operands[-1], right)
+
     def calculate_exp(self, exp_list):
         """
         Calculate list of Python objects with special format conventions.
@@ -215,19 +280,5 @@ class ExpressionCalculator:
         if 'args' in exp_list:
             exp_list = self._calc_func_args(exp_list)
             self.calc_args = False
-        else:
-            while len(exp_list) != 1:
-                func_list = self._enumerate_list(exp_list)
-                try:
-                    prev = func_list[0][0] - 1
-                    follow = func_list[0][0] + 1
-                    func = func_list[0][1][0]
-                    exp_list[prev:follow+1] = [func(exp_list[prev], exp_list[follow])]
-                except IndexError:
-                    msg = 'Operand\'s missing in your ' \
-                          'expression'
-                    raise PyCalcBaseException(msg, self.exp_string)
-        if isinstance(exp_list, list):
-            if len(exp_list) == 1:
-                return exp_list[0]
-        return exp_list
+            return exp_list
+        return self._reduce_operators(exp_list)
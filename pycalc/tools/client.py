@@ -0,0 +1,199 @@
+"""
+Module contains thin client of evaluation server from 'server.py' module.
+Client uses plain sockets only and doesn't import server tools, so it
+starts fast. Many expressions are sent without waiting for replies, and
+replies are read while expressions are still being sent.
+Contains functions:
+- start_server;
+- connect;
+- check_modules;
+- query;
+- remote_evaluator;
+"""
+import selectors
+import socket
+import subprocess
+import sys
+import time
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+# Maximal number of expressions sent and not answered yet.
+WINDOW = 1024
+# Number of bytes read from server at once.
+READ_CHUNK = 2 ** 16
+# Prefix of line asking which custom modules server runs with, see
+# 'server.py' module.
+MODULES_COMMAND = ':modules '
+# Seconds to wait for automatically started server.
+START_TIMEOUT = 5.0
+
+
+def start_server(path, modules=None):
+    """
+    Start evaluation server in background process detached from current
+    session.
+    :param path: str(path to socket file).
+    :param modules: iterable with names of custom modules.
+    :return: subprocess.Popen instance.
+    """
+    command = [sys.executable, '-m', 'pycalc', '--serve', path]
+    for module in modules or ():
+        command.extend(['-m', module])
+    return subprocess.Popen(command, stdin=subprocess.DEVNULL,
+                            stdout=subprocess.DEVNULL,
+                            stderr=subprocess.DEVNULL, start_new_session=True)
+
+
+def _open(path):
+    """
+    Open connection to server socket.
+    :param path: str(path to socket file).
+    :return: socket.socket.
+    """
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.connect(path)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+def connect(path, autostart=False, modules=None, timeout=START_TIMEOUT):
+    """
+    Connect to evaluation server. Server may be started when nobody listens
+    on the socket. Server must run with the same custom modules.
+    :param path: str(path to socket file).
+    :param autostart: boolean, start server if it isn't running.
+    :param modules: iterable with names of custom modules.
+    :param timeout: float(seconds to wait for started server).
+    :return: socket.socket.
+    """
+    try:
+        sock = _open(path)
+    except (FileNotFoundError, ConnectionRefusedError):
+        if not autostart:
+            raise PyCalcBaseException('Can\'t connect to server', path)
+        sock = None
+    if sock is None:
+        start_server(path, modules)
+        deadline = time.monotonic() + timeout
+        delay = 0.005
+    while sock is None:
+        try:
+            sock = _open(path)
+        except (FileNotFoundError, ConnectionRefusedError):
+            if time.monotonic() > deadline:
+                raise PyCalcBaseException('Server didn\'t start', path)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+    try:
+        check_modules(sock, modules)
+    except BaseException:
+        sock.close()
+        raise
+    return sock
+
+
+def check_modules(sock, modules=None):
+    """
+    Make sure server runs with the same custom modules, otherwise names of
+    expressions would be resolved from other modules.
+    :param sock: connected socket.socket.
+    :param modules: iterable with names of custom modules.
+    """
+    sock.sendall((MODULES_COMMAND + ','.join(modules or ()) +
+                  '\n').encode('utf-8'))
+    reply = b''
+    while not reply.endswith(b'\n'):
+        data = sock.recv(READ_CHUNK)
+        if not data:
+            raise PyCalcBaseException('Server closed connection')
+        reply += data
+    reply = reply[:-1].decode('utf-8')
+    if reply != 'OK':
+        raise PyCalcBaseException(reply[len('ERROR: '):])
+
+
+def query(sock, expressions, window=WINDOW):
+    """
+    Send expressions to server and receive results. Socket is switched to
+    non-blocking mode and replies are read whenever they come, even in the
+    middle of sending, so server never waits for client reading its replies
+    while client waits for server reading requests. Up to 'window'
+    expressions are sent before replies to them are received.
+    :param sock: connected socket.socket.
+    :param expressions: iterable of expression strings.
+    :param window: int(maximal number of expressions without replies).
+    :return: generator of formatted results.
+    """
+    iterator = iter(expressions)
+    outgoing = bytearray()
+    incoming = b''
+    waiting = 0
+    exhausted = False
+    timeout = sock.gettimeout()
+    sock.setblocking(False)
+    try:
+        with selectors.DefaultSelector() as selector:
+            selector.register(sock, selectors.EVENT_READ)
+            while True:
+                while not exhausted and waiting < window:
+                    expression = next(iterator, None)
+                    if expression is None:
+                        exhausted = True
+                        break
+                    # Line breaks would split expression into several
+                    # requests.
+                    outgoing += (expression.replace('\n', ' ') +
+                                 '\n').encode('utf-8')
+                    waiting += 1
+                if waiting == 0:
+                    return
+                events = selectors.EVENT_READ
+                if len(outgoing) > 0:
+                    events |= selectors.EVENT_WRITE
+                selector.modify(sock, events)
+                ready = selector.select(timeout)
+                if len(ready) == 0:
+                    raise PyCalcBaseException('Server didn\'t reply in time')
+                mask = ready[0][1]
+                if mask & selectors.EVENT_WRITE:
+                    try:
+                        del outgoing[:sock.send(outgoing)]
+                    except BlockingIOError:
+                        pass
+                if not mask & selectors.EVENT_READ:
+                    continue
+                try:
+                    data = sock.recv(READ_CHUNK)
+                except BlockingIOError:
+                    continue
+                if not data:
+                    raise PyCalcBaseException('Server closed connection')
+                lines = (incoming + data).split(b'\n')
+                incoming = lines.pop()
+                for line in lines:
+                    waiting -= 1
+                    yield line.decode('utf-8')
+    finally:
+        sock.settimeout(timeout)
+
+
+def remote_evaluator(path, autostart=False, modules=None):
+    """
+    Create function evaluating lines on server, suitable for 'run_batch'.
+    :param path: str(path to socket file).
+    :param autostart: boolean, start server if it isn't running.
+    :param modules: iterable with names of custom modules for new server.
+    :return: callable receiving iterable of lines and returning generator
+             of results.
+    """
+    def evaluate_lines(lines):
+        sock = connect(path, autostart, modules)
+        try:
+            yield from query(sock, lines)
+        finally:
+            sock.close()
+    return evaluate_lines
@@ -0,0 +1,273 @@
+"""
+Module contains backend which turns tree of compiled expression into Python
+source of a function and compiles it with built-in 'compile'. Constants
+which have no literal form and resolved functions are bound into namespace
+of generated function, so evaluation is a single call of native Python code.
+Contains classes:
+- GeneratedExpression;
+Contains functions:
+- generate_source;
+- generate;
+"""
+import math
+import operator as op
+from collections.abc import Mapping
+import pycalc.tools.nodes as nodes
+from pycalc.tools.compiler import compile_expression
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+# Python operators for functions from 'settings.MATH_MAP' with their
+# precedence in Python grammar.
+OPERATOR_SYMBOLS = {op.lt: ('<', 5), op.le: ('<=', 5), op.eq: ('==', 5),
+                    op.ne: ('!=', 5), op.ge: ('>=', 5), op.gt: ('>', 5),
+                    op.add: ('+', 10), op.sub: ('-', 10),
+                    op.mul: ('*', 15), op.truediv: ('/', 15),
+                    op.floordiv: ('//', 15), op.mod: ('%', 15),
+                    op.pow: ('**', 20)}
+COMPARISON = 5
+POWER = 20
+# Precedence of negative number literal, it's placed between '*' and '**'.
+NEGATIVE = 17
+# Precedence of names, literals, calls and lists.
+ATOM = 100
+# Subexpressions deeper than this are moved to temporary variables so
+# Python parser never meets deeply nested source.
+SPILL_DEPTH = 32
+FUNCTION_NAME = '_pycalc_expression'
+
+
+def _literal(value):
+    """
+    Find source representation of constant if it has one.
+    :param value: constant value.
+    :return: str(literal) or None.
+    """
+    if type(value) is int or (type(value) is float and math.isfinite(value)):
+        try:
+            return repr(value)
+        except ValueError:
+            # Integer is too long for conversion to string.
+            return None
+    return None
+
+
+class _SourceBuilder:
+    """
+    Collect lines of generated function and objects bound to its namespace.
+    """
+    def __init__(self, parameters):
+        """
+        :param parameters: tuple with names of parameters.
+        """
+        self.arguments = {name: '_p{}'.format(indx)
+                          for indx, name in enumerate(parameters)}
+        self.namespace = {}
+        self.bound = {}
+        self.lines = []
+
+    def bind(self, prefix, value):
+        """
+        Put object into namespace of generated function once.
+        :param prefix: str(prefix of name).
+        :param value: any Python object.
+        :return: str(name in namespace).
+        """
+        name = self.bound.get(id(value))
+        if name is None:
+            name = '{}{}'.format(prefix, len(self.bound))
+            self.bound[id(value)] = name
+            self.namespace[name] = value
+        return name
+
+    def spill(self, text):
+        """
+        Assign subexpression to temporary variable.
+        :param text: str(source of subexpression).
+        :return: str(name of temporary variable).
+        """
+        name = '_t{}'.format(len(self.lines))
+        self.lines.append('{} = {}'.format(name, text))
+        return name
+
+    def operand(self, fragment, precedence, wrap_equal):
+        """
+        Put fragment into brackets if its operator binds weaker.
+        :param fragment: tuple(source, precedence, depth).
+        :param precedence: int(precedence of enclosing operator).
+        :param wrap_equal: boolean, wrap operator with the same precedence.
+        :return: str(source).
+        """
+        text, inner, _ = fragment
+        if inner < precedence or (wrap_equal and inner == precedence):
+            return '({})'.format(text)
+        return text
+
+    def fragment(self, node, children):
+        """
+        Build source of node out of fragments of its children.
+        :param node: Node.
+        :param children: list of tuples(source, precedence, depth).
+        :return: tuple(source, precedence, depth).
+        """
+        depth = max([child[2] for child in children] or [0]) + 1
+        if isinstance(node, nodes.Constant):
+            text = _literal(node.value)
+            if text is None:
+                return self.bind('_c', node.value), ATOM, 0
+            return text, NEGATIVE if text.startswith('-') else ATOM, 0
+        if isinstance(node, nodes.Variable):
+            return self.arguments[node.name], ATOM, 0
+        if isinstance(node, nodes.Shared):
+            # Shared node has several parents and is always spilled.
+            return children[0]
+        if isinstance(node, nodes.BinaryOp):
+            left, right = children
+            if node.func not in OPERATOR_SYMBOLS:
+                return '{}({}, {})'.format(self.bind('_f', node.func),
+                                           left[0], right[0]), ATOM, depth
+            symbol, precedence = OPERATOR_SYMBOLS[node.func]
+            return '{} {} {}'.format(
+                self.operand(left, precedence, precedence in (COMPARISON,
+                                                              POWER)),
+                symbol,
+                self.operand(right, precedence, precedence != POWER)), \
+                precedence, depth
+        args = ', '.join(child[0] for child in children)
+        if isinstance(node, nodes.Call):
+            return '{}({})'.format(self.bind('_f', node.func), args), \
+                ATOM, depth
+        return '[{}]'.format(args), ATOM, depth
+
+    def build(self, root):
+        """
+        Walk the tree in post-order without recursion and build source of
+        every node. Deep and shared subexpressions are spilled.
+        :param root: Node.
+        :return: str(source of root).
+        """
+        parents = {}
+        for node in nodes.walk(root):
+            for child in node.children():
+                parents[id(child)] = parents.get(id(child), 0) + 1
+        done = {}
+        stack = [(root, False)]
+        while len(stack) > 0:
+            node, expanded = stack.pop()
+            if id(node) in done:
+                continue
+            if not expanded:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children())
+                continue
+            fragment = self.fragment(
+                node, [done[id(child)] for child in node.children()])
+            if fragment[2] > 0 and (fragment[2] >= SPILL_DEPTH or
+                                    parents.get(id(node), 0) > 1):
+                fragment = self.spill(fragment[0]), ATOM, 0
+            done[id(node)] = fragment
+        return done[id(root)][0]
+
+
+def generate_source(compiled):
+    """
+    Generate source of function which calculates compiled expression. The
+    function receives values of parameters as positional arguments.
+    :param compiled: CompiledExpression instance.
+    :return: tuple(str(source), dict(namespace with bound objects)).
+    """
+    builder = _SourceBuilder(compiled.parameters)
+    result = builder.build(compiled.root)
+    lines = ['# {!r}'.format(compiled.expression),
+             'def {}({}):'.format(FUNCTION_NAME, ', '.join(
+                 builder.arguments[name] for name in compiled.parameters))]
+    lines.extend('    ' + line for line in builder.lines)
+    lines.append('    return {}'.format(result))
+    return '\n'.join(lines) + '\n', builder.namespace
+
+
+class GeneratedExpression:
+    """
+    Compiled expression turned into native Python function.
+    """
+    def __init__(self, compiled):
+        """
+        Generate and compile source of the function.
+        :param compiled: CompiledExpression instance.
+        """
+        self.compiled = compiled
+        self.source, namespace = generate_source(compiled)
+        code = compile(self.source,
+                       '<pycalc {!r}>'.format(compiled.expression), 'exec')
+        exec(code, namespace)
+        self.function = namespace[FUNCTION_NAME]
+        # Without calls of functions 'TypeError' comes from operators and
+        # is raised as is, like 'CompiledExpression.evaluate' does.
+        self.calls = any(isinstance(node, nodes.Call)
+                         for node in nodes.walk(compiled.root))
+
+    @property
+    def parameters(self):
+        """
+        :return: tuple with names of parameters.
+        """
+        return self.compiled.parameters
+
+    def evaluate(self, **bindings):
+        """
+        Call generated function with values of parameters.
+        :param bindings: values of parameters.
+        :return: int|float|complex results of expression calculations.
+        """
+        args = []
+        for name in self.compiled.parameters:
+            try:
+                args.append(bindings[name])
+            except KeyError:
+                raise PyCalcBaseException('Value of variable wasn\'t provided',
+                                          name)
+        return self._call(args)
+
+    def evaluate_many(self, rows):
+        """
+        Call generated function for every row of parameters values.
+        :param rows: iterable with mappings from parameter names to values or
+                     sequences of values in order of 'parameters'.
+        :return: generator with results of expression calculations.
+        """
+        parameters = self.compiled.parameters
+        for row in rows:
+            if isinstance(row, Mapping):
+                yield self.evaluate(**row)
+                continue
+            if len(row) != len(parameters):
+                raise PyCalcBaseException('Wrong number of values for '
+                                          'parameters', parameters)
+            yield self._call(row)
+
+    def _call(self, args):
+        """
+        Call generated function. 'TypeError' of expression with calls of
+        functions is reported as wrong signature without evaluating it again,
+        functions may have side effects.
+        :param args: sequence with values of parameters.
+        :return: result of generated function.
+        """
+        try:
+            return self.function(*args)
+        except TypeError:
+            if not self.calls:
+                raise
+            raise PyCalcBaseException('Your function have another signature.')
+
+
+def generate(expression, modules=None, variables=None):
+    """
+    Compile expression into native Python function.
+    :param expression: str(expression string).
+    :param modules: iterable with names of custom modules.
+    :param variables: iterable with names of variables declared in advance.
+    :return: GeneratedExpression instance.
+    """
+    return GeneratedExpression(compile_expression(expression, modules,
+                                                  variables))
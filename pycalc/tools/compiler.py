@@ -0,0 +1,449 @@
+"""
+Module contains tools to compile expression string once into immutable object
+which may be evaluated any number of times. Parsing, conversion of strings to
+Python objects and names resolution happen only during compilation, result is
+kept as flat register program from 'program' module. Names which aren't found
+in modules become parameters of compiled expression and their values are
+bound on every evaluation. When environment variable from
+'settings.DISK_CACHE_ENV' is set, compiled programs are also kept on disk and
+shared by all processes, so repeated calls of command line utility don't
+parse known expressions again.
+Contains classes:
+- ExpressionCompiler;
+- CompiledExpression;
+Contains functions:
+- compile_expression;
+"""
+import os
+import sys
+from collections.abc import Mapping
+from functools import partial
+import pycalc.tools.cost as cost
+import pycalc.tools.nodes as nodes
+from pycalc.tools.cache import ExpressionCache
+from pycalc.tools.calculator import ExpressionCalculator
+import pycalc.tools.memo as memo
+import pycalc.tools.optimizer as optimizer
+import pycalc.tools.settings as rules
+from pycalc.tools.program import assemble
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+class ExpressionCompiler(ExpressionCalculator):
+    """
+    Reuse conversion rules of 'ExpressionCalculator' but instead of
+    calculation of parsed expression build tree of nodes from 'nodes' module.
+    Single instance may compile any number of expressions with the same set
+    of modules, names are resolved through shared 'SymbolTable'.
+    """
+    def __init__(self, custom_module=None, variables=None, optimize=True,
+                 check_cost=True, memoize=False, concurrent=False):
+        """
+        Prepare list of modules the same way as 'ExpressionCalculator' does
+        but without expression which is provided later to 'compile' method.
+        :param custom_module: list of strings with names of custom modules;
+        :param variables: iterable with names of variables which take
+                          precedence over names from modules, they go first
+                          in parameters of compiled expressions;
+        :param optimize: boolean, fold constants and merge identical
+                         subexpressions of compiled expressions;
+        :param check_cost: boolean, reject expressions whose estimated cost
+                           exceeds limits from 'settings';
+        :param memoize: boolean, keep results of calls of pure functions
+                        allowed by 'memo.MEMO' registry;
+        :param concurrent: boolean, evaluate expensive arguments of calls
+                           concurrently on thread pool;
+        """
+        self.exp_string = None
+        self.exp_list = None
+        self.variables = tuple(variables or ())
+        self.parameters = list(self.variables)
+        self.optimize = optimize
+        self.check_cost = check_cost
+        self.memoize = memoize
+        self.concurrent = concurrent
+        self.modules = tuple(custom_module or ())
+        self.custom_module = list(self.modules) + ['math', 'builtins']
+        self.symbols = None
+        self.func_stack = []
+        self.calc_args = False
+
+    def compile(self, exp_string):
+        """
+        Parse expression string and build tree of nodes out of it.
+        :param exp_string: str(expression string).
+        :return: CompiledExpression instance.
+        """
+        self.exp_string = exp_string
+        self.func_stack = []
+        self.parameters = list(self.variables)
+        self.exp_list = self._check_input(self._parse(exp_string))
+        root = self.explore_data(self.exp_list)
+        if isinstance(root, list):
+            for item in root:
+                self._check_node(item)
+            root = nodes.Sequence(root)
+        self._check_node(root)
+        if self.check_cost:
+            # Before optimization which would calculate constant subtrees.
+            self._check_cost(root)
+        stats = None
+        if self.optimize:
+            root, stats = self._optimize(root)
+        if self.memoize:
+            # After optimization which recognizes pure functions themselves.
+            root = memo.memoize_calls(root)
+        if self.concurrent:
+            # The last one, arguments are assembled into separate programs.
+            from pycalc.tools.concurrency import parallelize
+            root = parallelize(root)
+        return CompiledExpression(exp_string, self.modules, root,
+                                  tuple(self.parameters), stats)
+
+    def _parse(self, exp_string):
+        """
+        :param exp_string: str(expression string).
+        :return: list with parsed expression.
+        """
+        # Parser is imported only when expression isn't found in caches.
+        from pycalc.tools.parser import ExpressionParser
+        return ExpressionParser().parse_input(exp_string)
+
+    def _check_cost(self, root):
+        """
+        Reject tree whose estimated cost exceeds limits.
+        :param root: Node.
+        """
+        cost.check(root, self.exp_string)
+
+    def _optimize(self, root):
+        """
+        :param root: Node.
+        :return: tuple(optimized Node, OptimizationStats).
+        """
+        return optimizer.optimize(root)
+
+    def compile_cached(self, exp_string):
+        """
+        Compile expression through process-wide 'EXPRESSION_CACHE'.
+        :param exp_string: str(expression string).
+        :return: CompiledExpression instance.
+        """
+        return EXPRESSION_CACHE.get(
+            _cache_key(exp_string, self.modules, self.variables,
+                       self.optimize, self.check_cost, self.memoize,
+                       self.concurrent),
+            partial(self.compile, exp_string))
+
+    def _check_node(self, item):
+        """
+        Make sure that result of compilation is a node. Functions without
+        arguments leave only 'func' keyword instead.
+        :param item: Node or str keyword.
+        """
+        if not isinstance(item, nodes.Node):
+            raise PyCalcBaseException('Looks like this function misses its '
+                                      'arguments', self.exp_string)
+
+    def _open_nested(self, result_list):
+        """
+        Only functions may be followed by brackets, parameters can't be
+        called.
+        :param result_list: list with converted items of outer level.
+        """
+        if len(result_list) > 0 and \
+                isinstance(result_list[-1], nodes.Variable):
+            raise PyCalcBaseException('Dubious variable found',
+                                      result_list[-1].name)
+
+    def _close_nested(self, result_list, operand):
+        """
+        Put node of expression in brackets to outer level. Function calls
+        become 'Call' nodes instead of being called.
+        :param result_list: list with converted items of outer level.
+        :param operand: Node or list of nodes with function arguments.
+        """
+        if len(result_list) > 0 and result_list[-1] == 'func':
+            result_list.pop()
+            if not isinstance(operand, list):
+                operand = [operand]
+            for arg in operand:
+                self._check_node(arg)
+            operand = nodes.Call(self.func_stack.pop(), operand)
+        self._append_result(result_list, operand)
+
+    def _convert_number(self, num_string):
+        """
+        Wrap converted numbers into 'Constant' nodes. Lists with function
+        arguments are already converted item by item.
+        :param num_string: str(string representation of number of args).
+        :return: Constant or list of function args.
+        """
+        result = super()._convert_number(num_string)
+        if isinstance(result, list):
+            return result
+        return nodes.Constant(result)
+
+    def _import_functions(self, item):
+        """
+        Wrap module constants into 'Constant' nodes, functions are left as is
+        to be collected in 'func_stack'. Declared variables and names which
+        aren't found in modules become 'Variable' nodes and are added to
+        parameters in order of appearance.
+        :param item: str(Python object name).
+        :return: callable, Constant or Variable.
+        """
+        if item in self.variables:
+            return nodes.Variable(item)
+        try:
+            result = super()._import_functions(item)
+        except PyCalcBaseException:
+            if not item.isidentifier():
+                raise
+            if item not in self.parameters:
+                self.parameters.append(item)
+            return nodes.Variable(item)
+        if callable(result):
+            return result
+        return nodes.Constant(result)
+
+    def _apply_operator(self, func, left, right):
+        """
+        Build node for mathematical operator instead of its calculation.
+        :param func: function from 'settings.MATH_MAP'.
+        :param left: left operand.
+        :param right: right operand.
+        :return: BinaryOp node.
+        """
+        if not (isinstance(left, nodes.Node) and
+                isinstance(right, nodes.Node)):
+            raise PyCalcBaseException('Operand\'s missing in your expression',
+                                      self.exp_string)
+        return nodes.BinaryOp(func, left, right)
+
+
+class CompiledExpression:
+    """
+    Immutable result of expression compilation. Holds register program with
+    all names already resolved, only values of parameters are provided on
+    evaluation.
+    """
+    __slots__ = ('_expression', '_modules', '_program', '_parameters',
+                 '_optimization')
+
+    def __init__(self, expression, modules, root, parameters=(),
+                 optimization=None):
+        """
+        :param expression: str(original expression string).
+        :param modules: tuple with names of custom modules.
+        :param root: Node at the top of expression tree, it's assembled into
+                     'Program'.
+        :param parameters: tuple with names of parameters.
+        :param optimization: OptimizationStats or None if tree isn't
+                             optimized.
+        """
+        object.__setattr__(self, '_expression', expression)
+        object.__setattr__(self, '_modules', modules)
+        object.__setattr__(self, '_program', assemble(root))
+        object.__setattr__(self, '_parameters', parameters)
+        object.__setattr__(self, '_optimization', optimization)
+
+    @classmethod
+    def from_program(cls, expression, modules, program, parameters=(),
+                     optimization=None):
+        """
+        Create compiled expression from already assembled program, e.g. read
+        from disk cache.
+        :param expression: str(original expression string).
+        :param modules: tuple with names of custom modules.
+        :param program: Program instance.
+        :param parameters: tuple with names of parameters.
+        :param optimization: OptimizationStats or None if tree isn't
+                             optimized.
+        :return: CompiledExpression instance.
+        """
+        compiled = cls.__new__(cls)
+        for name, value in (('_expression', expression),
+                            ('_modules', modules), ('_program', program),
+                            ('_parameters', parameters),
+                            ('_optimization', optimization)):
+            object.__setattr__(compiled, name, value)
+        return compiled
+
+    def __setattr__(self, name, value):
+        """
+        Forbid any changes of compiled expression.
+        """
+        raise AttributeError('CompiledExpression is immutable')
+
+    def __delattr__(self, name):
+        """
+        Forbid any changes of compiled expression.
+        """
+        raise AttributeError('CompiledExpression is immutable')
+
+    @property
+    def expression(self):
+        """
+        :return: str(original expression string).
+        """
+        return self._expression
+
+    @property
+    def modules(self):
+        """
+        :return: tuple with names of custom modules.
+        """
+        return self._modules
+
+    @property
+    def parameters(self):
+        """
+        :return: tuple with names of parameters: declared variables followed
+                 by free names in order of their appearance.
+        """
+        return self._parameters
+
+    @property
+    def optimization(self):
+        """
+        :return: OptimizationStats with numbers of folded, merged and removed
+                 nodes or None if tree isn't optimized.
+        """
+        return self._optimization
+
+    @property
+    def program(self):
+        """
+        :return: Program which is evaluated.
+        """
+        return self._program
+
+    @property
+    def root(self):
+        """
+        Tree is restored from program on every access, it's meant for tools
+        transforming expression like code generation.
+        :return: Node at the top of expression tree.
+        """
+        return self._program.to_tree()
+
+    def evaluate(self, **bindings):
+        """
+        Calculate value of compiled expression.
+        :param bindings: values of parameters.
+        :return: int|float|complex results of expression calculations.
+        """
+        return self._program.run(bindings)
+
+    def evaluate_many(self, rows):
+        """
+        Calculate compiled expression for every row of parameters values.
+        Parsing and names resolution aren't repeated, only values are bound.
+        :param rows: iterable with mappings from parameter names to values or
+                     sequences of values in order of 'parameters'.
+        :return: generator with results of expression calculations.
+        """
+        run = self._program.run
+        parameters = self._parameters
+        for row in rows:
+            if not isinstance(row, Mapping):
+                if len(row) != len(parameters):
+                    raise PyCalcBaseException('Wrong number of values for '
+                                              'parameters', parameters)
+                row = dict(zip(parameters, row))
+            yield run(row)
+
+    def footprint(self):
+        """
+        Estimate memory used by compiled expression. Functions and modules
+        are shared with other expressions and aren't counted.
+        :return: int(size in bytes).
+        """
+        return sys.getsizeof(self) + sys.getsizeof(self._expression) + \
+            self._program.footprint()
+
+    def __repr__(self):
+        return 'CompiledExpression({!r})'.format(self._expression)
+
+
+EXPRESSION_CACHE = ExpressionCache()
+
+
+def compile_expression(expression, modules=None, variables=None,
+                       use_cache=True, optimize=True, check_cost=True,
+                       memoize=False, concurrent=False):
+    """
+    Compile expression string into 'CompiledExpression'. Results are kept in
+    process-wide 'EXPRESSION_CACHE' keyed by expression string, names of
+    custom modules, names of variables and switches of compilation, and in
+    disk cache if it's switched on.
+    :param expression: str(expression string).
+    :param modules: iterable with names of custom modules.
+    :param variables: iterable with names of variables, order of parameters
+                      starts with them.
+    :param use_cache: boolean, if False always compile from scratch and
+                      don't use disk cache.
+    :param optimize: boolean, if False tree of nodes isn't optimized.
+    :param check_cost: boolean, if False expensive expressions aren't
+                       rejected before evaluation.
+    :param memoize: boolean, if True results of pure functions are kept
+                    between calls.
+    :param concurrent: boolean, if True expensive arguments of calls are
+                       evaluated concurrently on thread pool.
+    :return: CompiledExpression instance.
+    """
+    compiler = partial(ExpressionCompiler, modules, variables, optimize,
+                       check_cost, memoize, concurrent)
+    if not use_cache:
+        return compiler().compile(expression)
+    key = _cache_key(expression, modules, variables, optimize, check_cost,
+                     memoize, concurrent)
+    return EXPRESSION_CACHE.get(
+        key, lambda: _compile_stored(compiler, expression, key))
+
+
+def _compile_stored(compiler, expression, key):
+    """
+    Read compiled expression from disk cache or compile it and store there.
+    Directory of disk cache is read from environment on every call, so it
+    may be changed while process runs.
+    :param compiler: callable creating ExpressionCompiler.
+    :param expression: str(expression string).
+    :param key: tuple from '_cache_key'.
+    :return: CompiledExpression instance.
+    """
+    directory = os.environ.get(rules.DISK_CACHE_ENV)
+    if not directory:
+        return compiler().compile(expression)
+    from pycalc.tools.diskcache import disk_cache
+    cache = disk_cache(directory)
+    modules = key[1]
+    entry = cache.load(key, modules)
+    if entry is not None:
+        program, parameters, stats = entry
+        if stats is not None:
+            stats = optimizer.OptimizationStats(*stats)
+        return CompiledExpression.from_program(expression, modules, program,
+                                               parameters, stats)
+    compiled = compiler().compile(expression)
+    cache.store(key, modules, compiled.program, compiled.parameters,
+                compiled.optimization)
+    return compiled
+
+
+def _cache_key(expression, modules, variables, optimize=True,
+               check_cost=True, memoize=False, concurrent=False):
+    """
+    Create key of 'EXPRESSION_CACHE' entry.
+    :param expression: str(expression string).
+    :param modules: iterable with names of custom modules.
+    :param variables: iterable with names of variables.
+    :param optimize: boolean, optimization switch.
+    :param check_cost: boolean, cost estimation switch.
+    :param memoize: boolean, memoization switch.
+    :param concurrent: boolean, concurrent evaluation switch.
+    :return: hashable tuple.
+    """
+    return expression, tuple(modules or ()), tuple(variables or ()), \
+        bool(optimize), bool(check_cost), bool(memoize), bool(concurrent)
@@ -0,0 +1,182 @@
+"""
+Module contains concurrent evaluation of independent function arguments.
+Custom functions may block on work which doesn't hold the GIL, like table
+lookups or C extensions, so arguments calling them are evaluated on shared
+thread pool at the same time and call of 'f(g(a), h(b), k(c))' takes about
+as long as the slowest argument. Cost of argument is expected time of
+blocking calls in it: functions marked with 'blocking' decorator have their
+own cost, other custom functions cost 'settings.CONCURRENT_CALL_COST' and
+functions of standard modules cost nothing, threads can't speed up work
+holding the GIL. Calls with less than two arguments reaching
+'settings.CONCURRENT_MIN_COST' stay serial.
+Contains classes:
+- ConcurrentCall;
+Contains functions:
+- blocking;
+- call_cost;
+- executor;
+- parallelize;
+"""
+from _thread import allocate_lock
+import pycalc.tools.nodes as nodes
+import pycalc.tools.settings as rules
+from pycalc.tools.memo import MemoizedFunction
+from pycalc.tools.program import assemble
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+# Attribute set by 'blocking' decorator with expected time of call.
+MARK = '__pycalc_cost__'
+# Modules of functions which hold the GIL.
+STANDARD_MODULES = ('math', 'builtins', 'operator', '_operator')
+
+_executor = None
+_executor_lock = allocate_lock()
+
+
+def blocking(func=None, cost=rules.CONCURRENT_CALL_COST):
+    """
+    Mark function of custom module with expected time of its call in
+    microseconds. May be used as '@blocking' or '@blocking(cost=N)', cost 0
+    keeps calls of the function serial.
+    :param func: callable or None.
+    :param cost: float(expected time of call in microseconds).
+    :return: the same callable or decorator.
+    """
+    def mark(target):
+        setattr(target, MARK, cost)
+        return target
+    return mark if func is None else mark(func)
+
+
+def call_cost(func):
+    """
+    Find expected time of function call which may run concurrently.
+    :param func: callable.
+    :return: float(time in microseconds).
+    """
+    if isinstance(func, MemoizedFunction):
+        func = func.func
+    cost = getattr(func, MARK, None)
+    if cost is not None:
+        return cost
+    if getattr(func, '__module__', None) in STANDARD_MODULES:
+        return 0
+    return rules.CONCURRENT_CALL_COST
+
+
+def executor():
+    """
+    Get thread pool shared by all concurrent calls. 'concurrent.futures'
+    is imported on first use only.
+    :return: concurrent.futures.ThreadPoolExecutor instance.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            from concurrent.futures import ThreadPoolExecutor
+            _executor = ThreadPoolExecutor(rules.CONCURRENT_WORKERS,
+                                           thread_name_prefix='pycalc')
+        return _executor
+
+
+class ConcurrentCall:
+    """
+    Callable replacing function whose arguments are evaluated concurrently.
+    Every argument is assembled into its own program, values of parameters
+    they need are passed as arguments of the call. Expensive arguments but
+    the last one go to thread pool, others are evaluated by calling thread.
+    Argument still waiting for free thread when its result is needed is
+    taken back and evaluated by calling thread, so nested concurrent calls
+    never wait for each other and can't deadlock the pool.
+    """
+    __slots__ = ('func', 'programs', 'names', 'forked', '__name__')
+
+    def __init__(self, func, programs, names, forked):
+        """
+        :param func: callable.
+        :param programs: tuple of Program with arguments of the call.
+        :param names: tuple with names of parameters used by arguments.
+        :param forked: tuple with indexes of arguments for thread pool.
+        """
+        self.func = func
+        self.programs = programs
+        self.names = names
+        self.forked = forked
+        self.__name__ = getattr(func, '__name__', repr(func))
+
+    def __call__(self, *values):
+        """
+        Evaluate arguments and call function with them.
+        :param values: values of parameters in order of 'names'.
+        :return: result of function.
+        """
+        env = dict(zip(self.names, values))
+        submit = executor().submit
+        futures = {indx: submit(self.programs[indx].run, env)
+                   for indx in self.forked}
+        try:
+            args = [program.run(env) for indx, program
+                    in enumerate(self.programs) if indx not in futures]
+            for indx in self.forked:
+                future = futures[indx]
+                if future.cancel():
+                    args.insert(indx, self.programs[indx].run(env))
+                else:
+                    args.insert(indx, future.result())
+        finally:
+            for future in futures.values():
+                future.cancel()
+        try:
+            return self.func(*args)
+        except TypeError:
+            raise PyCalcBaseException('Your function have another signature.')
+
+    def __repr__(self):
+        return 'ConcurrentCall({}, forked={})'.format(self.__name__,
+                                                      self.forked)
+
+
+def _parameters(root):
+    """
+    :param root: Node.
+    :return: list with names of parameters used by the tree in order of
+             appearance.
+    """
+    names = []
+    for node in nodes.walk(root):
+        if isinstance(node, nodes.Variable) and node.name not in names:
+            names.append(node.name)
+    return names
+
+
+def parallelize(root, min_cost=rules.CONCURRENT_MIN_COST):
+    """
+    Replace calls with at least two expensive arguments by calls of
+    'ConcurrentCall' evaluating them concurrently. Nested calls are replaced
+    first, so expensive arguments may run concurrent calls too.
+    :param root: Node.
+    :param min_cost: float(minimal cost of argument in microseconds to be
+                     evaluated on thread pool).
+    :return: Node.
+    """
+    def fork(node, children):
+        args = [child for child, _ in children]
+        costs = [cost for _, cost in children]
+        total = sum(costs)
+        if isinstance(node, nodes.Call):
+            total += call_cost(node.func)
+        if isinstance(node, nodes.Call) and \
+                sum(cost >= min_cost for cost in costs) >= 2:
+            expensive = [indx for indx, cost in enumerate(costs)
+                         if cost >= min_cost]
+            names = _parameters(nodes.Sequence(args))
+            call = ConcurrentCall(node.func,
+                                  tuple(assemble(arg) for arg in args),
+                                  tuple(names), tuple(expensive[:-1]))
+            return nodes.Call(call, [nodes.Variable(name)
+                                     for name in names]), total
+        if all(new is old for new, old in zip(args, node.children())):
+            return node, total
+        return node.rebuild(args), total
+    return nodes.transform(root, fork)[0]
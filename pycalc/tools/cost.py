@@ -0,0 +1,534 @@
+"""
+Module contains static estimation of expression cost. Before evaluation the
+tree of nodes is walked once and for every node an upper bound of size of
+its integer result and of work needed to calculate it are derived from the
+operands, so expressions like '9**9**9' or 'factorial(10**6)' are rejected
+instantly instead of hanging the process. Values of parameters and results
+of unknown functions can't be estimated, such nodes are left to run-time
+limits like evaluation deadlines.
+Work is measured in operations on 30-bit digits of Python integers.
+Contains classes:
+- Estimate;
+Contains functions:
+- estimate;
+- check;
+"""
+import builtins
+import math
+import operator as op
+from collections import namedtuple
+import pycalc.tools.nodes as nodes
+import pycalc.tools.settings as rules
+from pycalc.tools.exceptions import CostLimitExceeded
+
+
+# Estimate of a node: 'bits' is upper bound of log2 of absolute value or
+# None if it's unknown, 'sign' is 1 for non-negative values, -1 for negative
+# ones and 0 if it's unknown, 'integer' is True for exact integers, 'cost' is
+# total work of the subtree and 'value' is exact value of small integers
+# and of float constants.
+Estimate = namedtuple('Estimate', ('bits', 'sign', 'integer', 'cost',
+                                   'value'))
+
+# Bits in single digit of Python integer.
+DIGIT_BITS = 30
+# Finite floats are smaller than 2 ** 1024.
+FLOAT_BITS = 1024
+# Integers up to this size are calculated exactly during estimation.
+EXACT_BITS = 64
+# Karatsuba multiplication of n-digit numbers takes about n ** 1.585 steps.
+KARATSUBA = math.log2(3)
+
+
+def _exp2(bits):
+    """
+    Raise 2 to the power without overflow of floats.
+    :param bits: float.
+    :return: float, infinity for huge powers.
+    """
+    return 2.0 ** bits if bits < FLOAT_BITS else math.inf
+
+
+def _words(bits):
+    """
+    :param bits: float(size of integer in bits).
+    :return: float(number of digits).
+    """
+    return max(bits, 0) / DIGIT_BITS + 1
+
+
+def _mul_cost(left, right):
+    """
+    :param left: float(size of first factor in bits).
+    :param right: float(size of second factor in bits).
+    :return: float(cost of multiplication).
+    """
+    small, big = sorted((_words(left), _words(right)))
+    return big * small ** (KARATSUBA - 1)
+
+
+def _integer(bits, sign=0, cost=0):
+    """
+    :param bits: float(upper bound of size in bits).
+    :param sign: int(1, -1 or 0 if unknown).
+    :param cost: float(work of the operation).
+    :return: Estimate of integer.
+    """
+    return Estimate(bits, sign, True, cost, None)
+
+
+def _float(cost=0):
+    """
+    :param cost: float(work of the operation).
+    :return: Estimate of float.
+    """
+    return Estimate(FLOAT_BITS, 0, False, cost, None)
+
+
+def _unknown(cost=0):
+    """
+    :param cost: float(work of the operation).
+    :return: Estimate of value nothing is known about.
+    """
+    return Estimate(None, 0, False, cost, None)
+
+
+def _constant(value):
+    """
+    Estimate value known during compilation.
+    :param value: any Python object.
+    :return: Estimate.
+    """
+    if type(value) in (int, bool):
+        bits = math.log2(abs(value)) if value else -math.inf
+        return Estimate(bits, -1 if value < 0 else 1, True, 0,
+                        value if bits <= EXACT_BITS else None)
+    if type(value) is float and math.isfinite(value):
+        bits = math.log2(abs(value)) if value else -math.inf
+        return Estimate(bits, -1 if value < 0 else 1, False, 0, value)
+    if type(value) is float:
+        return _float()
+    return _unknown()
+
+
+def _numbers(args):
+    """
+    Estimate result of operation with float or unknown operand, operations
+    with floats are cheap and can't produce big integers.
+    :param args: list of Estimate.
+    :return: Estimate.
+    """
+    if any(arg.bits is None for arg in args):
+        return _unknown()
+    return _float(sum(_words(arg.bits) for arg in args if arg.integer))
+
+
+def _integers(args, count=None):
+    """
+    :param args: list of Estimate.
+    :param count: int(required number of arguments) or None if any.
+    :return: True if all arguments are integers of known size.
+    """
+    if count is not None and len(args) != count:
+        return False
+    return all(arg.integer and arg.bits is not None for arg in args)
+
+
+def _add(left, right):
+    """
+    Sum of integers is at most twice bigger than the biggest one.
+    :param left: Estimate.
+    :param right: Estimate.
+    :return: Estimate.
+    """
+    if not _integers([left, right]):
+        return _numbers([left, right])
+    sign = left.sign if left.sign == right.sign else 0
+    bits = max(left.bits, right.bits)
+    return _integer(bits + 1, sign, _words(bits))
+
+
+def _sub(left, right):
+    """
+    Difference of integers is at most twice bigger than the biggest one.
+    :param left: Estimate.
+    :param right: Estimate.
+    :return: Estimate.
+    """
+    if not _integers([left, right]):
+        return _numbers([left, right])
+    sign = left.sign if left.sign == -right.sign else 0
+    bits = max(left.bits, right.bits)
+    return _integer(bits + 1, sign, _words(bits))
+
+
+def _mul(left, right):
+    """
+    Sizes of factors in bits are added.
+    :param left: Estimate.
+    :param right: Estimate.
+    :return: Estimate.
+    """
+    if not _integers([left, right]):
+        return _numbers([left, right])
+    return _integer(left.bits + right.bits, left.sign * right.sign,
+                    _mul_cost(left.bits, right.bits))
+
+
+def _division_cost(left, right):
+    """
+    :param left: Estimate of dividend.
+    :param right: Estimate of divisor.
+    :return: float(cost of division).
+    """
+    if left.bits < right.bits:
+        return _words(left.bits)
+    return _words(left.bits) * _words(right.bits)
+
+
+def _floordiv(left, right):
+    """
+    Quotient isn't bigger than dividend.
+    :param left: Estimate.
+    :param right: Estimate.
+    :return: Estimate.
+    """
+    if not _integers([left, right]):
+        return _numbers([left, right])
+    return _integer(max(left.bits, 0), left.sign * right.sign,
+                    _division_cost(left, right))
+
+
+def _mod(left, right):
+    """
+    Remainder isn't bigger than divisor.
+    :param left: Estimate.
+    :param right: Estimate.
+    :return: Estimate.
+    """
+    if not _integers([left, right]):
+        return _numbers([left, right])
+    bits = right.bits
+    if left.sign == right.sign == 1:
+        bits = min(left.bits, bits)
+    return _integer(bits, right.sign, _division_cost(left, right))
+
+
+def _truediv(left, right):
+    """
+    True division always gives floats.
+    :param left: Estimate.
+    :param right: Estimate.
+    :return: Estimate.
+    """
+    return _numbers([left, right])
+
+
+def _pow(base, exponent):
+    """
+    Size of power is size of base multiplied by exponent.
+    :param base: Estimate.
+    :param exponent: Estimate.
+    :return: Estimate.
+    """
+    if not _integers([base, exponent]):
+        return _numbers([base, exponent])
+    if exponent.sign == -1:
+        # Negative powers of integers are floats.
+        return _float(_words(base.bits))
+    if base.bits <= 0:
+        # Powers of -1, 0 and 1.
+        return _integer(0, 0, 1)
+    bits = base.bits * _exp2(exponent.bits)
+    return _integer(bits, 1 if base.sign == 1 else 0,
+                    _mul_cost(bits, bits))
+
+
+def _compare(left, right):
+    """
+    Comparisons give booleans.
+    :param left: Estimate.
+    :param right: Estimate.
+    :return: Estimate.
+    """
+    if left.bits is None or right.bits is None:
+        return _unknown()
+    return _integer(0, 1, min(_words(left.bits), _words(right.bits)))
+
+
+def _largest(args):
+    """
+    :param args: list of Estimate of integers.
+    :return: float(upper bound of their values).
+    """
+    return max(_exp2(arg.bits) if arg.value is None else abs(arg.value)
+               for arg in args)
+
+
+def _product_range(count, bits):
+    """
+    Estimate product of 'count' integers up to 2 ** bits each, like
+    factorials and permutations.
+    :param count: float(number of factors).
+    :param bits: float(size of the biggest factor in bits).
+    :return: Estimate.
+    """
+    if count <= 1:
+        return _integer(max(bits, 0), 1, 1)
+    size = count * max(bits, 0)
+    # Multiplication of factors costs about twice as much as the last one.
+    return _integer(size, 1, 2 * _mul_cost(size, size))
+
+
+def _factorial(*args):
+    """
+    Factorial of n has about n * log2(n) bits.
+    :param args: Estimates of arguments.
+    :return: Estimate.
+    """
+    if not _integers(args, 1):
+        return _unknown()
+    number = _largest(args)
+    return _product_range(number, math.log2(max(number, 1)))
+
+
+def _comb(*args):
+    """
+    Binomial coefficient of n and k never exceeds 2 ** n nor
+    n ** min(k, n - k).
+    :param args: Estimates of arguments.
+    :return: Estimate.
+    """
+    if not _integers(args, 2):
+        return _unknown()
+    number = _largest(args[:1])
+    if args[0].value is not None and args[1].value is not None:
+        count = max(min(args[1].value, args[0].value - args[1].value), 0)
+    else:
+        # min(k, n - k) is never bigger than n / 2.
+        count = min(_largest(args[1:]), number / 2)
+    bits = math.log2(max(number, 1))
+    if number <= 1 or count * bits < number:
+        return _product_range(count, bits)
+    return _integer(number, 1, 2 * _mul_cost(number, number))
+
+
+def _perm(*args):
+    """
+    Number of permutations of k items out of n never exceeds n ** k.
+    :param args: Estimates of arguments.
+    :return: Estimate.
+    """
+    if not _integers(args, len(args)) or len(args) not in (1, 2):
+        return _unknown()
+    number = _largest(args[:1])
+    count = min(number, _largest(args[1:] or args))
+    return _product_range(count, math.log2(max(number, 1)))
+
+
+def _builtin_pow(*args):
+    """
+    Modular power isn't bigger than modulus.
+    :param args: Estimates of arguments.
+    :return: Estimate.
+    """
+    if len(args) == 2:
+        return _pow(*args)
+    if not _integers(args, 3):
+        return _numbers(args)
+    base, exponent, modulus = args
+    cost = max(exponent.bits, 1) * 2 * _mul_cost(modulus.bits, modulus.bits)
+    return _integer(modulus.bits, modulus.sign,
+                    cost + _division_cost(base, modulus))
+
+
+def _isqrt(*args):
+    """
+    Square root has half of bits of its argument.
+    :param args: Estimates of arguments.
+    :return: Estimate.
+    """
+    if not _integers(args, 1):
+        return _unknown()
+    return _integer(args[0].bits / 2, 1, _mul_cost(args[0].bits,
+                                                   args[0].bits))
+
+
+def _abs(*args):
+    """
+    Absolute value has the same size.
+    :param args: Estimates of arguments.
+    :return: Estimate.
+    """
+    if len(args) != 1 or args[0].bits is None:
+        return _unknown()
+    return args[0]._replace(sign=1, cost=_words(args[0].bits), value=None)
+
+
+def _to_integer(*args):
+    """
+    Integers are kept, float constants become integers of about the same
+    size. Size of other floats is unknown, so is size of their integers.
+    :param args: Estimates of arguments.
+    :return: Estimate.
+    """
+    if len(args) != 1 or args[0].bits is None:
+        return _unknown()
+    if args[0].integer:
+        return args[0]._replace(cost=_words(args[0].bits), value=None)
+    if args[0].value is None:
+        return _unknown(1)
+    bits = math.ceil(args[0].bits) + 1 if args[0].value else 0
+    return _integer(bits, 0, 1)
+
+
+def _to_float(*args):
+    """
+    Conversions to float are cheap.
+    :param args: Estimates of arguments.
+    :return: Estimate.
+    """
+    return _numbers(args)
+
+
+def _gcd(*args):
+    """
+    Greatest common divisor isn't bigger than the biggest argument.
+    :param args: Estimates of arguments.
+    :return: Estimate.
+    """
+    if not _integers(args):
+        return _unknown()
+    bits = max((arg.bits for arg in args), default=0)
+    return _integer(bits, 1, sum(_words(arg.bits) * _words(bits)
+                                 for arg in args))
+
+
+def _lcm(*args):
+    """
+    Least common multiple isn't bigger than product of arguments.
+    :param args: Estimates of arguments.
+    :return: Estimate.
+    """
+    if not _integers(args):
+        return _unknown()
+    bits = sum(max(arg.bits, 0) for arg in args)
+    return _integer(bits, 1, sum(_words(arg.bits) * _words(bits)
+                                 for arg in args))
+
+
+def _extreme(*args):
+    """
+    Minimum and maximum aren't bigger than the biggest argument.
+    :param args: Estimates of arguments.
+    :return: Estimate.
+    """
+    if len(args) == 0 or not all(arg.bits is not None for arg in args):
+        return _unknown()
+    signs = set(arg.sign for arg in args)
+    return Estimate(max(arg.bits for arg in args),
+                    signs.pop() if len(signs) == 1 else 0,
+                    all(arg.integer for arg in args),
+                    sum(_words(arg.bits) for arg in args), None)
+
+
+# Rules of estimation for operators and functions, they receive estimates
+# of operands and return estimate of result with cost of the operation only.
+RULES = {
+    op.add: _add,
+    op.sub: _sub,
+    op.mul: _mul,
+    op.floordiv: _floordiv,
+    op.mod: _mod,
+    op.truediv: _truediv,
+    op.pow: _pow,
+    op.lt: _compare,
+    op.le: _compare,
+    op.eq: _compare,
+    op.ne: _compare,
+    op.ge: _compare,
+    op.gt: _compare,
+    math.factorial: _factorial,
+    math.comb: _comb,
+    math.perm: _perm,
+    math.isqrt: _isqrt,
+    math.gcd: _gcd,
+    math.lcm: _lcm,
+    math.floor: _to_integer,
+    math.ceil: _to_integer,
+    math.trunc: _to_integer,
+    math.pow: _to_float,
+    builtins.pow: _builtin_pow,
+    builtins.abs: _abs,
+    builtins.int: _to_integer,
+    builtins.round: _to_integer,
+    builtins.float: _to_float,
+    builtins.min: _extreme,
+    builtins.max: _extreme,
+}
+
+
+def _estimate_node(node, children):
+    """
+    Estimate single node out of estimates of its children.
+    :param node: Node.
+    :param children: list of Estimate.
+    :return: Estimate.
+    """
+    if isinstance(node, nodes.Constant):
+        return _constant(node.value)
+    if isinstance(node, nodes.Shared):
+        return children[0]
+    total = sum(child.cost for child in children)
+    rule = None
+    if isinstance(node, (nodes.BinaryOp, nodes.Call)):
+        rule = RULES.get(node.func)
+    if rule is None:
+        # Parameters, sequences and unknown functions.
+        return _unknown(total)
+    result = rule(*children)
+    result = result._replace(cost=result.cost + total)
+    if result.integer and result.bits <= EXACT_BITS and \
+            all(child.value is not None for child in children):
+        try:
+            value = node.func(*[child.value for child in children])
+        except Exception:
+            return result
+        return _constant(value)._replace(cost=result.cost)
+    return result
+
+
+def estimate(root):
+    """
+    Estimate size of result and work of evaluation of expression tree.
+    :param root: Node.
+    :return: Estimate of root node.
+    """
+    return nodes.transform(root, _estimate_node)
+
+
+def check(root, expression=None, max_bits=None, max_cost=None):
+    """
+    Estimate expression tree and reject it if any of its nodes exceeds the
+    limits. Nodes whose size or cost can't be estimated are accepted.
+    :param root: Node.
+    :param expression: str(expression string) for error message.
+    :param max_bits: float(maximal size of integer in bits),
+                     'settings.MAX_RESULT_BITS' if None.
+    :param max_cost: float(maximal work), 'settings.MAX_COST' if None.
+    :return: Estimate of root node.
+    """
+    max_bits = rules.MAX_RESULT_BITS if max_bits is None else max_bits
+    max_cost = rules.MAX_COST if max_cost is None else max_cost
+
+    def limit(node, children):
+        result = _estimate_node(node, children)
+        if result.bits is not None and result.bits > max_bits:
+            raise CostLimitExceeded('Numbers in this expression won\'t fit '
+                                    'anywhere', expression)
+        if result.cost > max_cost:
+            raise CostLimitExceeded('Universe may end before this '
+                                    'expression is calculated', expression)
+        return result
+
+    return nodes.transform(root, limit)
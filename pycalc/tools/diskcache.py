@@ -0,0 +1,388 @@
+"""
+Module contains persistent cache of compiled expressions shared by all
+processes using the same directory. Every entry is a file named by hash of
+pycalc version, expression string, names of modules and switches of
+compilation. File holds compact binary form of register program: constants,
+names of parameters and instructions with functions stored as names of
+modules and attributes, so nothing but numbers, strings and known functions
+is ever restored from it. Files are read through memory mapping and written
+to temporary file which is renamed over the entry, so readers never see
+partial entries. Total size of entries is limited, the least recently used
+ones are removed first.
+Contains classes:
+- DiskCache;
+Contains functions:
+- encode;
+- decode;
+- disk_cache;
+"""
+import mmap
+import os
+import struct
+import sys
+# 'tempfile' isn't imported and 'hashlib' is imported by 'DiskCache.path'
+# only to keep start of command line utility fast without disk cache, their
+# imports take longer than evaluation.
+from _thread import allocate_lock, get_ident
+import pycalc
+import pycalc.tools.settings as rules
+from pycalc.tools.memo import MEMO, MemoizedFunction
+from pycalc.tools.program import Program
+from pycalc.tools.symbols import import_module
+
+
+MAGIC = b'PYCC'
+FORMAT = 1
+SUFFIX = '.pcc'
+# Modules of functions which may be stored besides custom ones, operators
+# of 'settings.MATH_MAP' come from '_operator'.
+STANDARD_MODULES = ('math', 'builtins', '_operator')
+
+# Tags of stored values.
+_NONE = ord('N')
+_TRUE = ord('T')
+_FALSE = ord('F')
+_INT = ord('I')
+_LONG = ord('L')
+_FLOAT = ord('D')
+_COMPLEX = ord('C')
+_STR = ord('S')
+_TUPLE = ord('U')
+_FUNC = ord('R')
+_MEMOIZED = ord('M')
+
+_INT64 = struct.Struct('<q')
+_SIZE = struct.Struct('<I')
+_DOUBLE = struct.Struct('<d')
+_DOUBLES = struct.Struct('<dd')
+
+
+def _reference(func, modules):
+    """
+    Find name of module and attribute by which function is imported again.
+    :param func: callable.
+    :param modules: tuple with names of modules allowed in references.
+    :return: tuple(str(module name), str(attribute name)).
+    """
+    module = getattr(func, '__module__', None)
+    name = getattr(func, '__name__', None)
+    if module in modules and \
+            getattr(sys.modules.get(module), str(name), None) is func:
+        return module, name
+    for module in modules:
+        for key, value in vars(sys.modules.get(module, object)).items():
+            if value is func:
+                return module, key
+    raise TypeError('Function can\'t be stored: {!r}'.format(func))
+
+
+def _encode_value(value, modules, out):
+    """
+    Append tagged binary form of value.
+    :param value: None, bool, int, float, complex, str, tuple or function.
+    :param modules: tuple with names of modules allowed in references.
+    :param out: bytearray.
+    """
+    kind = type(value)
+    if value is None:
+        out.append(_NONE)
+    elif kind is bool:
+        out.append(_TRUE if value else _FALSE)
+    elif kind is int and -2 ** 63 <= value < 2 ** 63:
+        out.append(_INT)
+        out += _INT64.pack(value)
+    elif kind is int:
+        data = value.to_bytes(value.bit_length() // 8 + 1, 'little',
+                              signed=True)
+        out.append(_LONG)
+        out += _SIZE.pack(len(data)) + data
+    elif kind is float:
+        out.append(_FLOAT)
+        out += _DOUBLE.pack(value)
+    elif kind is complex:
+        out.append(_COMPLEX)
+        out += _DOUBLES.pack(value.real, value.imag)
+    elif kind is str:
+        data = value.encode('utf-8')
+        out.append(_STR)
+        out += _SIZE.pack(len(data)) + data
+    elif kind is tuple:
+        out.append(_TUPLE)
+        out += _SIZE.pack(len(value))
+        for item in value:
+            _encode_value(item, modules, out)
+    elif callable(value):
+        if isinstance(value, MemoizedFunction):
+            out.append(_MEMOIZED)
+            value = value.func
+        else:
+            out.append(_FUNC)
+        for name in _reference(value, modules):
+            _encode_value(name, modules, out)
+    else:
+        raise TypeError('Value can\'t be stored: {!r}'.format(value))
+
+
+def encode(key, program, parameters, optimization, modules):
+    """
+    Create binary form of compiled expression.
+    :param key: str(description of entry checked on load).
+    :param program: Program instance.
+    :param parameters: tuple with names of parameters.
+    :param optimization: tuple with optimization counters or None.
+    :param modules: tuple with names of custom modules.
+    :return: bytes.
+    """
+    out = bytearray(MAGIC)
+    out.append(FORMAT)
+    entry = (key, parameters, optimization, program.constants,
+             program.names, program.code, program.result)
+    _encode_value(entry, tuple(modules) + STANDARD_MODULES, out)
+    return bytes(out)
+
+
+def _decode_value(data, offset, modules):
+    """
+    Read tagged value.
+    :param data: bytes or mmap with binary form.
+    :param offset: int(offset of tag).
+    :param modules: tuple with names of modules allowed in references.
+    :return: tuple(value, int(offset after value)).
+    """
+    tag = data[offset]
+    offset += 1
+    if tag == _INT:
+        return _INT64.unpack_from(data, offset)[0], offset + _INT64.size
+    if tag == _TUPLE:
+        size, = _SIZE.unpack_from(data, offset)
+        offset += _SIZE.size
+        items = []
+        for _ in range(size):
+            item, offset = _decode_value(data, offset, modules)
+            items.append(item)
+        return tuple(items), offset
+    if tag == _STR or tag == _LONG:
+        size, = _SIZE.unpack_from(data, offset)
+        start = offset + _SIZE.size
+        raw = data[start:start + size]
+        if len(raw) != size:
+            raise ValueError('Entry is truncated')
+        if tag == _STR:
+            return raw.decode('utf-8'), start + size
+        return int.from_bytes(raw, 'little', signed=True), start + size
+    if tag == _FLOAT:
+        return _DOUBLE.unpack_from(data, offset)[0], offset + _DOUBLE.size
+    if tag == _COMPLEX:
+        return complex(*_DOUBLES.unpack_from(data, offset)), \
+            offset + _DOUBLES.size
+    if tag == _FUNC or tag == _MEMOIZED:
+        module, offset = _decode_value(data, offset, modules)
+        name, offset = _decode_value(data, offset, modules)
+        if module not in modules:
+            raise ValueError('Module isn\'t allowed: {!r}'.format(module))
+        func = getattr(import_module(module), name)
+        if tag == _MEMOIZED:
+            func = MEMO.wrap(func)
+        return func, offset
+    if tag == _NONE:
+        return None, offset
+    if tag == _TRUE or tag == _FALSE:
+        return tag == _TRUE, offset
+    raise ValueError('Unknown tag: {!r}'.format(tag))
+
+
+def decode(data, modules):
+    """
+    Restore compiled expression from binary form.
+    :param data: bytes or mmap.
+    :param modules: tuple with names of custom modules.
+    :return: tuple(str(description of entry), Program, tuple with names of
+             parameters, tuple with optimization counters or None).
+    """
+    if data[:len(MAGIC)] != MAGIC or data[len(MAGIC)] != FORMAT:
+        raise ValueError('Unknown format of entry')
+    entry, _ = _decode_value(data, len(MAGIC) + 1,
+                             tuple(modules) + STANDARD_MODULES)
+    key, parameters, optimization, constants, names, code, result = entry
+    return key, Program(constants, names, code, result), parameters, \
+        optimization
+
+
+class DiskCache:
+    """
+    Directory with entries of compiled expressions. Entries which can't be
+    read are treated as missing and removed, any errors of file system are
+    ignored, so broken cache only makes compilation slower.
+    """
+    def __init__(self, directory, size_limit=rules.DISK_CACHE_SIZE,
+                 evict_every=rules.DISK_CACHE_EVICT_EVERY):
+        """
+        :param directory: str(path to directory of entries).
+        :param size_limit: int(maximal total size of entries in bytes).
+        :param evict_every: int(average number of stores between checks of
+                            total size), size is checked by chosen entries
+                            so concurrent processes don't scan directory on
+                            every store.
+        """
+        self.directory = directory
+        self.size_limit = size_limit
+        self.evict_every = evict_every
+
+    @staticmethod
+    def describe(key):
+        """
+        :param key: tuple with expression, names of modules, names of
+                    variables and switches of compilation.
+        :return: str(description of entry including pycalc version).
+        """
+        return repr((pycalc.__version__,) + tuple(key))
+
+    def path(self, key):
+        """
+        :param key: tuple with expression, names of modules, names of
+                    variables and switches of compilation.
+        :return: str(path to file of entry).
+        """
+        from hashlib import blake2b
+        digest = blake2b(self.describe(key).encode('utf-8', 'surrogatepass'),
+                         digest_size=20).hexdigest()
+        return os.path.join(self.directory, digest + SUFFIX)
+
+    def load(self, key, modules):
+        """
+        Read entry through memory mapping. Entry is touched, so it becomes
+        the most recently used one.
+        :param key: tuple with expression, names of modules, names of
+                    variables and switches of compilation.
+        :param modules: tuple with names of custom modules.
+        :return: tuple(Program, tuple with names of parameters, tuple with
+                 optimization counters or None) or None if entry is missing.
+        """
+        path = self.path(key)
+        try:
+            with open(path, 'rb') as stream:
+                with mmap.mmap(stream.fileno(), 0,
+                               access=mmap.ACCESS_READ) as data:
+                    description, program, parameters, optimization = \
+                        decode(data, modules)
+            if description != self.describe(key):
+                raise ValueError('Entry of another expression')
+            os.utime(path)
+        except OSError:
+            return None
+        except (ValueError, TypeError, LookupError, AttributeError,
+                ImportError, struct.error):
+            self._remove(path)
+            return None
+        return program, parameters, optimization
+
+    def store(self, key, modules, program, parameters, optimization):
+        """
+        Write entry atomically: contents go to temporary file which replaces
+        entry at once. Programs with values or functions which can't be
+        stored aren't written.
+        :param key: tuple with expression, names of modules, names of
+                    variables and switches of compilation.
+        :param modules: tuple with names of custom modules.
+        :param program: Program instance.
+        :param parameters: tuple with names of parameters.
+        :param optimization: tuple with optimization counters or None.
+        :return: boolean, True if entry was written.
+        """
+        try:
+            data = encode(self.describe(key), program, parameters,
+                          None if optimization is None else
+                          tuple(optimization), modules)
+        except TypeError:
+            return False
+        path = self.path(key)
+        temporary = '{}.{}-{}.tmp'.format(path, os.getpid(), get_ident())
+        try:
+            os.makedirs(self.directory, 0o700, exist_ok=True)
+            with open(temporary, 'xb') as stream:
+                stream.write(data)
+            os.replace(temporary, path)
+        except OSError:
+            self._remove(temporary)
+            return False
+        if int(path[-len(SUFFIX) - 2:-len(SUFFIX)], 16) % \
+                self.evict_every == 0:
+            self.evict()
+        return True
+
+    def evict(self):
+        """
+        Remove the least recently used entries until their total size fits
+        the limit.
+        """
+        entries = []
+        try:
+            with os.scandir(self.directory) as items:
+                for item in items:
+                    if item.name.endswith(SUFFIX):
+                        info = item.stat()
+                        entries.append((info.st_mtime, info.st_size,
+                                        item.path))
+        except OSError:
+            return
+        total = sum(size for _, size, _ in entries)
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.size_limit:
+                break
+            self._remove(path)
+            total -= size
+
+    def size(self):
+        """
+        :return: int(total size of entries in bytes).
+        """
+        try:
+            with os.scandir(self.directory) as items:
+                return sum(item.stat().st_size for item in items
+                           if item.name.endswith(SUFFIX))
+        except OSError:
+            return 0
+
+    def clear(self):
+        """
+        Remove all entries.
+        """
+        try:
+            with os.scandir(self.directory) as items:
+                paths = [item.path for item in items
+                         if item.name.endswith(SUFFIX)]
+        except OSError:
+            return
+        for path in paths:
+            self._remove(path)
+
+    @staticmethod
+    def _remove(path):
+        """
+        Remove file ignoring errors, other process may have removed it.
+        :param path: str(path to file).
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+    def __repr__(self):
+        return 'DiskCache({!r})'.format(self.directory)
+
+
+_caches = {}
+_caches_lock = allocate_lock()
+
+
+def disk_cache(directory):
+    """
+    Get cache shared by all users of the same directory.
+    :param directory: str(path to directory of entries).
+    :return: DiskCache instance.
+    """
+    with _caches_lock:
+        if directory not in _caches:
+            _caches[directory] = DiskCache(directory)
+        return _caches[directory]
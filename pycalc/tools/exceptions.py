@@ -1,6 +1,6 @@
 """
 This module defines base exception class for all exceptions used in
-'pycalc' utility.
+'pycalc' utility and its subclasses.
 """
 
 
@@ -21,3 +21,35 @@ class PyCalcBaseException(Exception):
             message = ': '.join((message, f'"{expression}"'))
         self.message = 'ERROR: {}'.format(message)
         super().__init__(self.message)
+
+    def __reduce__(self):
+        """
+        Keep formatted message when exception is pickled to be passed to
+        another process.
+        """
+        return _restore, (type(self), self.message)
+
+
+class EvaluationTimeout(PyCalcBaseException):
+    """
+    Evaluation didn't finish before its deadline.
+    """
+
+
+class CostLimitExceeded(PyCalcBaseException):
+    """
+    Estimated size of result or work of evaluation exceeds the limits.
+    """
+
+
+def _restore(cls, message):
+    """
+    Create exception with already formatted message.
+    :param cls: PyCalcBaseException or its subclass.
+    :param message: str(formatted message).
+    :return: exception instance.
+    """
+    err = cls.__new__(cls)
+    err.message = message
+    Exception.__init__(err, message)
+    return err
@@ -0,0 +1,283 @@
+"""
+Module contains incremental evaluation of expression which is edited and
+evaluated again and again, e.g. in interactive tools. Expression is split
+into regions of brackets, every region keeps parsed list of its own level
+(nested regions are left as empty brackets) and cached value. When edited
+expression comes, innermost region containing the change is parsed again
+and only regions on the path from it up to the whole expression are
+calculated, values of all other regions are reused. Results are the same as
+of 'ExpressionCalculator' for functions without side effects.
+Contains classes:
+- UpdateStats;
+- IncrementalEvaluator;
+"""
+from collections import namedtuple
+from pycalc.tools.calculator import ExpressionCalculator
+from pycalc.tools.parser import ExpressionParser
+from pycalc.tools.tokenizer import tokenize, OPEN, CLOSE
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+UpdateStats = namedtuple('UpdateStats', ['reparsed', 'recalculated'])
+
+# Value of region which has to be calculated.
+_MISSING = object()
+
+
+class _Region:
+    """
+    Part of expression in brackets or the whole expression. Offset of region
+    is counted from the beginning of parent region contents, so edits shift
+    only regions which follow them inside the same parent.
+    """
+    __slots__ = ('start', 'length', 'parent', 'children', 'level', 'operand')
+
+    def __init__(self, start, parent=None):
+        """
+        :param start: int(offset of contents from contents of parent).
+        :param parent: _Region or None for the whole expression.
+        """
+        self.start = start
+        self.length = 0
+        self.parent = parent
+        self.children = []
+        self.level = None
+        self.operand = _MISSING
+
+
+class _LevelCalculator(ExpressionCalculator):
+    """
+    Calculator of single level of brackets, values of nested regions are
+    already known.
+    """
+    def calculate_level(self, level, operands):
+        """
+        Calculate parsed level of region the same way as 'explore_data' does
+        but take values of nested regions instead of exploring them. Nested
+        regions are empty lists, non-empty ones are signed numbers added by
+        parser.
+        :param level: list with parsed level of region.
+        :param operands: list with values of nested regions in order.
+        :return: number or list of function arguments.
+        """
+        self.func_stack = []
+        operands = iter(operands)
+        result_list = []
+        for item in level:
+            if isinstance(item, list):
+                self._open_nested(result_list)
+                if len(item) == 0:
+                    operand = next(operands)
+                else:
+                    operand = self.explore_data(item)
+                self._close_nested(result_list, operand)
+            else:
+                item = self._convert_operator(item)
+                if item is not None:
+                    self._append_result(result_list, item)
+        return self.calculate_exp(result_list)
+
+
+class IncrementalEvaluator:
+    """
+    Evaluator keeping regions of the last successfully parsed expression.
+    Every call of 'update' compares new expression with it, so edits may be
+    made anywhere and in any number of characters.
+    """
+    def __init__(self, modules=None):
+        """
+        :param modules: list with names of custom modules.
+        """
+        self.modules = list(modules or ())
+        self.last_update = None
+        self._source = None
+        self._root = None
+
+    @property
+    def expression(self):
+        """
+        :return: str(the last successfully parsed expression) or None.
+        """
+        return self._source
+
+    def update(self, expression):
+        """
+        Evaluate edited expression reusing values of unchanged regions. If
+        changed region can't be parsed alone, e.g. bracket was added, its
+        parent regions are tried up to the whole expression.
+        :param expression: str(expression string).
+        :return: int|float|complex results of expression calculations.
+        """
+        if self._root is None:
+            self._root = self._build(expression, expression)
+            reparsed = len(expression)
+        else:
+            reparsed = self._replace(expression)
+        self._source = expression
+        calc = _LevelCalculator(expression, self._root.level,
+                                list(self.modules))
+        recalculated = self._calculate(calc)
+        self.last_update = UpdateStats(reparsed, recalculated)
+        return self._root.operand
+
+    def edit(self, start, end, text):
+        """
+        Replace part of the last expression and evaluate result.
+        :param start: int(offset of the first replaced character).
+        :param end: int(offset after the last replaced character).
+        :param text: str(new text of replaced part).
+        :return: int|float|complex results of expression calculations.
+        """
+        if self._source is None:
+            raise PyCalcBaseException('There\'s nothing to edit yet.')
+        return self.update(self._source[:start] + text + self._source[end:])
+
+    def _replace(self, expression):
+        """
+        Parse again innermost region containing the change and put it into
+        the tree of regions. Parents of the region lose their values.
+        :param expression: str(new expression string).
+        :return: int(number of parsed characters).
+        """
+        source = self._source
+        prefix = _common_prefix(source, expression)
+        limit = min(len(source), len(expression)) - prefix
+        suffix = _common_suffix(source, expression, limit)
+        change_end = len(source) - suffix
+        delta = len(expression) - len(source)
+        path = [(self._root, 0)]
+        while True:
+            region, offset = path[-1]
+            for child in region.children:
+                start = offset + child.start
+                if start <= prefix and change_end <= start + child.length:
+                    path.append((child, start))
+                    break
+            else:
+                break
+        while True:
+            region, offset = path.pop()
+            text = expression[offset:offset + region.length + delta]
+            try:
+                new = self._build(text, expression)
+                break
+            except PyCalcBaseException:
+                if len(path) == 0:
+                    raise
+        new.start = region.start
+        new.parent = region.parent
+        if new.parent is None:
+            self._root = new
+        node = new
+        old = region
+        while node.parent is not None:
+            parent = node.parent
+            siblings = parent.children
+            indx = siblings.index(old)
+            siblings[indx] = node
+            for sibling in siblings[indx + 1:]:
+                sibling.start += delta
+            parent.length += delta
+            parent.operand = _MISSING
+            node = old = parent
+        return len(text)
+
+    @staticmethod
+    def _build(text, expression):
+        """
+        Split text into regions of brackets and parse level of every region.
+        :param text: str(contents of region).
+        :param expression: str(whole expression for error messages).
+        :return: _Region with contents of 'text'.
+        """
+        root = _Region(0)
+        opened = [(root, 0)]
+        closed = []
+        for kind, _, position in tokenize(text):
+            if kind == OPEN:
+                parent, start = opened[-1]
+                region = _Region(position + 1 - start, parent)
+                parent.children.append(region)
+                opened.append((region, position + 1))
+            elif kind == CLOSE:
+                if len(opened) == 1:
+                    raise PyCalcBaseException('Someone messed up with '
+                                              'brackets', expression)
+                region, start = opened.pop()
+                region.length = position - start
+                closed.append((region, start))
+        if len(opened) != 1:
+            raise PyCalcBaseException('Someone messed up with brackets',
+                                      expression)
+        root.length = len(text)
+        closed.append((root, 0))
+        parser = ExpressionParser()
+        for region, start in closed:
+            pieces = []
+            position = start
+            for child in region.children:
+                pieces.append(text[position:start + child.start])
+                position = start + child.start + child.length
+            pieces.append(text[position:start + region.length])
+            region.level = parser.parse_input(''.join(pieces))
+        return root
+
+    def _calculate(self, calc):
+        """
+        Calculate regions which lost their values, nested regions first.
+        :param calc: _LevelCalculator for current expression.
+        :return: int(number of calculated regions).
+        """
+        count = 0
+        stack = [self._root]
+        while len(stack) > 0:
+            region = stack[-1]
+            if region.operand is not _MISSING:
+                stack.pop()
+                continue
+            missing = [child for child in region.children
+                       if child.operand is _MISSING]
+            if len(missing) > 0:
+                stack.extend(reversed(missing))
+                continue
+            region.operand = calc.calculate_level(
+                region.level, [child.operand for child in region.children])
+            count += 1
+            stack.pop()
+        return count
+
+
+def _common_prefix(first, second):
+    """
+    Find length of common beginning of two strings. Strings are compared by
+    slices with binary search, so long strings aren't walked in Python.
+    :param first: str.
+    :param second: str.
+    :return: int(length of common prefix).
+    """
+    low, high = 0, min(len(first), len(second))
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[:middle] == second[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix(first, second, limit):
+    """
+    Find length of common ending of two strings.
+    :param first: str.
+    :param second: str.
+    :param limit: int(maximal length of suffix).
+    :return: int(length of common suffix).
+    """
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if first[len(first) - middle:] == second[len(second) - middle:]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
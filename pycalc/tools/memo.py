@@ -0,0 +1,265 @@
+"""
+Module contains opt-in memoization of pure function calls. Results are kept
+in bounded LRU of every function and shared by all evaluations of all
+expressions in the process. Function is memoized when policy of its
+registry allows it: explicitly allowed functions, functions of custom
+modules marked with 'pure' decorator and slow 'math' functions listed in
+'settings.MEMO_FUNCTIONS'. Calls with unhashable arguments aren't memoized.
+Contains classes:
+- MemoStats;
+- MemoizedFunction;
+- MemoRegistry;
+Contains functions:
+- pure;
+- memoize_calls;
+"""
+import math
+import sys
+from _thread import allocate_lock
+from collections import OrderedDict, namedtuple
+import pycalc.tools.nodes as nodes
+import pycalc.tools.settings as rules
+
+
+# Attribute set by 'pure' decorator with capacity of memoized function.
+MARK = '__pycalc_memoize__'
+
+
+class MemoStats(namedtuple('MemoStats', ['hits', 'misses', 'evictions',
+                                         'unhashable', 'size'])):
+    """
+    Counters of memoized function.
+    """
+    __slots__ = ()
+
+    @property
+    def hit_rate(self):
+        """
+        :return: float(share of calls answered from memo).
+        """
+        calls = self.hits + self.misses + self.unhashable
+        return self.hits / calls if calls > 0 else 0.0
+
+
+def _key(args):
+    """
+    Create key of memo entry. Types are part of key, so '1' and '1.0' which
+    give different results aren't mixed, floats are compared by exact
+    representation, so '0.0' differs from '-0.0' and 'nan' equals itself.
+    :param args: tuple with arguments of call.
+    :return: hashable tuple.
+    """
+    key = []
+    for arg in args:
+        kind = type(arg)
+        if kind is float:
+            key.append((kind, arg.hex()))
+        elif kind is complex:
+            key.append((kind, arg.real.hex(), arg.imag.hex()))
+        else:
+            key.append((kind, arg))
+    key = tuple(key)
+    hash(key)
+    return key
+
+
+class MemoizedFunction:
+    """
+    Callable keeping results of wrapped function in LRU of limited number of
+    entries. Exceptions aren't kept, so failing calls are repeated.
+    """
+    def __init__(self, func, capacity=rules.MEMO_CAPACITY,
+                 max_result_size=rules.MEMO_MAX_RESULT_SIZE):
+        """
+        :param func: pure callable.
+        :param capacity: int(maximal number of kept results).
+        :param max_result_size: int(size of the biggest kept result in
+                                bytes).
+        """
+        self.func = func
+        self.__name__ = getattr(func, '__name__', repr(func))
+        self.capacity = capacity
+        self.max_result_size = max_result_size
+        self._entries = OrderedDict()
+        self._lock = allocate_lock()
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._unhashable = 0
+
+    def __call__(self, *args):
+        """
+        Return kept result or call function and keep its result.
+        :param args: arguments of function.
+        :return: result of function.
+        """
+        try:
+            key = _key(args)
+        except TypeError:
+            with self._lock:
+                self._unhashable += 1
+            return self.func(*args)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._hits += 1
+                return self._entries[key]
+            self._misses += 1
+        result = self.func(*args)
+        if sys.getsizeof(result) <= self.max_result_size:
+            with self._lock:
+                self._entries[key] = result
+                while len(self._entries) > self.capacity:
+                    self._entries.popitem(last=False)
+                    self._evictions += 1
+        return result
+
+    def stats(self):
+        """
+        :return: MemoStats instance.
+        """
+        with self._lock:
+            return MemoStats(self._hits, self._misses, self._evictions,
+                             self._unhashable, len(self._entries))
+
+    def clear(self):
+        """
+        Remove kept results and reset counters.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._hits = self._misses = self._evictions = 0
+            self._unhashable = 0
+
+    def __reduce__(self):
+        """
+        Pickled function is restored as memoized function of the registry
+        of receiving process.
+        """
+        return _restore, (self.func,)
+
+    def __repr__(self):
+        return 'MemoizedFunction({!r})'.format(self.func)
+
+
+def pure(func=None, capacity=rules.MEMO_CAPACITY):
+    """
+    Mark function of custom module as pure, so it's memoized when
+    memoization is switched on. May be used as '@pure' or
+    '@pure(capacity=N)'.
+    :param func: callable or None.
+    :param capacity: int(maximal number of kept results).
+    :return: the same callable or decorator.
+    """
+    def mark(target):
+        setattr(target, MARK, capacity)
+        return target
+    return mark if func is None else mark(func)
+
+
+class MemoRegistry:
+    """
+    Policies of functions and their memoized wrappers. Every function has
+    single wrapper, so results are shared by all expressions calling it.
+    """
+    def __init__(self, defaults=()):
+        """
+        :param defaults: iterable with functions memoized by default.
+        """
+        self._policies = dict.fromkeys(defaults, rules.MEMO_CAPACITY)
+        self._wrappers = {}
+        self._lock = allocate_lock()
+
+    def allow(self, func, capacity=rules.MEMO_CAPACITY):
+        """
+        Memoize function keeping up to 'capacity' results.
+        :param func: pure callable.
+        :param capacity: int(maximal number of kept results), 0 forbids
+                         memoization.
+        """
+        with self._lock:
+            self._policies[func] = capacity
+            wrapper = self._wrappers.get(func)
+            if wrapper is not None:
+                wrapper.capacity = capacity
+
+    def forbid(self, func):
+        """
+        Never memoize function, e.g. marked by mistake.
+        :param func: callable.
+        """
+        self.allow(func, 0)
+
+    def policy(self, func):
+        """
+        Find capacity of memo for function: explicit policy, then mark of
+        'pure' decorator.
+        :param func: callable.
+        :return: int(maximal number of kept results), 0 if function mustn't
+                 be memoized.
+        """
+        try:
+            return self._policies[func]
+        except (KeyError, TypeError):
+            return getattr(func, MARK, 0)
+
+    def wrap(self, func):
+        """
+        Get memoized wrapper of function allowed by policy.
+        :param func: callable.
+        :return: MemoizedFunction or 'func' itself.
+        """
+        capacity = self.policy(func)
+        if capacity <= 0:
+            return func
+        with self._lock:
+            wrapper = self._wrappers.get(func)
+            if wrapper is None:
+                wrapper = self._wrappers[func] = MemoizedFunction(func,
+                                                                  capacity)
+            return wrapper
+
+    def stats(self):
+        """
+        :return: dict with names of memoized functions and their MemoStats.
+        """
+        with self._lock:
+            wrappers = list(self._wrappers.values())
+        return {wrapper.__name__: wrapper.stats() for wrapper in wrappers}
+
+    def clear(self):
+        """
+        Remove kept results of all functions and reset their counters.
+        """
+        with self._lock:
+            wrappers = list(self._wrappers.values())
+        for wrapper in wrappers:
+            wrapper.clear()
+
+
+MEMO = MemoRegistry(getattr(math, name) for name in rules.MEMO_FUNCTIONS
+                    if hasattr(math, name))
+
+
+def _restore(func):
+    """
+    :param func: callable.
+    :return: memoized wrapper of function from process-wide registry.
+    """
+    return MEMO.wrap(func)
+
+
+def memoize_calls(root, registry=MEMO):
+    """
+    Replace functions of calls allowed by registry with memoized wrappers.
+    :param root: Node.
+    :param registry: MemoRegistry instance.
+    :return: Node.
+    """
+    def wrap(node, children):
+        if isinstance(node, nodes.Call):
+            return nodes.Call(registry.wrap(node.func), children)
+        if all(new is old for new, old in zip(children, node.children())):
+            return node
+        return node.rebuild(children)
+    return nodes.transform(root, wrap)
@@ -0,0 +1,294 @@
+"""
+Module defines nodes of compiled expression tree. Every name, number and
+operator is already resolved to Python object when node is created, so
+evaluation of the tree costs only the arithmetic.
+Contains classes:
+- Node;
+- Constant;
+- Variable;
+- BinaryOp;
+- Call;
+- Sequence;
+- Shared;
+Contains functions:
+- walk;
+- transform;
+"""
+from abc import ABC, abstractmethod
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+class Node(ABC):
+    """
+    Abstract base class for all nodes of compiled expression tree, every
+    kind of node defines its own evaluation.
+    """
+    __slots__ = ()
+
+    @abstractmethod
+    def evaluate(self, env):
+        """
+        Calculate value of the node.
+        :param env: dict with values of parameters.
+        :return: int|float|complex or any other Python object.
+        """
+
+    def children(self):
+        """
+        Return nodes this node depends on.
+        :return: tuple of nodes.
+        """
+        return ()
+
+    def rebuild(self, children):
+        """
+        Create node of the same kind with other children.
+        :param children: sequence of nodes in order of 'children'.
+        :return: Node.
+        """
+        return self
+
+
+class Constant(Node):
+    """
+    Number or module constant which is known at compile time.
+    """
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        """
+        :param value: Python object.
+        """
+        self.value = value
+
+    def evaluate(self, env):
+        """
+        Return stored value.
+        """
+        return self.value
+
+    def __repr__(self):
+        return 'Constant({!r})'.format(self.value)
+
+
+class Variable(Node):
+    """
+    Parameter of compiled expression: name which wasn't resolved from
+    modules or was declared as variable. Its value is provided on evaluation.
+    """
+    __slots__ = ('name',)
+
+    def __init__(self, name):
+        """
+        :param name: str(variable name).
+        """
+        self.name = name
+
+    def evaluate(self, env):
+        """
+        Take value of parameter from 'env'.
+        """
+        try:
+            return env[self.name]
+        except KeyError:
+            raise PyCalcBaseException('Value of variable wasn\'t provided',
+                                      self.name)
+
+    def __repr__(self):
+        return 'Variable({!r})'.format(self.name)
+
+
+class BinaryOp(Node):
+    """
+    Mathematical operator from 'settings.MATH_MAP' applied to two operands.
+    """
+    __slots__ = ('func', 'left', 'right')
+
+    def __init__(self, func, left, right):
+        """
+        :param func: function from 'operator' module.
+        :param left: Node with left operand.
+        :param right: Node with right operand.
+        """
+        self.func = func
+        self.left = left
+        self.right = right
+
+    def evaluate(self, env):
+        """
+        Apply operator to evaluated operands.
+        """
+        return self.func(self.left.evaluate(env), self.right.evaluate(env))
+
+    def children(self):
+        """
+        Return operands.
+        """
+        return self.left, self.right
+
+    def rebuild(self, children):
+        """
+        Apply the same operator to other operands.
+        """
+        return BinaryOp(self.func, *children)
+
+    def __repr__(self):
+        return 'BinaryOp({}, {!r}, {!r})'.format(self.func.__name__,
+                                                 self.left, self.right)
+
+
+class Call(Node):
+    """
+    Call of function imported from custom or standard modules.
+    """
+    __slots__ = ('func', 'args')
+
+    def __init__(self, func, args):
+        """
+        :param func: callable.
+        :param args: tuple of nodes with function arguments.
+        """
+        self.func = func
+        self.args = tuple(args)
+
+    def evaluate(self, env):
+        """
+        Call function with evaluated arguments.
+        """
+        args = [arg.evaluate(env) for arg in self.args]
+        try:
+            return self.func(*args)
+        except TypeError:
+            raise PyCalcBaseException('Your function have another signature.')
+
+    def children(self):
+        """
+        Return function arguments.
+        """
+        return self.args
+
+    def rebuild(self, children):
+        """
+        Call the same function with other arguments.
+        """
+        return Call(self.func, children)
+
+    def __repr__(self):
+        return 'Call({}, {!r})'.format(getattr(self.func, '__name__',
+                                               self.func), self.args)
+
+
+class Sequence(Node):
+    """
+    Comma separated values outside of function call. Evaluated to list as
+    'ExpressionCalculator' does.
+    """
+    __slots__ = ('items',)
+
+    def __init__(self, items):
+        """
+        :param items: iterable of nodes.
+        """
+        self.items = tuple(items)
+
+    def evaluate(self, env):
+        """
+        Evaluate every item into list.
+        """
+        return [item.evaluate(env) for item in self.items]
+
+    def children(self):
+        """
+        Return items.
+        """
+        return self.items
+
+    def rebuild(self, children):
+        """
+        Create sequence with other items.
+        """
+        return Sequence(children)
+
+    def __repr__(self):
+        return 'Sequence({!r})'.format(self.items)
+
+
+class Shared(Node):
+    """
+    Subexpression used in several places of expression. It's calculated once
+    per evaluation, its value is kept in 'env' under the node itself.
+    """
+    __slots__ = ('node',)
+
+    def __init__(self, node):
+        """
+        :param node: Node with shared subexpression.
+        """
+        self.node = node
+
+    def evaluate(self, env):
+        """
+        Calculate subexpression on first access only.
+        """
+        try:
+            return env[self]
+        except KeyError:
+            value = env[self] = self.node.evaluate(env)
+            return value
+
+    def children(self):
+        """
+        Return shared subexpression.
+        """
+        return self.node,
+
+    def rebuild(self, children):
+        """
+        Share another subexpression.
+        """
+        return Shared(children[0])
+
+    def __repr__(self):
+        return 'Shared({!r})'.format(self.node)
+
+
+def walk(root):
+    """
+    Iterate over all nodes of the tree starting from 'root' without
+    recursion. Nodes shared between several parents are visited once.
+    :param root: Node.
+    :return: generator of nodes.
+    """
+    stack = [root]
+    seen = set()
+    while len(stack) > 0:
+        node = stack.pop()
+        if id(node) in seen:
+            continue
+        seen.add(id(node))
+        yield node
+        stack.extend(reversed(node.children()))
+
+
+def transform(root, func):
+    """
+    Fold the tree bottom-up without recursion: 'func' receives every node
+    with results for its children. Node shared between several parents is
+    passed to 'func' once.
+    :param root: Node.
+    :param func: callable(node, list of children results).
+    :return: result of 'func' for root.
+    """
+    done = {}
+    stack = [(root, False)]
+    while len(stack) > 0:
+        node, expanded = stack.pop()
+        if id(node) in done:
+            continue
+        if not expanded:
+            stack.append((node, True))
+            stack.extend((child, False) for child in node.children())
+            continue
+        done[id(node)] = func(node, [done[id(child)]
+                                     for child in node.children()])
+    return done[id(root)]
@@ -0,0 +1,161 @@
+"""
+Module contains optimization pass over tree of compiled expression. Subtrees
+built only from constants and pure functions are calculated during
+compilation and identical pure subtrees are calculated once per evaluation.
+Contains classes:
+- OptimizationStats;
+Contains functions:
+- optimize;
+"""
+import builtins
+import math
+from collections import namedtuple
+import pycalc.tools.nodes as nodes
+import pycalc.tools.settings as rules
+
+
+OptimizationStats = namedtuple('OptimizationStats',
+                               ('folded', 'merged', 'removed'))
+
+# Functions without side effects whose results depend only on arguments.
+PURE_FUNCTIONS = frozenset(
+    [func for func, _ in rules.MATH_MAP.values()] +
+    [func for func in vars(math).values() if callable(func)] +
+    [builtins.abs, builtins.round, builtins.pow, builtins.min, builtins.max,
+     builtins.divmod, builtins.int, builtins.float, builtins.complex,
+     builtins.bool])
+
+
+def _constant_key(value):
+    """
+    Create key to find equal constants. Floats are compared by their exact
+    representation so '0.0' and '-0.0' differ and 'nan' equals itself.
+    :param value: constant value.
+    :return: hashable tuple or None if constant mustn't be merged.
+    """
+    if type(value) in (int, bool):
+        return 'constant', type(value), value
+    if type(value) is float:
+        return 'constant', float, value.hex()
+    return None
+
+
+class _Optimizer:
+    """
+    Keep state of single optimization: table of pure subtrees and counters.
+    """
+    def __init__(self):
+        """
+        Create empty table of pure subtrees.
+        """
+        self.table = {}
+        self.keys = {}
+        self.folded = 0
+        self.merged = 0
+
+    def fold(self, node, children):
+        """
+        Calculate node with constant operands and pure function, replace
+        identical pure node by previously seen one.
+        :param node: original Node.
+        :param children: list with optimized children.
+        :return: optimized Node.
+        """
+        if all(new is old for new, old in zip(children, node.children())):
+            new_node = node
+        else:
+            new_node = node.rebuild(children)
+        key = self.key(new_node, children)
+        if key is None:
+            return new_node
+        if isinstance(new_node, (nodes.BinaryOp, nodes.Call)) and \
+                all(isinstance(child, nodes.Constant) for child in children):
+            try:
+                value = new_node.evaluate({})
+            except Exception:
+                # Error is reported on evaluation as without optimization.
+                pass
+            else:
+                self.folded += 1
+                new_node = nodes.Constant(value)
+                key = _constant_key(value)
+                if key is None:
+                    return new_node
+        if key in self.table:
+            self.merged += 1
+            return self.table[key]
+        self.table[key] = new_node
+        self.keys[id(new_node)] = key
+        return new_node
+
+    def key(self, node, children):
+        """
+        Create key of pure node out of keys of its children.
+        :param node: Node with optimized children.
+        :param children: list with optimized children.
+        :return: hashable tuple or None if node isn't pure.
+        """
+        if isinstance(node, nodes.Constant):
+            return _constant_key(node.value)
+        if isinstance(node, nodes.Variable):
+            return 'variable', node.name
+        if not isinstance(node, (nodes.BinaryOp, nodes.Call)) or \
+                node.func not in PURE_FUNCTIONS:
+            return None
+        for child in children:
+            if id(child) not in self.keys and \
+                    not isinstance(child, nodes.Constant):
+                return None
+        return type(node).__name__, id(node.func), tuple(map(id, children))
+
+
+def _share(root):
+    """
+    Wrap subexpressions with several parents into 'Shared' nodes so they're
+    calculated once.
+    :param root: Node.
+    :return: Node.
+    """
+    parents = {}
+    for node in nodes.walk(root):
+        for child in node.children():
+            parents[id(child)] = parents.get(id(child), 0) + 1
+    shared = {}
+
+    def wrap(node, children):
+        wrapped = []
+        for original, child in zip(node.children(), children):
+            if parents[id(original)] > 1 and len(original.children()) > 0:
+                if id(original) not in shared:
+                    shared[id(original)] = nodes.Shared(child)
+                child = shared[id(original)]
+            wrapped.append(child)
+        if any(new is not old for new, old in zip(wrapped, node.children())):
+            return node.rebuild(wrapped)
+        return node
+
+    return nodes.transform(root, wrap)
+
+
+def _count(root):
+    """
+    Count distinct nodes of the tree except 'Shared' wrappers.
+    :param root: Node.
+    :return: int.
+    """
+    return sum(1 for node in nodes.walk(root)
+               if not isinstance(node, nodes.Shared))
+
+
+def optimize(root):
+    """
+    Fold constant subtrees and merge identical pure subtrees of expression.
+    Impure functions from custom modules are never folded or merged.
+    :param root: Node.
+    :return: tuple(optimized Node, OptimizationStats).
+    """
+    before = _count(root)
+    optimizer = _Optimizer()
+    result = _share(nodes.transform(root, optimizer.fold))
+    return result, OptimizationStats(optimizer.folded, optimizer.merged,
+                                     before - _count(result))
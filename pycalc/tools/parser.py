@@ -5,19 +5,19 @@ Contains classes:
 - ExpressionParser;
 """
 import pycalc.tools.settings as rules
+from pycalc.tools.tokenizer import tokenize, OPEN, CLOSE, OPERATOR, ATOM
 from pycalc.tools.exceptions import PyCalcBaseException
 
 
 class ExpressionParser:
     """
-    Class with monster 'parse_input' method with all logic to obtain parsed
+    Class with 'parse_input' method with all logic to obtain parsed
     expression in format suitable for further calculations.
     """
     def __init__(self):
         """
         Initialize private '_expression' attribute access to which controlled
-        by properties. It's required only for error messages and controlled
-        to avoid multiple assignments during recursion.
+        by properties. It's required only for error messages.
         """
         self._expression = None
 
@@ -32,144 +32,87 @@ class ExpressionParser:
     @expression.setter
     def expression(self, value):
         """
-        Set '_expression' attribute to 'value' if it wasn't already set.
+        Set '_expression' attribute to 'value'.
         :param value: str(expression).
         """
-        if self._expression is None:
-            self._expression = value
+        self._expression = value
 
-    def parse_input(self, exp_string, parse_one=False):
+    def parse_input(self, exp_string):
         """
-        Parse provided string into list of strings and lists recursively. Also
-        allows 'peek ahead' of current position in string on some occasions.
-        Pass symbol by symbol through the string and construct desired structure.
-        Each opening bracket triggers new call to method and creates list
-        inside current list.
+        Parse provided string into list of strings and lists. String is
+        scanned once by 'tokenize' and each opening bracket pushes new list
+        on the stack of currently open lists, so time of parsing is linear
+        in expression length.
         :param exp_string: str(string with expression).
-        :param parse_one: boolean if True parse up to first math operator.
         :return: list of strings and lists.
         """
         self.expression = exp_string
-        expression_stack = []
-        exp_string = exp_string.strip()
-        temp_str = ''
-        number = 0
-        for index, item in enumerate(exp_string):
-            if parse_one and (item in rules.TOTAL_LIST):
-                expression_stack.append(self._control_parsing(item,
-                                                              temp_str))
-                break
-            # 'number' and 'index' used to jump forward after return from
-            # upper recursion levels.
-            if number != index:
-                continue
-            else:
-                number += 1
-            if item in rules.OPEN_SEQ:
-                expression_stack.append(temp_str)
-                if self._check_operators(expression_stack):
-                    # Allow implicit multiplication between number and bracket.
-                    if expression_stack[-1].isdigit():
-                        expression_stack.append('*')
-                temp_str = ''
-                try:
-                    res, number = self.parse_input(exp_string[(index + 1):])
-                except ValueError:
-                    # Recursive copy return unexpected values -> recursion
-                    # is amiss -> brackets is awry.
+        tokens = tokenize(exp_string)
+        stack = [[]]
+        index = 0
+        while index < len(tokens):
+            kind, text, _ = tokens[index]
+            current = stack[-1]
+            if kind == ATOM:
+                current.append(text)
+            elif kind == OPEN:
+                # Allow implicit multiplication between number and bracket.
+                if len(current) > 0 and isinstance(current[-1], str) and \
+                        current[-1].isdigit():
+                    current.append('*')
+                current.append([])
+                stack.append(current[-1])
+            elif kind == CLOSE:
+                if len(stack) == 1:
                     raise PyCalcBaseException('Someone messed up with brackets',
                                               self.expression)
-                number += index
-                expression_stack.append(res)
-            elif item in rules.CLOSE_SEQ:
-                expression_stack.append(temp_str)
-                return self._clean_spaces(expression_stack), index + 2
-            elif item in rules.MATH_OPERATORS:
-                expression_stack.append(temp_str)
-                # Check what kind of operator it is.
-                if len(exp_string) - index > 2 and \
-                        exp_string[index + 1] in ['/', '*', '=']:
-                    item += exp_string[index + 1]
-                    number += 1
-                    expression_stack.append(item)
-                # Escape signs into lists with multiplication.
-                elif index == 0:
-                    result, dif = self._deal_with_sign(item,
-                                                       exp_string[(index + 1):])
-                    expression_stack.extend(result)
-                    number += dif
-                elif self._check_operators(expression_stack):
-                    if self._clean_spaces(expression_stack)[-1] in \
-                            rules.MATH_OPERATORS:
-                        result, dif = self._deal_with_sign(item,
-                                                           exp_string[(index+1):])
-                        expression_stack.extend(result)
-                        number += dif
-                    else:
-                        expression_stack.append(item)
+                stack.pop()
+            elif kind == OPERATOR:
+                if self._is_sign(current):
+                    index += self._deal_with_sign(current, tokens, index)
                 else:
-                    expression_stack.append(item)
-                temp_str = ''
-            else:
-                temp_str = temp_str + item
-        else:
-            expression_stack.append(temp_str)
-        return self._clean_spaces(expression_stack)
-
-    def _deal_with_sign(self, item, expression):
-        """
-        Escape signed numbers into lists with multiplication of signed 1 with
-        unsigned number. Must work with brackets and functions.
-        :param item: str(math sign).
-        :param expression: str(rest of expression after sign).
-        :return: list with escape sequence.
-        """
-        tmp_list = [item + '1', '*']
-        res = self.parse_input(expression, True)
-        if not res:
-            return item, 0
-        if res[0] == 'extra':
-            return [tmp_list + ['1'], '*'], 0
-        else:
-            return [tmp_list + res], len(res[0]) + expression.index(res[0])
+                    current.append(text)
+            index += 1
+        if len(stack) != 1:
+            raise PyCalcBaseException('Someone messed up with brackets',
+                                      self.expression)
+        return stack[0]
 
     @staticmethod
-    def _control_parsing(item, temp_str):
-        """
-        Return specified values during signed number escaping  process.
-        :param item: str(current symbol during 'parse_one'=True call).
-        :param temp_str: str(already parsed symbols).
-        :return: str item or 'extra' key.
+    def _is_sign(current):
         """
-        if temp_str == '':
-            return 'extra'
-        elif temp_str.isalpha():
-            if item in rules.OPEN_SEQ:
-                return 'extra'
-            else:
-                return temp_str
-        else:
-            return temp_str
-
-    def _check_operators(self, expression_stack):
-        """
-        Perform length check of list with results parsed so far. Also check if
-        previous item is a list. Store widely used comparisons.
-        :param expression_stack: list with parsed expression part.
+        Check if operator is a sign of the following operand: it's placed at
+        the beginning of expression or brackets or right after another
+        operator.
+        :param current: list with parsed expression part.
         :return: boolean.
         """
-        expression_stack = self._clean_spaces(expression_stack)
-        if len(expression_stack) == 0:
-            return False
-        if isinstance(expression_stack[-1], list):
-            return False
-        return True
+        if len(current) == 0:
+            return True
+        return isinstance(current[-1], str) and \
+            current[-1] in rules.MATH_OPERATORS
 
     @staticmethod
-    def _clean_spaces(array):
+    def _deal_with_sign(current, tokens, index):
         """
-        Remove redundant empty strings from list with parsed results.
-        :param array: list with parsed results.
-        :return: cleared list without '' and ' '.
-        """
-        return [item for item in array if item not in ('', ' ')]
+        Escape signed numbers into lists with multiplication of signed 1 with
+        unsigned number. Must work with brackets and functions which are
+        multiplied by signed 1 instead.
+        :param current: list with parsed expression part to append results.
+        :param tokens: list of tokens from 'tokenize'.
+        :param index: int(index of token with sign).
+        :return: int(number of consumed tokens after sign).
+        """
+        item = tokens[index][1]
+        if index + 1 == len(tokens):
+            current.append(item)
+            return 0
+        kind, text, _ = tokens[index + 1]
+        if kind == ATOM:
+            is_func = text.isalpha() and index + 2 < len(tokens) and \
+                tokens[index + 2][0] == OPEN
+            if not is_func:
+                current.append([item + '1', '*', text])
+                return 1
+        current.extend([[item + '1', '*', '1'], '*'])
+        return 0
@@ -0,0 +1,241 @@
+"""
+Module contains instrumentation of compilation and evaluation. Profiled
+expression goes through subclass of 'ExpressionCompiler' which measures every
+phase, so ordinary compilation and evaluation don't pay anything for it.
+Time of phases is exclusive: time of number conversion inside of tree
+building isn't counted twice.
+Contains classes:
+- Profile;
+- ProfilingCompiler;
+Contains functions:
+- profile;
+"""
+import json
+import time
+import pycalc.tools.nodes as nodes
+from pycalc.tools.compiler import CompiledExpression, ExpressionCompiler
+
+
+# Phases in order of their first appearance.
+PHASES = ('parse', 'build', 'convert', 'lookup', 'reduce', 'cost', 'optimize',
+          'evaluate')
+
+
+class Profile:
+    """
+    Timings and counters of single profiled evaluation: exclusive wall time
+    of every phase in seconds, number of reductions of operators, number of
+    calls of every function during evaluation and maximal depth of nested
+    brackets and calls.
+    """
+    def __init__(self, expression, callback=None):
+        """
+        :param expression: str(expression string).
+        :param callback: callable receiving finished Profile or None.
+        """
+        self.expression = expression
+        self.callback = callback
+        self.phases = dict.fromkeys(PHASES, 0.0)
+        self.reductions = 0
+        self.calls = {}
+        self.max_depth = 0
+        self._nested = []
+
+    def measure(self, phase, func, *args):
+        """
+        Call function and add its time without time of nested measurements
+        to the phase.
+        :param phase: str(name of phase).
+        :param func: callable.
+        :param args: arguments of 'func'.
+        :return: result of 'func'.
+        """
+        self._nested.append(0.0)
+        start = time.perf_counter()
+        try:
+            return func(*args)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.phases[phase] += elapsed - self._nested.pop()
+            if len(self._nested) > 0:
+                self._nested[-1] += elapsed
+
+    def counted(self, func):
+        """
+        Wrap function to count its calls by name.
+        :param func: callable.
+        :return: callable with the same behaviour.
+        """
+        name = getattr(func, '__name__', repr(func))
+        calls = self.calls
+
+        def call(*args):
+            calls[name] = calls.get(name, 0) + 1
+            return func(*args)
+        return call
+
+    def finish(self):
+        """
+        Pass finished profile to callback.
+        """
+        if self.callback is not None:
+            self.callback(self)
+
+    @property
+    def total(self):
+        """
+        :return: float(seconds of all phases).
+        """
+        return sum(self.phases.values())
+
+    def as_dict(self):
+        """
+        :return: dict with all timings and counters.
+        """
+        return {'expression': self.expression, 'phases': dict(self.phases),
+                'total': self.total, 'reductions': self.reductions,
+                'calls': dict(self.calls), 'max_depth': self.max_depth}
+
+    def to_json(self):
+        """
+        :return: str(JSON document with all timings and counters).
+        """
+        return json.dumps(self.as_dict(), indent=2)
+
+
+class ProfilingCompiler(ExpressionCompiler):
+    """
+    Compiler recording phases of compilation to 'Profile'.
+    """
+    def __init__(self, profile, custom_module=None, variables=None,
+                 optimize=True, check_cost=True):
+        """
+        :param profile: Profile instance to fill.
+        Other parameters are the same as of 'ExpressionCompiler'.
+        """
+        super().__init__(custom_module, variables, optimize, check_cost)
+        self.profile = profile
+        self.depth = 0
+
+    def _parse(self, exp_string):
+        """
+        :param exp_string: str(expression string).
+        :return: list with parsed expression.
+        """
+        return self.profile.measure('parse', super()._parse, exp_string)
+
+    def explore_data(self, data):
+        """
+        Build tree, top level of expression counts as first level of depth.
+        :param data: list with parsed expression.
+        :return: Node or list of nodes with function arguments.
+        """
+        self.depth = 1
+        self.profile.max_depth = max(self.profile.max_depth, self.depth)
+        return self.profile.measure('build', super().explore_data, data)
+
+    def _open_nested(self, result_list):
+        """
+        Measure depth of nested brackets.
+        :param result_list: list with converted items of outer level.
+        """
+        super()._open_nested(result_list)
+        self.depth += 1
+        self.profile.max_depth = max(self.profile.max_depth, self.depth)
+
+    def _close_nested(self, result_list, operand):
+        """
+        :param result_list: list with converted items of outer level.
+        :param operand: Node or list of nodes with function arguments.
+        """
+        self.depth -= 1
+        super()._close_nested(result_list, operand)
+
+    def _convert_number(self, num_string):
+        """
+        :param num_string: str(string representation of number of args).
+        :return: Constant or list of function args.
+        """
+        return self.profile.measure('convert', super()._convert_number,
+                                    num_string)
+
+    def _import_functions(self, item):
+        """
+        :param item: str(Python object name).
+        :return: callable, Constant or Variable.
+        """
+        return self.profile.measure('lookup', super()._import_functions,
+                                    item)
+
+    def calculate_exp(self, exp_list):
+        """
+        :param exp_list: list with operands and operators.
+        :return: Node or list of nodes.
+        """
+        return self.profile.measure('reduce', super().calculate_exp,
+                                    exp_list)
+
+    def _apply_operator(self, func, left, right):
+        """
+        Count reductions of operators.
+        :param func: function from 'settings.MATH_MAP'.
+        :param left: left operand.
+        :param right: right operand.
+        :return: BinaryOp node.
+        """
+        self.profile.reductions += 1
+        return super()._apply_operator(func, left, right)
+
+    def _check_cost(self, root):
+        """
+        :param root: Node.
+        """
+        self.profile.measure('cost', super()._check_cost, root)
+
+    def _optimize(self, root):
+        """
+        :param root: Node.
+        :return: tuple(optimized Node, OptimizationStats).
+        """
+        return self.profile.measure('optimize', super()._optimize, root)
+
+
+def _count_calls(root, profile):
+    """
+    Rebuild tree with functions counting their calls.
+    :param root: Node.
+    :param profile: Profile instance.
+    :return: Node.
+    """
+    def wrap(node, children):
+        if isinstance(node, nodes.Call):
+            return nodes.Call(profile.counted(node.func), children)
+        if all(new is old for new, old in zip(children, node.children())):
+            return node
+        return node.rebuild(children)
+    return nodes.transform(root, wrap)
+
+
+def profile(expression, modules=None, callback=None, **bindings):
+    """
+    Compile and evaluate expression recording timings and counters. Cache of
+    compiled expressions isn't used so compilation is always measured.
+    Callback receives profile even if compilation or evaluation fails.
+    :param expression: str(expression string).
+    :param modules: iterable with names of custom modules.
+    :param callback: callable receiving finished Profile or None.
+    :param bindings: values of parameters.
+    :return: tuple(result of expression calculations, Profile).
+    """
+    report = Profile(expression, callback)
+    try:
+        compiled = ProfilingCompiler(report, modules).compile(expression)
+        counted = CompiledExpression(
+            compiled.expression, compiled.modules,
+            _count_calls(compiled.root, report), compiled.parameters,
+            compiled.optimization)
+        result = report.measure('evaluate',
+                                lambda: counted.evaluate(**bindings))
+    finally:
+        report.finish()
+    return result, report
@@ -0,0 +1,216 @@
+"""
+Module contains flat representation of compiled expression. Tree of nodes is
+assembled into register program: constant pool, names of parameters and one
+flat tuple of instructions. Registers are filled with constants, then with
+values of parameters, and every instruction appends its result as a new
+register, so evaluation is a single loop without recursion, method calls per
+node or string comparisons. Subexpressions shared between several parents
+are calculated once because their register is read several times.
+Contains classes:
+- Program;
+Contains functions:
+- assemble;
+"""
+import sys
+import pycalc.tools.nodes as nodes
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+# Opcodes of instructions. Every instruction takes 'WIDTH' items of code:
+# opcode, function and two operands which are registers of arguments or,
+# for calls with other number of arguments and sequences, tuple of registers
+# and unused zero.
+OPERATOR = 0
+CALL2 = 1
+CALL1 = 2
+CALLN = 3
+SEQUENCE = 4
+WIDTH = 4
+
+
+class Program:
+    """
+    Immutable register program of compiled expression.
+    """
+    __slots__ = ('_constants', '_names', '_code', '_result')
+
+    def __init__(self, constants, names, code, result):
+        """
+        :param constants: tuple with constant pool.
+        :param names: tuple with names of parameters used by the program.
+        :param code: flat tuple of instructions.
+        :param result: int(register with result).
+        """
+        self._constants = constants
+        self._names = names
+        self._code = code
+        self._result = result
+
+    @property
+    def constants(self):
+        """
+        :return: tuple with constant pool.
+        """
+        return self._constants
+
+    @property
+    def names(self):
+        """
+        :return: tuple with names of parameters used by the program.
+        """
+        return self._names
+
+    @property
+    def code(self):
+        """
+        :return: flat tuple of instructions.
+        """
+        return self._code
+
+    @property
+    def result(self):
+        """
+        :return: int(register with result).
+        """
+        return self._result
+
+    def __len__(self):
+        """
+        :return: int(number of instructions).
+        """
+        return len(self._code) // WIDTH
+
+    def run(self, env):
+        """
+        Calculate program with values of parameters.
+        :param env: mapping with values of parameters.
+        :return: result of expression calculations.
+        """
+        regs = list(self._constants)
+        if self._names:
+            try:
+                regs.extend(map(env.__getitem__, self._names))
+            except KeyError as err:
+                raise PyCalcBaseException('Value of variable wasn\'t '
+                                          'provided', err.args[0])
+        if not self._code:
+            return regs[self._result]
+        push = regs.append
+        code = iter(self._code)
+        opcode = None
+        try:
+            for opcode, func, left, right in zip(code, code, code, code):
+                if opcode <= CALL2:
+                    push(func(regs[left], regs[right]))
+                elif opcode == CALL1:
+                    push(func(regs[left]))
+                elif opcode == CALLN:
+                    push(func(*[regs[indx] for indx in left]))
+                else:
+                    push([regs[indx] for indx in left])
+        except TypeError:
+            if opcode == OPERATOR:
+                raise
+            raise PyCalcBaseException('Your function have another signature.')
+        return regs[self._result]
+
+    def to_tree(self):
+        """
+        Restore tree of nodes from the program. Results used several times
+        become 'Shared' nodes, every use of parameter gets its own 'Variable'
+        node as in original tree.
+        :return: Node.
+        """
+        regs = [nodes.Constant(value) for value in self._constants]
+        regs.extend(self._names)
+        uses = [0] * (len(regs) + len(self))
+        uses[self._result] += 1
+        instructions = list(zip(*[iter(self._code)] * WIDTH))
+        for opcode, func, left, right in instructions:
+            for indx in (left, right) if opcode <= CALL2 else \
+                    (left,) if opcode == CALL1 else left:
+                uses[indx] += 1
+
+        def read(indx):
+            if isinstance(regs[indx], str):
+                return nodes.Variable(regs[indx])
+            return regs[indx]
+
+        for opcode, func, left, right in instructions:
+            if opcode == OPERATOR:
+                node = nodes.BinaryOp(func, read(left), read(right))
+            elif opcode == CALL2:
+                node = nodes.Call(func, (read(left), read(right)))
+            elif opcode == CALL1:
+                node = nodes.Call(func, (read(left),))
+            elif opcode == CALLN:
+                node = nodes.Call(func, [read(indx) for indx in left])
+            else:
+                node = nodes.Sequence([read(indx) for indx in left])
+            if uses[len(regs)] > 1:
+                node = nodes.Shared(node)
+            regs.append(node)
+        return read(self._result)
+
+    def footprint(self):
+        """
+        Estimate memory used by the program. Functions are shared with other
+        expressions and aren't counted.
+        :return: int(size in bytes).
+        """
+        size = sys.getsizeof(self) + sys.getsizeof(self._constants) + \
+            sys.getsizeof(self._names) + sys.getsizeof(self._code)
+        size += sum(sys.getsizeof(value) for value in self._constants)
+        size += sum(sys.getsizeof(item) for item in self._code
+                    if isinstance(item, tuple))
+        return size
+
+    def __repr__(self):
+        return 'Program({} constants, {} parameters, {} instructions)'.format(
+            len(self._constants), len(self._names), len(self))
+
+
+def assemble(root):
+    """
+    Turn tree of nodes into register program. Every distinct constant node
+    gets its register in constant pool, every parameter gets one register
+    whatever number of times it's used.
+    :param root: Node.
+    :return: Program.
+    """
+    constants = []
+    names = []
+    for node in nodes.walk(root):
+        if isinstance(node, nodes.Constant):
+            constants.append(node)
+        elif isinstance(node, nodes.Variable) and node.name not in names:
+            names.append(node.name)
+    registers = {id(node): indx for indx, node in enumerate(constants)}
+    parameters = {name: indx for indx, name in enumerate(names,
+                                                          len(constants))}
+    code = []
+
+    def emit(node, children):
+        if isinstance(node, nodes.Constant):
+            return registers[id(node)]
+        if isinstance(node, nodes.Variable):
+            return parameters[node.name]
+        if isinstance(node, nodes.Shared):
+            return children[0]
+        if isinstance(node, nodes.BinaryOp):
+            code.extend((OPERATOR, node.func, children[0], children[1]))
+        elif isinstance(node, nodes.Call) and len(children) == 2:
+            code.extend((CALL2, node.func, children[0], children[1]))
+        elif isinstance(node, nodes.Call) and len(children) == 1:
+            code.extend((CALL1, node.func, children[0], 0))
+        elif isinstance(node, nodes.Call):
+            code.extend((CALLN, node.func, tuple(children), 0))
+        elif isinstance(node, nodes.Sequence):
+            code.extend((SEQUENCE, None, tuple(children), 0))
+        else:
+            raise PyCalcBaseException('Unknown node', node)
+        return len(constants) + len(names) + len(code) // WIDTH - 1
+
+    result = nodes.transform(root, emit)
+    return Program(tuple(node.value for node in constants), tuple(names),
+                   tuple(code), result)
@@ -0,0 +1,126 @@
+"""
+Module contains interactive session of the calculator. Custom modules are
+imported and symbol table is filled once when session starts, compiled
+expressions stay in process-wide cache for the whole session. Results of
+earlier lines are reused by later ones through '_' and named assignments
+without being calculated again.
+Contains classes:
+- Session;
+Contains functions:
+- run_repl;
+"""
+import re
+import sys
+import time
+from pycalc.tools.compiler import compile_expression
+from pycalc.tools.symbols import symbol_table
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+PROMPT = '>>> '
+# Name of the last result in lines and name of its parameter. Single '_'
+# doesn't look like a name to calculator, so it's renamed before compilation.
+LAST = '_'
+LAST_PARAMETER = '__last__'
+# Single '=' after name, comparison '==' isn't an assignment.
+_ASSIGNMENT = re.compile(r'\s*([^\W\d]\w*)\s*=(?!=)(.*)')
+_LAST = re.compile(r'(?<![\w.])_(?!\w)')
+# Names in expression, letters after digits or dots aren't names.
+_NAME = re.compile(r'(?<![\w.])[^\W\d]\w*')
+
+
+class Session:
+    """
+    State of interactive session: names of custom modules and results
+    stored under names.
+    """
+    def __init__(self, modules=None, memoize=False):
+        """
+        Import all modules at once, so the first line isn't slower than
+        others.
+        :param modules: iterable with names of custom modules.
+        :param memoize: boolean, keep results of pure functions between
+                        lines.
+        """
+        self.modules = tuple(modules or ())
+        self.memoize = memoize
+        symbol_table(self.modules + ('math', 'builtins')).load()
+        self.names = {}
+
+    def execute(self, line):
+        """
+        Evaluate line of the session. Line 'name = expression' stores result
+        under the name, every result is also stored as '_'. Stored results
+        are parameters of compiled expressions and take precedence over
+        names from modules. Only stored names used by expression are
+        declared, so new assignments don't change cache keys of expressions
+        which don't use them.
+        :param line: str(expression or assignment).
+        :return: tuple(str(assigned name) or None, result of expression).
+        """
+        match = _ASSIGNMENT.fullmatch(line)
+        name, expression = match.groups() if match else (None, line)
+        expression = _LAST.sub(LAST_PARAMETER, expression)
+        if LAST_PARAMETER in expression and LAST_PARAMETER not in self.names:
+            raise PyCalcBaseException('Nothing was calculated before "_"')
+        used = set(_NAME.findall(expression))
+        compiled = compile_expression(expression, self.modules,
+                                      sorted(used.intersection(self.names)),
+                                      memoize=self.memoize)
+        result = compiled.evaluate(**self.names)
+        self.names[LAST_PARAMETER] = result
+        if name is not None and name != LAST:
+            self.names[name] = result
+        return name, result
+
+    def run_line(self, line):
+        """
+        Execute line and format its result with time of compilation and
+        evaluation. Errors are formatted too, so they don't end the session.
+        :param line: str(expression or assignment).
+        :return: str(output line) or None for blank line.
+        """
+        if not line.strip():
+            return None
+        start = time.perf_counter()
+        try:
+            name, result = self.execute(line)
+        except PyCalcBaseException as err:
+            return err.message
+        except Exception as err:
+            return PyCalcBaseException(str(err) or type(err).__name__).message
+        elapsed = time.perf_counter() - start
+        if name is not None:
+            result = '{} = {}'.format(name, result)
+        return '{}  # {:.3f} ms'.format(result, elapsed * 1000)
+
+
+def run_repl(modules=None, memoize=False):
+    """
+    Read lines from standard input until its end and print their results.
+    Prompt is shown only for terminal, so session may be fed from pipe.
+    Interrupt cancels current line only.
+    :param modules: iterable with names of custom modules.
+    :param memoize: boolean, keep results of pure functions between lines.
+    """
+    session = Session(modules, memoize)
+    prompt = ''
+    if sys.stdin.isatty():
+        prompt = PROMPT
+        try:
+            # Line editing and history of 'input'.
+            import readline  # noqa: F401
+        except ImportError:
+            pass
+    while True:
+        try:
+            output = session.run_line(input(prompt))
+        except EOFError:
+            break
+        except KeyboardInterrupt:
+            print('\nKeyboardInterrupt')
+            continue
+        if output is not None:
+            print(output)
+    if prompt:
+        print()
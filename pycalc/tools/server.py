@@ -0,0 +1,222 @@
+"""
+Module contains evaluation daemon listening on Unix socket. Daemon keeps
+imported modules, symbol tables and cache of compiled expressions warm
+between requests of any number of clients.
+Protocol is line based: every line sent by client is an expression and
+server replies with one line with its result or error message in the same
+order. Client may send many lines without waiting for replies. Line
+':modules a,b' isn't an expression: server replies 'OK' if it runs with
+exactly these custom modules and error otherwise, so clients never get
+results computed with other modules. Expressions are evaluated on thread
+pool, slow expression of one client doesn't stop the others.
+Contains classes:
+- EvaluationServer;
+Contains functions:
+- serve;
+"""
+import asyncio
+import os
+import signal
+import socket
+import stat
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pycalc.tools.batch import BatchEvaluator
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+# Number of bytes read from client at once, all complete lines from it are
+# evaluated together and replies are sent with single write.
+READ_CHUNK = 2 ** 16
+# Maximal length of single line in bytes.
+MAX_LINE = 2 ** 20
+# Number of threads evaluating expressions of different clients.
+WORKERS = 4
+# Prefix of line asking which custom modules server runs with.
+MODULES_COMMAND = ':modules '
+
+
+def _remove_stale(path):
+    """
+    Remove socket file left by server which isn't running anymore.
+    :param path: str(path to socket file).
+    """
+    try:
+        mode = os.stat(path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise PyCalcBaseException('Can\'t serve on existing file', path)
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(path)
+    except ConnectionRefusedError:
+        os.unlink(path)
+        return
+    finally:
+        probe.close()
+    raise PyCalcBaseException('Server is already running', path)
+
+
+class EvaluationServer:
+    """
+    Asyncio server evaluating expressions from connected clients on thread
+    pool. Every thread has its own 'BatchEvaluator', compiled expressions
+    are shared through process-wide cache.
+    """
+    def __init__(self, path, modules=None, workers=WORKERS):
+        """
+        :param path: str(path to socket file).
+        :param modules: iterable with names of custom modules.
+        :param workers: int(number of evaluating threads).
+        """
+        self.path = path
+        # Modules are imported here, so wrong ones stop server at once.
+        self.evaluator = BatchEvaluator(modules)
+        self.modules = self.evaluator.modules
+        self.workers = workers
+        self.executor = None
+        self.server = None
+        self._stopped = None
+        self._local = threading.local()
+
+    async def start(self):
+        """
+        Start listening on socket, stale socket file is replaced.
+        """
+        _remove_stale(self.path)
+        self._stopped = asyncio.Event()
+        self.executor = ThreadPoolExecutor(self.workers,
+                                           thread_name_prefix='pycalc')
+        self.server = await asyncio.start_unix_server(self.handle,
+                                                      path=self.path)
+
+    def stop(self):
+        """
+        Ask running server to stop. Must be called from the event loop.
+        """
+        self._stopped.set()
+
+    async def run(self):
+        """
+        Serve clients until 'stop' is called, then close socket and remove
+        its file.
+        """
+        await self.start()
+        try:
+            await self._stopped.wait()
+        finally:
+            self.server.close()
+            await self.server.wait_closed()
+            self.executor.shutdown(wait=False)
+            try:
+                os.unlink(self.path)
+            except FileNotFoundError:
+                pass
+
+    def reply(self, lines):
+        """
+        Evaluate lines of one read and join replies.
+        :param lines: list of bytes with expressions.
+        :return: bytes with replies.
+        """
+        results = []
+        for line in lines:
+            line = line.decode('utf-8', 'replace').rstrip('\r')
+            if line.startswith(MODULES_COMMAND):
+                results.append(self.check_modules(line))
+            else:
+                results.append(self.evaluate(line))
+        return ('\n'.join(results) + '\n').encode('utf-8')
+
+    def check_modules(self, line):
+        """
+        Compare custom modules requested by client with modules of server.
+        :param line: str(command with comma separated names of modules).
+        :return: str('OK' or error message).
+        """
+        names = line[len(MODULES_COMMAND):].strip()
+        modules = tuple(names.split(',')) if names else ()
+        if modules == self.modules:
+            return 'OK'
+        return PyCalcBaseException('Server runs with other modules',
+                                   ','.join(self.modules)).message
+
+    def _evaluator(self):
+        """
+        :return: BatchEvaluator of current thread.
+        """
+        evaluator = getattr(self._local, 'evaluator', None)
+        if evaluator is None:
+            evaluator = self._local.evaluator = BatchEvaluator(self.modules)
+        return evaluator
+
+    def evaluate(self, expression):
+        """
+        Evaluate single expression so that nothing it does stops the server
+        shared by other clients, e.g. 'exit(3)' gets error reply instead.
+        :param expression: str(expression string).
+        :return: str(result or error message).
+        """
+        try:
+            return self._evaluator().evaluate(expression)
+        except KeyboardInterrupt:
+            raise
+        except SystemExit:
+            return PyCalcBaseException('Nice try, but server keeps '
+                                       'running').message
+        except BaseException as err:
+            return PyCalcBaseException(str(err) or
+                                       type(err).__name__).message
+
+    async def handle(self, reader, writer):
+        """
+        Serve single client until it closes connection. Line which isn't
+        finished at the end of input is evaluated as well. Lines are
+        evaluated on thread pool, so event loop keeps serving other clients.
+        :param reader: asyncio.StreamReader.
+        :param writer: asyncio.StreamWriter.
+        """
+        loop = asyncio.get_running_loop()
+        pending = b''
+        try:
+            while True:
+                data = await reader.read(READ_CHUNK)
+                if not data:
+                    break
+                lines = (pending + data).split(b'\n')
+                pending = lines.pop()
+                if len(pending) > MAX_LINE:
+                    writer.write(PyCalcBaseException(
+                        'Line is too long').message.encode('utf-8') + b'\n')
+                    pending = b''
+                    break
+                if len(lines) > 0:
+                    writer.write(await loop.run_in_executor(
+                        self.executor, self.reply, lines))
+                    await writer.drain()
+            if len(pending) > 0:
+                writer.write(await loop.run_in_executor(
+                    self.executor, self.reply, [pending]))
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+def serve(path, modules=None):
+    """
+    Run evaluation server until SIGINT or SIGTERM is received.
+    :param path: str(path to socket file).
+    :param modules: iterable with names of custom modules.
+    """
+    server = EvaluationServer(path, modules)
+
+    async def run():
+        loop = asyncio.get_running_loop()
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(signum, server.stop)
+        await server.run()
+
+    asyncio.run(run())
@@ -17,3 +17,36 @@ MATH_MAP = dict(zip(MATH_OPERATORS, ((op.add, 10), (op.sub, 10), (op.mul, 15),
                                      (op.eq, 5), (op.ne, 5), (op.ge, 5),
                                      (op.gt, 5))))
 TOTAL_LIST = OPEN_SEQ + CLOSE_SEQ + MATH_OPERATORS
+
+# Default limits of process-wide cache of compiled expressions.
+CACHE_CAPACITY = 4096
+CACHE_MEMORY_LIMIT = 64 * 2 ** 20
+
+# Limits of static cost estimation done before evaluation: size of integer
+# results in bits and work in operations on digits, the latter is about a
+# third of second of CPU.
+MAX_RESULT_BITS = 2 ** 23
+MAX_COST = 10 ** 8
+
+# Memoization of pure functions: number of results kept for every function,
+# results bigger than size limit in bytes aren't kept, and names of 'math'
+# functions memoized by default. Lookup takes about 2us, so only functions
+# of big integers pay off, 'gamma' or 'erf' are ten times faster than it.
+MEMO_CAPACITY = 1024
+MEMO_MAX_RESULT_SIZE = 2 ** 16
+MEMO_FUNCTIONS = ('factorial', 'comb', 'perm')
+
+# Persistent cache of compiled expressions: environment variable with path
+# to its directory, cache is off when it isn't set, total size of entries in
+# bytes and average number of stores between checks of the size.
+DISK_CACHE_ENV = 'PYCALC_CACHE_DIR'
+DISK_CACHE_SIZE = 16 * 2 ** 20
+DISK_CACHE_EVICT_EVERY = 16
+
+# Concurrent evaluation of function arguments on thread pool: number of
+# threads (None for default of 'ThreadPoolExecutor'), expected time of call
+# of custom function in microseconds and minimal time of argument worth
+# evaluation on pool. Handing argument over to thread takes about 25us.
+CONCURRENT_WORKERS = None
+CONCURRENT_CALL_COST = 100
+CONCURRENT_MIN_COST = 100
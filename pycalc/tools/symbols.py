@@ -0,0 +1,126 @@
+"""
+Module contains process-wide index of names available in expressions. One
+table is shared by all calculators and compilers working with the same list
+of modules, modules are imported only when a name isn't found in modules
+imported before.
+Contains classes:
+- SymbolTable;
+Contains functions:
+- import_module;
+- symbol_table;
+"""
+import sys
+# Low-level lock is the same as threading.Lock without importing threading.
+from _thread import allocate_lock
+
+
+def import_module(name):
+    """
+    Import module by its name the same way as 'importlib.import_module' for
+    absolute names does, but without importing 'importlib'.
+    :param name: str(module name).
+    :return: module.
+    """
+    __import__(name)
+    return sys.modules[name]
+
+
+class SymbolTable:
+    """
+    Mapping from names to objects of modules in order of their precedence:
+    custom modules, then 'math', then 'builtins'. Table can't be changed
+    from outside, it's only filled with names of modules being imported.
+    """
+    def __init__(self, modules):
+        """
+        :param modules: tuple with names of modules in order of precedence.
+        """
+        self._modules = tuple(modules)
+        self._loaded = 0
+        self._symbols = {}
+        self._lock = allocate_lock()
+
+    @property
+    def modules(self):
+        """
+        :return: tuple with names of modules.
+        """
+        return self._modules
+
+    @property
+    def loaded(self):
+        """
+        :return: tuple with names of already imported modules.
+        """
+        return self._modules[:self._loaded]
+
+    def __getitem__(self, name):
+        """
+        Find object by name importing modules one by one until it's found.
+        Names of modules imported earlier take precedence.
+        :param name: str(Python object name).
+        :return: attribute of module with requested name.
+        """
+        try:
+            return self._symbols[name]
+        except KeyError:
+            pass
+        with self._lock:
+            while name not in self._symbols and \
+                    self._loaded < len(self._modules):
+                self._import_next()
+        return self._symbols[name]
+
+    def load(self):
+        """
+        Import all modules of the table at once, so later lookups don't
+        import anything.
+        """
+        with self._lock:
+            while self._loaded < len(self._modules):
+                self._import_next()
+
+    def _import_next(self):
+        """
+        Import next module and add its names which aren't taken by modules
+        imported earlier. Must be called with the lock held.
+        """
+        lib = import_module(self._modules[self._loaded])
+        for key, value in vars(lib).items():
+            self._symbols.setdefault(key, value)
+        self._loaded += 1
+
+    def __contains__(self, name):
+        """
+        :param name: str(Python object name).
+        :return: boolean.
+        """
+        try:
+            self[name]
+        except KeyError:
+            return False
+        return True
+
+    def __repr__(self):
+        return 'SymbolTable({!r})'.format(self._modules)
+
+
+_tables = {}
+_tables_lock = allocate_lock()
+
+
+def symbol_table(modules):
+    """
+    Get table shared by all users of the same list of modules.
+    :param modules: iterable with names of modules in order of precedence.
+    :return: SymbolTable instance.
+    """
+    key = tuple(modules)
+    try:
+        return _tables[key]
+    except KeyError:
+        pass
+    with _tables_lock:
+        if key not in _tables:
+            _tables[key] = SymbolTable(key)
+        return _tables[key]
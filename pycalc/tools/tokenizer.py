@@ -0,0 +1,56 @@
+"""
+This module splits expression string into tokens in a single pass. Multiple
+characters operators are recognized by longest match, positions of tokens
+are kept as offsets into original string.
+Contains functions:
+- tokenize;
+"""
+import re
+import pycalc.tools.settings as rules
+
+
+OPEN = 'open'
+CLOSE = 'close'
+OPERATOR = 'operator'
+ATOM = 'atom'
+
+
+def _build_pattern():
+    """
+    Create regular expression with alternatives for every token kind. Longer
+    operators are placed first so '**' is never split into two '*'.
+    :return: compiled regular expression.
+    """
+    operators = sorted(rules.MATH_OPERATORS, key=len, reverse=True)
+    special = set(''.join(rules.TOTAL_LIST))
+    return re.compile('(?P<{}>{})|(?P<{}>{})|(?P<{}>{})|(?P<{}>[^{}]+)'.format(
+        OPEN, '|'.join(map(re.escape, rules.OPEN_SEQ)),
+        CLOSE, '|'.join(map(re.escape, rules.CLOSE_SEQ)),
+        OPERATOR, '|'.join(map(re.escape, operators)),
+        ATOM, re.escape(''.join(sorted(special)))))
+
+
+_PATTERN = _build_pattern()
+
+
+def tokenize(exp_string):
+    """
+    Split expression string into tokens. Everything between brackets and
+    operators is an atom (number, name or function arguments separated with
+    commas), atoms are stripped and whitespace-only atoms are skipped.
+    :param exp_string: str(string with expression).
+    :return: list of tuples(<token kind>, <token text>, <start offset>).
+    """
+    tokens = []
+    for match in _PATTERN.finditer(exp_string):
+        kind = match.lastgroup
+        text = match.group()
+        start = match.start()
+        if kind == ATOM:
+            stripped = text.lstrip()
+            start += len(text) - len(stripped)
+            text = stripped.rstrip()
+            if not text:
+                continue
+        tokens.append((kind, text, start))
+    return tokens
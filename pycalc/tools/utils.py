@@ -1,20 +1,20 @@
 """
 This module consists of auxiliary tools for main calculator modules.
 Includes functions:
-- sorting_function;
+- precedes;
 """
 import pycalc.tools.settings as rules
 
 
-def sorting_function(exp_block):
+def precedes(stacked, incoming):
     """
-    Intended to sort mathematical operators by their priority in descending
-    order. Passed as argument to 'sorted' function.
-    :param exp_block: tuple(<index in list>, tuple(<function>, <priority>).
-    :return: function priority with reversed sign. If function is 'pow' take
-             its position in list in account.
+    Decide if operator already waiting on the stack must be applied before
+    incoming one is put on the stack. Operators with equal priority are
+    applied from left to right except power which is right-associative.
+    :param stacked: tuple(<function>, <priority>) from the stack.
+    :param incoming: tuple(<function>, <priority>) from expression.
+    :return: boolean.
     """
-    if exp_block[1][1] == rules.MATH_MAP['**'][1]:
-        return -exp_block[1][1] - exp_block[0]
-    else:
-        return -exp_block[1][1]
+    if stacked[1] == incoming[1]:
+        return incoming[1] != rules.MATH_MAP['**'][1]
+    return stacked[1] > incoming[1]
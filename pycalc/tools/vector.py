@@ -0,0 +1,166 @@
+"""
+Module contains vectorized backend which evaluates compiled expression over
+whole NumPy arrays bound to variable names. Operators from
+'settings.MATH_MAP' become elementwise array operations and functions from
+'math' and 'builtins' modules are replaced by NumPy ufuncs. NumPy is an
+optional dependency: install 'pycalc[vector]' to use this module.
+Contains classes:
+- VectorizedExpression;
+Contains functions:
+- vectorize;
+"""
+import builtins
+import math
+import operator as op
+from functools import reduce
+import pycalc.tools.nodes as nodes
+from pycalc.tools.compiler import compile_expression
+from pycalc.tools.exceptions import PyCalcBaseException
+from pycalc.tools.program import assemble
+
+
+# Names of NumPy functions which differ from names in 'math' module.
+MATH_RENAMES = {'asin': 'arcsin', 'acos': 'arccos', 'atan': 'arctan',
+                'atan2': 'arctan2', 'asinh': 'arcsinh', 'acosh': 'arccosh',
+                'atanh': 'arctanh', 'pow': 'power'}
+# Functions of 'math' module with the same names but different semantics.
+MATH_EXCLUDED = {'remainder'}
+# Mapping from operator functions to NumPy ufuncs names.
+OPERATOR_NAMES = {op.add: 'add', op.sub: 'subtract', op.mul: 'multiply',
+                  op.truediv: 'true_divide', op.mod: 'mod',
+                  op.floordiv: 'floor_divide', op.lt: 'less',
+                  op.le: 'less_equal', op.eq: 'equal', op.ne: 'not_equal',
+                  op.ge: 'greater_equal', op.gt: 'greater'}
+
+# Lazily filled mapping from scalar functions to vectorized ones.
+_vector_funcs = {}
+
+
+def _numpy():
+    """
+    Import NumPy on demand.
+    :return: numpy module.
+    """
+    try:
+        import numpy
+    except ImportError:
+        raise PyCalcBaseException('NumPy is required for vectorized '
+                                  'evaluation, install "pycalc[vector]"')
+    return numpy
+
+
+def _vector_functions():
+    """
+    Build mapping from functions of 'operator', 'math' and 'builtins' modules
+    to their vectorized equivalents once.
+    :return: dict(<scalar function>: <vectorized function>).
+    """
+    if len(_vector_funcs) > 0:
+        return _vector_funcs
+    numpy = _numpy()
+    for func, name in OPERATOR_NAMES.items():
+        _vector_funcs[func] = getattr(numpy, name)
+    for name, func in vars(math).items():
+        vector_func = getattr(numpy, MATH_RENAMES.get(name, name), None)
+        if callable(func) and name not in MATH_EXCLUDED and \
+                isinstance(vector_func, numpy.ufunc):
+            _vector_funcs[func] = vector_func
+
+    def power(base, exponent):
+        try:
+            return numpy.power(base, exponent)
+        except ValueError:
+            # Integers to negative integer powers.
+            return numpy.float_power(base, exponent)
+
+    def log(value, base=None):
+        if base is None:
+            return numpy.log(value)
+        return numpy.log(value) / numpy.log(base)
+
+    _vector_funcs.update({
+        op.pow: power, math.pow: power, builtins.pow: power, math.log: log,
+        builtins.abs: numpy.absolute, builtins.round: numpy.round,
+        builtins.min: lambda *args: reduce(numpy.minimum, args),
+        builtins.max: lambda *args: reduce(numpy.maximum, args)})
+    return _vector_funcs
+
+
+class VectorizedExpression:
+    """
+    Compiled expression converted to register program calling vectorized
+    functions. Conversion happens once and neither conversion nor evaluation
+    is recursive, so deeply nested expressions work too.
+    """
+    def __init__(self, compiled):
+        """
+        Replace every function of compiled expression by vectorized one.
+        :param compiled: CompiledExpression instance.
+        """
+        self.compiled = compiled
+        self._numpy = _numpy()
+        self._funcs = _vector_functions()
+        self.program = assemble(self._convert(compiled.root))
+
+    @property
+    def parameters(self):
+        """
+        :return: tuple with names of parameters.
+        """
+        return self.compiled.parameters
+
+    def evaluate(self, **arrays):
+        """
+        Evaluate expression over arrays bound to parameter names. Scalars
+        are broadcast as usual in NumPy.
+        :param arrays: values of parameters (arrays, lists or scalars).
+        :return: numpy.ndarray or scalar.
+        """
+        env = {name: self._numpy.asarray(value)
+               for name, value in arrays.items()}
+        return self.program.run(env)
+
+    def _vectorized(self, func):
+        """
+        Find vectorized version of function. Custom modules may provide
+        NumPy ufuncs which are used as is.
+        :param func: callable from compiled expression.
+        :return: vectorized callable.
+        """
+        if isinstance(func, self._numpy.ufunc):
+            return func
+        try:
+            return self._funcs[func]
+        except (KeyError, TypeError):
+            raise PyCalcBaseException('Function has no vectorized form',
+                                      getattr(func, '__name__', func))
+
+    def _convert(self, root):
+        """
+        Replace functions of operators and calls by vectorized ones.
+        :param root: Node.
+        :return: Node.
+        """
+        def convert(node, children):
+            if isinstance(node, nodes.BinaryOp):
+                return nodes.BinaryOp(self._vectorized(node.func), *children)
+            if isinstance(node, nodes.Call):
+                return nodes.Call(self._vectorized(node.func), children)
+            if all(new is old for new, old in zip(children,
+                                                    node.children())):
+                return node
+            return node.rebuild(children)
+        return nodes.transform(root, convert)
+
+
+def vectorize(expression, variables=None, modules=None):
+    """
+    Compile expression with parameters for evaluation over arrays.
+    :param expression: str(expression string).
+    :param variables: iterable with names of variables declared in advance,
+                      other free names become parameters as well.
+    :param modules: iterable with names of custom modules.
+    :return: VectorizedExpression instance.
+    """
+    return VectorizedExpression(compile_expression(expression, modules,
+                                                   variables))
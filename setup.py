@@ -21,12 +21,17 @@ setup(
         'Topic :: Utilities',
         'Operating System :: POSIX :: Linux',
         'License :: Other/Proprietary License',
-        'Programming Language :: Python :: 3.6',
+        'Programming Language :: Python :: 3',
+        'Programming Language :: Python :: 3 :: Only',
+        'Programming Language :: Python :: 3.9',
     ],
+    # 'math.comb', 'math.perm' and 'math.lcm' are used by cost estimation
+    # and memoization.
+    python_requires='>=3.9',
     keywords='math calculator cli',
     packages=find_packages(),
+    extras_require={'vector': ['numpy']},
     project_urls={'Source': 'https://git.epam.com/'
                             'Raman_Siamionau/python-test-task'},
-    entry_points={'console_scripts':
-                      ['pycalc = pycalc.main:main']},
+    scripts=['bin/pycalc'],
 )
@@ -0,0 +1,119 @@
+"""
+This module contains test cases for asyncio interface from 'aio.py' module.
+"""
+import asyncio
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pycalc.tools.aio import AsyncEvaluator
+from pycalc.tools.exceptions import PyCalcBaseException, EvaluationTimeout
+
+
+class TestWorkerPool(unittest.TestCase):
+    """
+    Collection of test cases for evaluation in own worker processes.
+    """
+    def setUp(self):
+        """
+        Create evaluator with single worker process.
+        """
+        self.evaluator = AsyncEvaluator(['time'], workers=1)
+
+    def tearDown(self):
+        """
+        Kill worker processes.
+        """
+        self.evaluator.close()
+
+    def test_results(self):
+        """
+        Results and errors are returned from worker process.
+        """
+        async def run():
+            return await asyncio.gather(
+                self.evaluator.evaluate('2+2*2'),
+                self.evaluator.evaluate('x^2', x=3),
+                self.evaluator.evaluate('1/0'),
+                self.evaluator.evaluate('1+'), return_exceptions=True)
+
+        results = asyncio.run(run())
+        self.assertEqual(results[:2], [6, 9])
+        self.assertIsInstance(results[2], ZeroDivisionError)
+        self.assertIsInstance(results[3], PyCalcBaseException)
+        self.assertTrue(results[3].message.startswith('ERROR: '))
+        self.assertFalse(results[3].message.startswith('ERROR: ERROR'))
+
+    def test_event_loop_free(self):
+        """
+        Event loop keeps running while worker evaluates expression and sends
+        big result.
+        """
+        async def run():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.ensure_future(tick())
+            await self.evaluator.evaluate('sleep(0.3)')
+            big = await self.evaluator.evaluate('x', x='7' * 2 ** 24)
+            ticker.cancel()
+            return ticks, big
+
+        ticks, big = asyncio.run(run())
+        self.assertGreater(ticks, 5)
+        self.assertEqual(len(big), 2 ** 24)
+
+    def test_timeout(self):
+        """
+        Late worker is killed and replaced, the event loop keeps running.
+        """
+        async def run():
+            ticks = 0
+
+            async def tick():
+                nonlocal ticks
+                while True:
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+
+            ticker = asyncio.ensure_future(tick())
+            with self.assertRaises(EvaluationTimeout) as err:
+                await self.evaluator.evaluate('sleep(10)', timeout=0.2)
+            ticker.cancel()
+            self.assertIn('sleep(10)', err.exception.message)
+            self.assertGreater(ticks, 5)
+            return await self.evaluator.evaluate('1+1')
+
+        start = time.monotonic()
+        self.assertEqual(asyncio.run(run()), 2)
+        self.assertLess(time.monotonic() - start, 5)
+
+
+class TestExecutor(unittest.TestCase):
+    """
+    Collection of test cases for evaluation in provided executor.
+    """
+    def test_concurrency(self):
+        """
+        Semaphore limits number of evaluations at once, late evaluations are
+        reported.
+        """
+        executor = ThreadPoolExecutor(4)
+        evaluator = AsyncEvaluator(['time'], executor=executor,
+                                   max_concurrency=1)
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(*[evaluator.evaluate('sleep(0.05)')
+                                   for _ in range(4)])
+            spent = time.monotonic() - start
+            with self.assertRaises(EvaluationTimeout):
+                await evaluator.evaluate('sleep(0.5)', timeout=0.01)
+            return spent
+
+        self.assertGreaterEqual(asyncio.run(run()), 0.2)
+        executor.shutdown()
@@ -0,0 +1,319 @@
+"""
+This module contains test cases for batch evaluation tools from 'batch.py'
+module.
+"""
+import os
+import tempfile
+import unittest
+import unittest.mock as mock
+from io import BytesIO, StringIO
+import pycalc.tools.batch as batch
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+class TestBatchEvaluator(unittest.TestCase):
+    """
+    Collection of test cases for 'BatchEvaluator' class.
+    """
+    def setUp(self):
+        """
+        Create evaluator with standard modules only.
+        """
+        self.evaluator = batch.BatchEvaluator()
+
+    def tearDown(self):
+        """
+        Remove link to used evaluator.
+        """
+        self.evaluator = None
+
+    def test_evaluate(self):
+        """
+        Results and errors are formatted as strings.
+        """
+        cases = ('2+2*2', '1+', '1/0', 'sqrt(-1)', '1,2', 'exit(3)')
+        res = ('6', 'ERROR: pycalc bet its hat that you\'ve forgotten sth in '
+                    'the end: "1+"',
+               'ERROR: division by zero', 'ERROR: math domain error', '[1, 2]',
+               'ERROR: Nice try, but the batch goes on')
+        for indx in range(len(cases)):
+            with self.subTest(case=cases[indx]):
+                self.assertEqual(self.evaluator.evaluate(cases[indx]),
+                                 res[indx])
+
+    def test_compiler_reused(self):
+        """
+        One compiler compiles all expressions of the batch.
+        """
+        with mock.patch.object(self.evaluator.compiler, 'compile',
+                               wraps=self.evaluator.compiler.compile) as comp:
+            results = list(self.evaluator.evaluate_lines(
+                ['1+2', '1+2', 'pi>3', '10//3']))
+        self.assertEqual(results, ['3', '3', 'True', '3'])
+        self.assertLessEqual(comp.call_count, 3)
+
+    def test_lazy(self):
+        """
+        Lines are evaluated only when results are requested.
+        """
+        lines = iter(['1', '2'])
+        results = self.evaluator.evaluate_lines(lines)
+        self.assertEqual(next(results), '1')
+        self.assertEqual(next(lines), '2')
+
+
+class TestBatchFunctions(unittest.TestCase):
+    """
+    Collection of test cases for reading and writing functions.
+    """
+    def test_read_expressions(self):
+        """
+        Line endings are removed, everything else is kept.
+        """
+        stream = StringIO('1+1\n\n 2 \r\n3')
+        self.assertEqual(list(batch.read_expressions(stream)),
+                         ['1+1', '', ' 2 ', '3'])
+        stream = BytesIO(b'1+1\n\xff2\r\n3')
+        lines = list(batch.read_expressions(stream))
+        self.assertEqual(lines, ['1+1', '\ufffd2', '3'])
+        self.assertEqual(lines[1].number, 2)
+        self.assertNotIsInstance(lines[2], batch.UndecodableLine)
+
+    @mock.patch('pycalc.tools.batch.WRITE_CHUNK', 2)
+    def test_write_results(self):
+        """
+        Results are written in chunks preserving order.
+        """
+        output = mock.Mock()
+        batch.write_results(iter(['1', '2', '3']), output)
+        self.assertEqual([call[0][0] for call in output.write.call_args_list],
+                         ['1\n2\n', '3\n'])
+
+    def test_write_results_error(self):
+        """
+        Results received before error are written anyway.
+        """
+        def results():
+            yield '1'
+            raise KeyboardInterrupt
+
+        output = StringIO()
+        with self.assertRaises(KeyboardInterrupt):
+            batch.write_results(results(), output)
+        self.assertEqual(output.getvalue(), '1\n')
+
+    def test_run_batch_file(self):
+        """
+        Every line of file gives exactly one line of output.
+        """
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'input.txt')
+            with open(path, 'w') as stream:
+                stream.write('1+1\n2**\n\nabs(-3)\n')
+            output = StringIO()
+            batch.run_batch(path, output=output)
+        lines = output.getvalue().splitlines()
+        self.assertEqual(len(lines), 4)
+        self.assertEqual((lines[0], lines[3]), ('2', '3'))
+        self.assertTrue(lines[1].startswith('ERROR:'))
+
+    def test_run_batch_stdin(self):
+        """
+        Dash means standard input.
+        """
+        output = StringIO()
+        with mock.patch('sys.stdin', StringIO('5%3\n')):
+            batch.run_batch('-', ['string'], output)
+        self.assertEqual(output.getvalue(), '2\n')
+        output = StringIO()
+        stdin = mock.Mock(['buffer'], buffer=BytesIO(b'1+1\n\xfe\n3*3\n'))
+        with mock.patch('sys.stdin', stdin):
+            batch.run_batch('-', output=output)
+        results = output.getvalue().splitlines()
+        self.assertEqual(results[0::2], ['2', '9'])
+        self.assertTrue(results[1].startswith('ERROR: Line 2'))
+
+    def test_run_batch_exit(self):
+        """
+        Line exiting interpreter gets error and the rest of standard input
+        is evaluated though 'exit' closes 'sys.stdin'.
+        """
+        output = StringIO()
+        with tempfile.TemporaryFile('w+') as stdin:
+            stdin.write('2\nexit(3)\n4\n')
+            stdin.seek(0)
+            with mock.patch('sys.stdin', stdin):
+                batch.run_batch('-', output=output)
+        self.assertEqual(output.getvalue().splitlines(),
+                         ['2', 'ERROR: Nice try, but the batch goes on', '4'])
+
+    def test_run_batch_missing(self):
+        """
+        Missing files are reported with library exception.
+        """
+        with self.assertRaises(PyCalcBaseException) as err:
+            batch.run_batch('/nonexistent/input.txt', output=StringIO())
+        self.assertIn('ERROR:', err.exception.message)
+
+
+class TestMappedInput(unittest.TestCase):
+    """
+    Collection of test cases for 'MappedInput' class.
+    """
+    def setUp(self):
+        """
+        Create temporary directory for input files.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """
+        Remove temporary directory.
+        """
+        self.directory.cleanup()
+
+    def mapped(self, contents):
+        """
+        :param contents: bytes of input file.
+        :return: MappedInput of file with contents.
+        """
+        path = os.path.join(self.directory.name, 'input.txt')
+        with open(path, 'wb') as stream:
+            stream.write(contents)
+        return batch.MappedInput(path)
+
+    def test_lines(self):
+        """
+        Lines are the same as from text stream: endings are removed and
+        the last line may have no ending.
+        """
+        cases = ((b'1+1\n2\r\n\nsin(0)\n', ['1+1', '2', '', 'sin(0)']),
+                 (b'1\n2', ['1', '2']), (b'', []),
+                 ('\u03c0\n'.encode('utf-8'), ['\u03c0']))
+        for contents, lines in cases:
+            with self.subTest(contents=contents):
+                with self.mapped(contents) as source:
+                    self.assertEqual(list(source.lines()), lines)
+
+    def test_invalid_utf8(self):
+        """
+        Line which isn't valid UTF-8 gets error with its number instead of
+        result, other lines are evaluated in every mode.
+        """
+        with self.mapped(b'1+1\n2\xff\n3*3\n') as source:
+            self.assertEqual(list(source.lines())[1].number, 2)
+            self.assertEqual(list(source.lines(*source.split(3)[1]))[0]
+                             .number, 2)
+            for jobs in (1, 2):
+                with self.subTest(jobs=jobs):
+                    output = StringIO()
+                    batch.run_batch(source.path, output=output, jobs=jobs)
+                    results = output.getvalue().splitlines()
+                    self.assertEqual(results[0::2], ['2', '9'])
+                    self.assertTrue(results[1].startswith('ERROR: Line 2'))
+
+    def test_ranges(self):
+        """
+        Ranges consist of whole lines and cover the whole file.
+        """
+        lines = ['{}*2'.format(num) for num in range(100)]
+        with self.mapped('\n'.join(lines).encode('utf-8')) as source:
+            for size in (1, 7, 64, 10 ** 6):
+                with self.subTest(size=size):
+                    ranges = list(source.ranges(size))
+                    self.assertEqual(ranges[0][0], 0)
+                    self.assertEqual(ranges[-1][1], source.size)
+                    self.assertEqual([line for byte_range in ranges
+                                      for line in source.lines(*byte_range)],
+                                     lines)
+            self.assertEqual(len(source.split(3)), 3)
+            self.assertEqual(len(source.split(1000)), 100)
+
+    def test_evaluate_mapped(self):
+        """
+        Results of byte ranges evaluated by workers are merged in input
+        order, output of parallel mode is the same as sequential one.
+        """
+        lines = ['{}*2'.format(num) for num in range(50)] + ['1+']
+        with self.mapped('\n'.join(lines).encode('utf-8')) as source:
+            results = list(batch.evaluate_mapped(source, jobs=2,
+                                                 range_size=32))
+            self.assertEqual(results[:-1], [str(num * 2)
+                                            for num in range(50)])
+            self.assertTrue(results[-1].startswith('ERROR:'))
+            outputs = []
+            for jobs in (1, 2):
+                output = StringIO()
+                batch.run_batch(source.path, output=output, jobs=jobs)
+                outputs.append(output.getvalue())
+        self.assertEqual(outputs[0], outputs[1])
+        self.assertEqual(outputs[0].splitlines(), results)
+
+
+class TestParallel(unittest.TestCase):
+    """
+    Collection of test cases for evaluation in pool of worker processes.
+    """
+    def test_chunked(self):
+        """
+        Iterable is split into lists of requested size.
+        """
+        self.assertEqual(list(batch.chunked(range(5), 2)),
+                         [[0, 1], [2, 3], [4]])
+        self.assertEqual(list(batch.chunked([], 2)), [])
+
+    def test_evaluate_parallel(self):
+        """
+        Results from workers are merged in input order.
+        """
+        lines = ['{}*2'.format(num) for num in range(50)] + ['1+']
+        results = list(batch.evaluate_parallel(lines, ['string'], jobs=2,
+                                               chunk_size=7))
+        self.assertEqual(results[:-1], [str(num * 2) for num in range(50)])
+        self.assertTrue(results[-1].startswith('ERROR:'))
+
+    @mock.patch('pycalc.tools.batch.ProcessPoolExecutor')
+    def test_bounded_pending(self, mock_pool):
+        """
+        Next chunk isn't read until results of earlier chunks are consumed
+        when limit of chunks in flight is reached.
+        """
+        pool = mock_pool.return_value.__enter__.return_value
+        pool.submit.side_effect = lambda func, chunk: mock.Mock(
+            result=mock.Mock(return_value=chunk))
+        lines = iter(str(num) for num in range(10))
+        results = batch.evaluate_parallel(lines, jobs=1, chunk_size=2,
+                                          max_pending=2)
+        self.assertEqual(next(results), '0')
+        self.assertEqual(pool.submit.call_count, 2)
+        self.assertEqual(list(results), [str(num) for num in range(1, 10)])
+
+    def test_run_batch_jobs(self):
+        """
+        Parallel mode gives the same output as sequential one.
+        """
+        outputs = []
+        for jobs in (1, 3):
+            output = StringIO()
+            with mock.patch('sys.stdin', StringIO('1+1\n2/0\n3^2\n')):
+                batch.run_batch('-', output=output, jobs=jobs)
+            outputs.append(output.getvalue())
+        self.assertEqual(outputs[0], outputs[1])
+
+    def test_run_batch_jobs_exit(self):
+        """
+        Line exiting interpreter in worker process gets error, results of
+        other lines aren't lost.
+        """
+        expected = ['2', 'ERROR: Nice try, but the batch goes on', '4']
+        output = StringIO()
+        with mock.patch('sys.stdin', StringIO('2\nexit(3)\n4\n')):
+            batch.run_batch('-', output=output, jobs=2)
+        self.assertEqual(output.getvalue().splitlines(), expected)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'input.txt')
+            with open(path, 'w') as stream:
+                stream.write('2\nexit(3)\n4\n')
+            output = StringIO()
+            batch.run_batch(path, output=output, jobs=2)
+        self.assertEqual(output.getvalue().splitlines(), expected)
@@ -0,0 +1,80 @@
+"""
+This module contains test cases for 'ExpressionCache' class from 'cache.py'
+module.
+"""
+import unittest
+import unittest.mock as mock
+from pycalc.tools.cache import ExpressionCache, CacheStats
+
+
+class TestExpressionCache(unittest.TestCase):
+    """
+    Collection of test cases for LRU cache behaviour and statistics.
+    """
+    def setUp(self):
+        """
+        Create small cache where size of every value is the value itself.
+        """
+        self.cache = ExpressionCache(capacity=3, memory_limit=100,
+                                     sizeof=lambda value: value)
+
+    def tearDown(self):
+        """
+        Remove link to used cache.
+        """
+        self.cache = None
+
+    def test_hits_and_misses(self):
+        """
+        Factory is called only on misses.
+        """
+        factory = mock.Mock(return_value=10)
+        self.assertEqual(self.cache.get('a', factory), 10)
+        self.assertEqual(self.cache.get('a', factory), 10)
+        self.assertEqual(factory.call_count, 1)
+        self.assertEqual(self.cache.stats(), CacheStats(1, 1, 0, 1, 10))
+
+    def test_capacity_eviction(self):
+        """
+        Least recently used entry is evicted when capacity is exceeded.
+        """
+        for key in 'abc':
+            self.cache.get(key, lambda: 1)
+        self.cache.get('a', lambda: 1)
+        self.cache.get('d', lambda: 1)
+        self.assertNotIn('b', self.cache)
+        self.assertIn('a', self.cache)
+        self.assertEqual(self.cache.stats().evictions, 1)
+        self.assertEqual(len(self.cache), 3)
+
+    def test_memory_eviction(self):
+        """
+        Entries are evicted when total size exceeds memory limit and too big
+        values are not stored at all.
+        """
+        self.cache.get('a', lambda: 60)
+        self.cache.get('b', lambda: 50)
+        self.assertEqual(self.cache.stats().memory, 50)
+        self.assertNotIn('a', self.cache)
+        self.assertEqual(self.cache.get('c', lambda: 200), 200)
+        self.assertNotIn('c', self.cache)
+
+    def test_configure(self):
+        """
+        Shrinking limits evicts entries immediately.
+        """
+        for key in 'abc':
+            self.cache.get(key, lambda: 10)
+        self.cache.configure(capacity=1)
+        self.assertEqual([key for key in 'abc' if key in self.cache], ['c'])
+        self.cache.configure(memory_limit=5)
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.stats().evictions, 3)
+
+    def test_clear(self):
+        """
+        Clear removes entries and resets counters.
+        """
+        self.cache.get('a', lambda: 1)
+        self.cache.clear()
+        self.assertEqual(self.cache.stats(), CacheStats(0, 0, 0, 0, 0))
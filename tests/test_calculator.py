@@ -2,9 +2,13 @@
 This module contains functions intended to verify expected behaviour of the
 'ExpressionCalculator' class.
 """
+import sys
 import unittest
 import unittest.mock as mock
+import pycalc.tools.settings as rules
 from pycalc.tools.calculator import ExpressionCalculator
+from pycalc.tools.parser import ExpressionParser
+from pycalc.tools.utils import precedes
 from pycalc.tools.exceptions import PyCalcBaseException
 
 
@@ -155,37 +159,21 @@ class TestExpressionCalculator(unittest.TestCase):
             self.calc._convert_operator('1 2')
         self.assertIn('ERROR:', err.exception.message)
 
-    @mock.patch('pycalc.tools.calculator.import_module')
-    def test_import_functions(self, mock_import):
+    @mock.patch('pycalc.tools.calculator.symbol_table')
+    def test_import_functions(self, mock_table):
         """
-        Import functions must import modules at first call and search in
-        imported modules for subsequent calls. Also verify that exception is
-        raised when search failed.
+        Import functions must search names in shared symbol table of modules
+        created at first call. Also verify that exception is raised when
+        search failed.
         """
-        mock_module = mock.Mock(foo='spam')
-        empty_mock = mock.Mock(side_effect=KeyError)
-        mock_import.side_effect = [empty_mock, empty_mock, mock_module]
+        mock_table.return_value = {'foo': 'spam'}
         calc = ExpressionCalculator('1', ['1'], ['module'])
         self.assertEqual(calc.custom_module, ['module', 'math', 'builtins'])
         self.assertEqual(calc._import_functions('foo'), 'spam')
-        self.assertEqual(calc.custom_module,
-                         [empty_mock, empty_mock, mock_module])
         with self.assertRaises(PyCalcBaseException) as err:
             calc._import_functions('food')
         self.assertIn('ERROR:', err.exception.message)
-
-    @mock.patch('pycalc.tools.calculator.sorting_function')
-    def test_enumerate_list(self, mock_sort):
-        """
-        Correct work of 'enumerate_list' method crucial for calculations.
-        Check output format and calls to sorting function.
-        """
-        # Simple sort according to operator priority
-        mock_sort.side_effect = lambda val: -val[1][1]
-        inp = [1, ('add', 1), 2, ('pow', 5), 10]
-        result = self.calc._enumerate_list(inp)
-        self.assertEqual(result, [(3, ('pow', 5)), (1, ('add', 1))])
-        self.assertEqual(mock_sort.call_count, 2)
+        mock_table.assert_called_once_with(['module', 'math', 'builtins'])
 
     def test_calc_func_args(self):
         """
@@ -225,21 +213,66 @@ class TestExpressionCalculator(unittest.TestCase):
                 self.assertEqual(self.calc.calculate_exp(case), res[counter])
                 counter += 1
 
+    def test_apply_operator(self):
+        """
+        Operator functions are applied to both operands.
+        """
+        func = mock.Mock(side_effect=lambda first, second: first - second)
+        self.assertEqual(self.calc._apply_operator(func, 3, 1), 2)
+        func.assert_called_once_with(3, 1)
+
     def test_calculate_exp(self):
         """
         Check that method correctly interprets expression and handle exceptions.
         """
         func1 = mock.Mock(side_effect=lambda first, second: first + second)
         func2 = mock.Mock(side_effect=lambda this, other: this * other)
-        inp = ([1, 'func1', 2], [1, 'func1', 2, 'func2', 3], [1, 'func1', 2])
-        mock_enum = mock.Mock(side_effect=([(1, (func1, 1))],
-                                           [(3, (func2, 2)), (1, (func1, 1))],
-                                           [(1, (func1, 1))]))
-        self.calc._enumerate_list = mock_enum
+        inp = ([1, (func1, 1), 2], [1, (func1, 1), 2, (func2, 2), 3])
         res = (3, 7)
-        for indx in range(len(inp) - 2):
+        for indx in range(len(inp)):
             with self.subTest(indx=indx):
                 self.assertEqual(self.calc.calculate_exp(inp[indx]), res[indx])
-        with self.assertRaises(PyCalcBaseException) as err:
-            self.calc.calculate_exp(inp[2])
-        self.assertIn('ERROR:', err.exception.message)
+        for case in ([], [1, (func1, 1)], [1, 2], [(func1, 1), 1],
+                     [1, (func1, 1), (func2, 2), 2]):
+            with self.subTest(case=case):
+                with self.assertRaises(PyCalcBaseException) as err:
+                    self.calc.calculate_exp(case)
+                self.assertIn('ERROR:', err.exception.message)
+
+    def test_reduce_operators(self):
+        """
+        Operators are applied according to priorities and associativity from
+        'settings.MATH_MAP'.
+        """
+        cases = (('2+3*4', 14), ('2*3+4', 10), ('10-4-3', 3),
+                 ('2**3**2', 512), ('2^3*2', 16), ('1<2==1', True),
+                 ('16/4/2', 2.0), ('2*3**2-1', 17), ('7%4//2', 1))
+        parser = ExpressionParser()
+        for expression, result in cases:
+            with self.subTest(expression=expression):
+                calc = ExpressionCalculator(expression,
+                                            parser.parse_input(expression))
+                self.assertEqual(calc.explore_data(calc.exp_list), result)
+
+    def test_long_chain(self):
+        """
+        Long flat chain of operators is reduced in a single pass.
+        """
+        exp_list = [1]
+        for _ in range(20000):
+            exp_list.extend([rules.MATH_MAP['+'], 1])
+        with mock.patch('pycalc.tools.calculator.precedes',
+                        wraps=precedes) as mock_precedes:
+            self.assertEqual(self.calc.calculate_exp(exp_list), 20001)
+        self.assertLess(mock_precedes.call_count, 2 * 20000)
+
+    def test_deep_nesting(self):
+        """
+        Depth of brackets and calls isn't limited by recursion limit.
+        """
+        depth = sys.getrecursionlimit() * 5
+        expression = 'abs(' * depth + '-1' + ')' * depth + \
+            '+' + '(' * depth + '2' + ')' * depth
+        calc = ExpressionCalculator(
+            expression, ExpressionParser().parse_input(expression))
+        self.assertEqual(calc.explore_data(calc.exp_list), 3)
@@ -0,0 +1,95 @@
+"""
+This module contains test cases for code generation backend from
+'codegen.py' module.
+"""
+import math
+import sys
+import unittest
+import unittest.mock as mock
+import pycalc.tools.codegen as codegen
+from pycalc.tools.compiler import compile_expression
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+class TestGenerate(unittest.TestCase):
+    """
+    Collection of test cases for generated functions.
+    """
+    def test_results(self):
+        """
+        Generated functions give the same results as tree of nodes.
+        """
+        cases = ('2+2*2', '2^3^2', '(2^3)^2', '-2**2', '2**-1', '1<2<3',
+                 '1-(2-3)', '10/4/5', '10/(4/5)', '3(2+1)', '-(1+2)',
+                 'log(sin(1))', 'max(1+1, 2, 3)', '-pi', '1,2',
+                 'round(2.567, 2)', '(1<2)==(2<3)', 'inf-1', '7%3//2')
+        for expression in cases:
+            with self.subTest(expression=expression):
+                generated = codegen.generate(expression)
+                self.assertEqual(generated.evaluate(),
+                                 compile_expression(expression).evaluate())
+
+    def test_source(self):
+        """
+        Operators are written with brackets only where they are required,
+        constants without literal form and functions are bound.
+        """
+        source, namespace = codegen.generate_source(
+            compile_expression('(1+x)*2^-1 - sin(inf)', optimize=False))
+        self.assertIn('return (1 + _p0) * 2 ** (-1 * 1) - _f1(_c0)', source)
+        self.assertIs(namespace['_f1'], math.sin)
+        self.assertEqual(namespace['_c0'], math.inf)
+
+    def test_deep_nesting(self):
+        """
+        Deep trees are split into temporary variables.
+        """
+        expression = '(' * 300 + 'x' + '+1)' * 300
+        generated = codegen.generate(expression)
+        self.assertIn('_t0 = ', generated.source)
+        self.assertEqual(generated.evaluate(x=1), 301)
+
+    def test_parameters(self):
+        """
+        Values of parameters are bound by names or by position.
+        """
+        generated = codegen.generate('x**2+y')
+        self.assertEqual(generated.parameters, ('x', 'y'))
+        self.assertEqual(generated.evaluate(x=3, y=1), 10)
+        rows = [{'x': 1, 'y': 2}, (3, 4)]
+        self.assertEqual(list(generated.evaluate_many(rows)), [3, 13])
+        with self.assertRaises(PyCalcBaseException) as err:
+            generated.evaluate(x=1)
+        self.assertIn('"y"', err.exception.message)
+        with self.assertRaises(PyCalcBaseException):
+            list(generated.evaluate_many([(1,)]))
+
+    def test_errors(self):
+        """
+        Errors are reported the same way as by tree of nodes.
+        """
+        with self.assertRaises(PyCalcBaseException) as err:
+            codegen.generate('abs(1, 2)').evaluate()
+        self.assertIn('signature', err.exception.message)
+        with self.assertRaises(TypeError):
+            codegen.generate('(0-1)**0.5 < 1').evaluate()
+
+    def test_errors_not_repeated(self):
+        """
+        Failed call isn't evaluated again to report error.
+        """
+        calls = []
+
+        def func(x):
+            calls.append(x)
+            raise TypeError
+
+        module = type(sys)('pycalc_codegen_module')
+        module.func = func
+        with mock.patch.dict(sys.modules, {'pycalc_codegen_module': module}):
+            generated = codegen.generate('func(x) + 1',
+                                         ['pycalc_codegen_module'])
+            with self.assertRaises(PyCalcBaseException) as err:
+                generated.evaluate(x=2)
+        self.assertIn('signature', err.exception.message)
+        self.assertEqual(calls, [2])
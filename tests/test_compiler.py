@@ -0,0 +1,233 @@
+"""
+This module contains test cases for 'compiler.py' module: compilation of
+expression strings and evaluation of compiled expressions.
+"""
+import unittest
+import unittest.mock as mock
+import math
+import sys
+import pycalc
+import pycalc.tools.nodes as nodes
+from pycalc.tools.compiler import (ExpressionCompiler, CompiledExpression,
+                                   compile_expression, EXPRESSION_CACHE)
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+class TestExpressionCompiler(unittest.TestCase):
+    """
+    Collection of test cases for 'ExpressionCompiler' class.
+    """
+    def setUp(self):
+        """
+        Create compiler with standard modules only.
+        """
+        self.compiler = ExpressionCompiler()
+
+    def tearDown(self):
+        """
+        Remove link to used compiler.
+        """
+        self.compiler = None
+
+    def test_creation(self):
+        """
+        Custom modules precede standard ones and passed list is not changed.
+        """
+        modules = ['string']
+        compiler = ExpressionCompiler(modules)
+        self.assertEqual(compiler.custom_module, ['string', 'math', 'builtins'])
+        self.assertEqual(compiler.modules, ('string',))
+        self.assertEqual(modules, ['string'])
+
+    def test_results(self):
+        """
+        Compiled expressions give the same results as calculator.
+        """
+        cases = (('2+2*2', 6), ('2^3^2', 512), ('-2**2', 4), ('1<2<3', True),
+                 ('10/4', 2.5), ('3(2+1)', 9), ('-(1+2)', -3),
+                 ('log(sin(1))', math.log(math.sin(1))),
+                 ('max(1+1, 2, 3)', 3), ('pow(2, sin(1))', 2 ** math.sin(1)),
+                 ('max(sin(1), cos(1))', math.sin(1)), ('-pi', -math.pi),
+                 ('1,2', [1, 2]), ('round(2.567, 2)', 2.57))
+        for expression, result in cases:
+            with self.subTest(expression=expression):
+                compiled = self.compiler.compile(expression)
+                self.assertEqual(compiled.evaluate(), result)
+
+    def test_tree(self):
+        """
+        Names are resolved and numbers converted during compilation.
+        """
+        root = ExpressionCompiler(optimize=False).compile('sin(pi)+1').root
+        self.assertIsInstance(root, nodes.BinaryOp)
+        self.assertIsInstance(root.left, nodes.Call)
+        self.assertIs(root.left.func, math.sin)
+        self.assertEqual(root.left.args[0].value, math.pi)
+        self.assertEqual(root.right.value, 1)
+
+    def test_errors(self):
+        """
+        Malformed expressions are rejected during compilation.
+        """
+        cases = ('', '1+', '(1', 'foo(1)', 'sin', '1 2', '(1,2)+3', 'sin+1',
+                 '2x')
+        for expression in cases:
+            with self.subTest(expression=expression):
+                with self.assertRaises(PyCalcBaseException) as err:
+                    self.compiler.compile(expression)
+                self.assertIn('ERROR:', err.exception.message)
+
+    def test_deep_nesting(self):
+        """
+        Deeply nested expression is compiled and evaluated without recursion.
+        """
+        depth = sys.getrecursionlimit() * 5
+        expression = 'abs(' * depth + 'x-1' + ')' * depth
+        for optimize in (False, True):
+            with self.subTest(optimize=optimize):
+                compiled = ExpressionCompiler(optimize=optimize).compile(
+                    expression)
+                self.assertEqual(compiled.evaluate(x=-2), 3)
+
+    def test_variables(self):
+        """
+        Declared variables shadow module names and can't be evaluated without
+        values.
+        """
+        compiler = ExpressionCompiler(variables=['x', 'e'])
+        compiled = compiler.compile('x*e+pi')
+        self.assertEqual(compiled.parameters, ('x', 'e'))
+        self.assertIsInstance(compiled.root.left.left, nodes.Variable)
+        self.assertIsInstance(compiled.root.left.right, nodes.Variable)
+        self.assertEqual(compiled.evaluate(x=2, e=3), 6 + math.pi)
+        with self.assertRaises(PyCalcBaseException) as err:
+            compiled.evaluate()
+        self.assertIn('"x"', err.exception.message)
+
+    def test_parameters(self):
+        """
+        Free names become parameters after declared variables in order of
+        their appearance.
+        """
+        compiler = ExpressionCompiler(variables=['z'])
+        compiled = compiler.compile('b*sin(a)+b-z')
+        self.assertEqual(compiled.parameters, ('z', 'b', 'a'))
+        self.assertEqual(compiled.evaluate(a=0, b=2, z=1), 1)
+        self.assertEqual(self.compiler.compile('2+2').parameters, ())
+
+    @mock.patch.dict('pycalc.tools.symbols._tables', clear=True)
+    @mock.patch('pycalc.tools.symbols.import_module')
+    def test_modules_imported_once(self, mock_import):
+        """
+        Compilers share modules imported once for all expressions.
+        """
+        mock_import.side_effect = lambda name: math
+        self.compiler.compile('pi')
+        ExpressionCompiler().compile('e')
+        mock_import.assert_called_once_with('math')
+
+
+class TestCompiledExpression(unittest.TestCase):
+    """
+    Collection of test cases for 'CompiledExpression' class.
+    """
+    def test_immutable(self):
+        """
+        Attributes of compiled expression can't be changed.
+        """
+        compiled = compile_expression('1+1')
+        with self.assertRaises(AttributeError):
+            compiled.expression = '2'
+        with self.assertRaises(AttributeError):
+            del compiled.expression
+        self.assertEqual(compiled.expression, '1+1')
+        self.assertEqual(compiled.modules, ())
+
+    def test_evaluate_repeatedly(self):
+        """
+        Evaluation doesn't touch conversion methods anymore.
+        """
+        compiled = compile_expression('sqrt(16)+1')
+        with mock.patch.object(ExpressionCompiler, '_convert_operator') as conv:
+            self.assertEqual([compiled.evaluate() for _ in range(3)],
+                             [5.0] * 3)
+            conv.assert_not_called()
+
+    def test_optimization(self):
+        """
+        Trees are optimized by default, results of optimization are reported.
+        """
+        compiled = compile_expression('2*pi/360*x', use_cache=False)
+        self.assertEqual(compiled.optimization.folded, 2)
+        self.assertEqual(compiled.optimization.removed, 4)
+        self.assertEqual(compiled.evaluate(x=180), math.pi)
+        compiled = compile_expression('2*pi/360*x', optimize=False)
+        self.assertIsNone(compiled.optimization)
+        self.assertIsNot(compile_expression('1+1'),
+                         compile_expression('1+1', optimize=False))
+
+    def test_evaluate_many(self):
+        """
+        Rows may be mappings or sequences in order of parameters.
+        """
+        compiled = compile_expression('x**2+y')
+        rows = [{'x': 1, 'y': 2}, (3, 4), [0, -1]]
+        self.assertEqual(list(compiled.evaluate_many(rows)), [3, 13, -1])
+        with self.assertRaises(PyCalcBaseException):
+            list(compiled.evaluate_many([(1, 2, 3)]))
+        with self.assertRaises(PyCalcBaseException):
+            list(compiled.evaluate_many([{'x': 1}]))
+
+    def test_public_alias(self):
+        """
+        Function is exported from the package as 'compile'.
+        """
+        self.assertIs(pycalc.compile, compile_expression)
+        self.assertIsInstance(pycalc.compile('1', ['string']),
+                              CompiledExpression)
+
+    def test_footprint(self):
+        """
+        Bigger expressions take more memory.
+        """
+        small = compile_expression('1', use_cache=False).footprint()
+        big = compile_expression('1+2*sin(3)', use_cache=False).footprint()
+        self.assertGreater(small, 0)
+        self.assertGreater(big, small)
+
+
+class TestCompileCache(unittest.TestCase):
+    """
+    Check that 'compile_expression' works through process-wide cache.
+    """
+    def setUp(self):
+        """
+        Start every test with empty cache.
+        """
+        EXPRESSION_CACHE.clear()
+
+    def tearDown(self):
+        """
+        Don't leave test entries in the cache.
+        """
+        EXPRESSION_CACHE.clear()
+
+    def test_cached(self):
+        """
+        Same expression with same modules is compiled once.
+        """
+        first = compile_expression('1+1', ['string'])
+        self.assertIs(compile_expression('1+1', ('string',)), first)
+        self.assertIsNot(compile_expression('1+1'), first)
+        stats = EXPRESSION_CACHE.stats()
+        self.assertEqual((stats.hits, stats.misses, stats.size), (1, 2, 2))
+
+    def test_not_cached(self):
+        """
+        Cache may be bypassed and errors are never cached.
+        """
+        self.assertIsNot(compile_expression('1', use_cache=False),
+                         compile_expression('1', use_cache=False))
+        with self.assertRaises(PyCalcBaseException):
+            compile_expression('1+')
+        self.assertEqual(EXPRESSION_CACHE.stats().size, 0)
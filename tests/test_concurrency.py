@@ -0,0 +1,112 @@
+"""
+This module contains test cases for concurrent evaluation of function
+arguments from 'concurrency.py' module.
+"""
+import math
+import sys
+import threading
+import unittest
+import unittest.mock as mock
+from concurrent.futures import ThreadPoolExecutor
+import pycalc.tools.concurrency as concurrency
+from pycalc.tools.compiler import compile_expression
+from pycalc.tools.concurrency import ConcurrentCall, blocking, call_cost
+from pycalc.tools.memo import MemoizedFunction
+import pycalc.tools.settings as rules
+
+
+class TestConcurrency(unittest.TestCase):
+    """
+    Collection of test cases for 'parallelize' and 'ConcurrentCall'.
+    """
+    def setUp(self):
+        """
+        Create custom module with functions waiting for each other.
+        """
+        self.barrier = threading.Barrier(2, timeout=5)
+        module = type(sys)('pycalc_threads_module')
+
+        def wait(x):
+            self.barrier.wait()
+            return x * 2
+
+        module.wait = wait
+        module.add = lambda *args: sum(args)
+        module.cheap = blocking(lambda x: x, cost=0)
+        patcher = mock.patch.dict(sys.modules,
+                                  {'pycalc_threads_module': module})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def compile(self, expression, concurrent=True):
+        """
+        :param expression: str(expression string).
+        :param concurrent: boolean, concurrent evaluation switch.
+        :return: CompiledExpression instance.
+        """
+        return compile_expression(expression, ['pycalc_threads_module'],
+                                  use_cache=False, concurrent=concurrent)
+
+    def test_concurrent(self):
+        """
+        Expensive arguments run at the same time, otherwise the first one
+        would wait for the second one forever.
+        """
+        compiled = self.compile('add(wait(x), wait(3), 1)')
+        self.assertIsInstance(compiled.program.code[1], ConcurrentCall)
+        self.assertEqual(compiled.program.code[1].forked, (0,))
+        self.assertEqual(compiled.evaluate(x=1), 9)
+        self.assertEqual(compiled.parameters, ('x',))
+
+    def test_results(self):
+        """
+        Concurrent evaluation gives the same results and errors as serial
+        one.
+        """
+        self.barrier = mock.Mock()
+        test_cases = ('add(add(x, 1), add(2, x), 3)', 'add(cheap(x), 1)',
+                      'add(add(sin(x), 2), add(x), x) * 2',
+                      'add(add(add(x), add(2)), add(add(3), add(4)))')
+        for expression in test_cases:
+            with self.subTest(expression=expression):
+                self.assertEqual(self.compile(expression).evaluate(x=0.5),
+                                 self.compile(expression, False).evaluate(
+                                     x=0.5))
+        with self.assertRaises(ZeroDivisionError):
+            self.compile('add(add(1/x), add(2))').evaluate(x=0)
+        with self.assertRaises(ZeroDivisionError):
+            self.compile('add(add(1), add(2/x))').evaluate(x=0)
+
+    def test_threshold(self):
+        """
+        Calls with less than two expensive arguments stay serial.
+        """
+        test_cases = ('add(wait(1), 2)', 'add(cheap(1), cheap(2))',
+                      'add(sin(x), pow(x, 2), factorial(x))',
+                      'wait(add(1))')
+        for expression in test_cases:
+            with self.subTest(expression=expression):
+                code = self.compile(expression).program.code
+                self.assertFalse(any(isinstance(item, ConcurrentCall)
+                                     for item in code))
+        self.assertEqual(call_cost(math.sin), 0)
+        self.assertEqual(call_cost(MemoizedFunction(math.factorial)), 0)
+        self.assertEqual(call_cost(lambda x: x), rules.CONCURRENT_CALL_COST)
+        self.assertEqual(call_cost(blocking(cost=5)(lambda x: x)), 5)
+
+    def test_nested(self):
+        """
+        Nested concurrent calls don't deadlock even with single thread,
+        arguments waiting for it are evaluated by calling thread.
+        """
+        self.barrier = mock.Mock()
+        with mock.patch.object(concurrency, '_executor',
+                               ThreadPoolExecutor(1)) as pool:
+            compiled = self.compile(
+                'add(add(wait(1), wait(2)), add(wait(3), wait(x)))')
+            self.assertEqual(compiled.evaluate(x=4), 20)
+        pool.shutdown()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,130 @@
+"""
+This module contains test cases for static cost estimation from 'cost.py'
+module.
+"""
+import unittest
+from pycalc.tools.compiler import ExpressionCompiler, compile_expression
+from pycalc.tools.cost import estimate, check
+from pycalc.tools.exceptions import CostLimitExceeded
+
+
+class TestCost(unittest.TestCase):
+    """
+    Collection of test cases for estimation of result size and work and for
+    rejection of expressions exceeding limits.
+    """
+    def setUp(self):
+        """
+        Create compiler without estimation to get original trees.
+        """
+        self.compiler = ExpressionCompiler(optimize=False, check_cost=False)
+
+    def tearDown(self):
+        """
+        Remove compiler.
+        """
+        self.compiler = None
+
+    def estimate(self, expression):
+        """
+        :param expression: str(expression string).
+        :return: Estimate of expression tree.
+        """
+        return estimate(self.compiler.compile(expression).root)
+
+    def test_small_values_exact(self):
+        """
+        Small integer results are calculated exactly during estimation.
+        """
+        test_cases = (('1+2*3', 7), ('-(10**7)', -10 ** 7), ('7//2', 3),
+                      ('2 < 3', True))
+        for expression, expected in test_cases:
+            with self.subTest(expression=expression):
+                self.assertEqual(self.estimate(expression).value, expected)
+
+    def test_bounds(self):
+        """
+        Estimated size of big results isn't smaller than real one.
+        """
+        test_cases = ('2**1000 * 3**500', '7**3**5', 'factorial(500)',
+                      'comb(3000, 1000)', 'comb(10**7, 2)',
+                      'perm(1000, 200)', 'isqrt(10**500)',
+                      '(10**300 + 1) // 3', '10**300 % 10**200',
+                      'gcd(2**600, 2**400)', 'abs(-(2**300))')
+        for expression in test_cases:
+            with self.subTest(expression=expression):
+                result = self.estimate(expression)
+                value = compile_expression(expression).evaluate()
+                self.assertTrue(result.integer)
+                self.assertGreaterEqual(result.bits, abs(value).bit_length()
+                                        - 1)
+
+    def test_unknown(self):
+        """
+        Parameters, floats and unknown functions aren't treated as big
+        integers.
+        """
+        self.assertIsNone(self.estimate('x**9**9').bits)
+        self.assertIsNone(self.estimate('sin(2)').bits)
+        self.assertFalse(self.estimate('2.5**10**9').integer)
+        self.assertFalse(self.estimate('2**-(10**7)').integer)
+
+    def test_check(self):
+        """
+        Expressions exceeding the limits are rejected.
+        """
+        test_cases = ('9**9**9', 'factorial(10**6)', '2**10**9',
+                      '(9**9**9) * 0', 'sin(10**10**7)', '3**(4*10**6)')
+        for expression in test_cases:
+            with self.subTest(expression=expression):
+                with self.assertRaises(CostLimitExceeded):
+                    compile_expression(expression)
+
+    def test_check_accepts(self):
+        """
+        Cheap expressions aren't rejected.
+        """
+        test_cases = ('2**(2**20)', '2**-(10**7)', '2**(0 - 10**7)',
+                      'factorial(1000)', 'x**9**9', '(-1)**10**100',
+                      'comb(10**6, 5)', 'comb(10**7, 2)',
+                      'comb(10**7, 10**7 - 1)', '2.0**10**9')
+        for expression in test_cases:
+            with self.subTest(expression=expression):
+                check(self.compiler.compile(expression).root, expression)
+
+    def test_float_to_integer(self):
+        """
+        Integers made of float constants have size of the constants, of
+        other floats aren't rejected.
+        """
+        test_cases = (('3**floor(0.5)', 1), ('2**round(2.5)', 4),
+                      ('10**int(2.0)', 100), ('factorial(int(5.0))', 120),
+                      ('2**ceil(0.1*x)', 2))
+        for expression, expected in test_cases:
+            with self.subTest(expression=expression):
+                self.assertEqual(
+                    compile_expression(expression).evaluate(x=5), expected)
+        self.assertLessEqual(self.estimate('int(1000.5)').bits, 11)
+        self.assertIsNone(self.estimate('int(0.5*x)').bits)
+
+    def test_limits(self):
+        """
+        Limits may be changed for single check.
+        """
+        root = self.compiler.compile('2**100').root
+        with self.assertRaises(CostLimitExceeded):
+            check(root, max_bits=64)
+        with self.assertRaises(CostLimitExceeded):
+            check(self.compiler.compile('2**10**6').root, max_cost=10)
+
+    def test_disabled(self):
+        """
+        Check may be switched off.
+        """
+        compiled = compile_expression('2**10**9', check_cost=False,
+                                      optimize=False)
+        self.assertEqual(compiled.parameters, ())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""
+This module contains test cases for persistent cache of compiled expressions
+from 'diskcache.py' module.
+"""
+import os
+import sys
+import tempfile
+import unittest
+import unittest.mock as mock
+import pycalc.tools.compiler as compiler
+from pycalc.tools.diskcache import DiskCache, decode, encode
+from pycalc.tools.memo import MemoizedFunction
+import pycalc.tools.settings as rules
+
+
+class TestDiskCache(unittest.TestCase):
+    """
+    Collection of test cases for 'DiskCache' class and its use by
+    'compile_expression'.
+    """
+    def setUp(self):
+        """
+        Create empty directory of cache and switch it on for compiler.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'cache')
+        self.cache = DiskCache(self.path)
+        patcher = mock.patch.dict(os.environ,
+                                  {rules.DISK_CACHE_ENV: self.path})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """
+        Remove directory of cache.
+        """
+        self.directory.cleanup()
+
+    def compile(self, expression, **kwargs):
+        """
+        Compile expression bypassing in-memory cache, so only disk cache is
+        used.
+        :param expression: str(expression string).
+        :param kwargs: switches of compilation.
+        :return: CompiledExpression instance.
+        """
+        key = compiler._cache_key(expression, (), (), **kwargs)
+        return compiler._compile_stored(
+            lambda: compiler.ExpressionCompiler(None, None, **kwargs),
+            expression, key)
+
+    def test_round_trip(self):
+        """
+        Stored programs give the same results and keep parameters and
+        counters of optimization.
+        """
+        expressions = ('x+complex(0,2)', 'pow(x,2)+abs(-3)-pi', '1,x,3',
+                       '2**100*x', 'x<3', '-x//7%3', 'factorial(30)*x')
+        for expression in expressions:
+            with self.subTest(expression=expression):
+                compiled = self.compile(expression)
+                stored = self.compile(expression)
+                self.assertIsNot(stored, compiled)
+                self.assertEqual(stored.evaluate(x=2), compiled.evaluate(x=2))
+                self.assertEqual(stored.parameters, compiled.parameters)
+                self.assertEqual(stored.optimization, compiled.optimization)
+                self.assertEqual(stored.program.code, compiled.program.code)
+        self.assertEqual(len(os.listdir(self.path)), len(expressions))
+
+    def test_skip_parsing(self):
+        """
+        Known expression isn't parsed again, entries are separate for
+        different switches of compilation.
+        """
+        self.compile('sin(x)+1')
+        with mock.patch.object(compiler.ExpressionCompiler, '_parse',
+                               side_effect=AssertionError) as parse:
+            self.assertEqual(self.compile('sin(x)+1').evaluate(x=0), 1.0)
+            with self.assertRaises(AssertionError):
+                self.compile('sin(x)+1', optimize=False)
+        self.assertEqual(parse.call_count, 1)
+
+    def test_memoized(self):
+        """
+        Memoized functions are restored as wrappers of process-wide
+        registry.
+        """
+        self.compile('factorial(x)', memoize=True)
+        stored = self.compile('factorial(x)', memoize=True)
+        self.assertIsInstance(stored.program.code[1], MemoizedFunction)
+        self.assertEqual(stored.evaluate(x=5), 120)
+
+    def test_custom_module(self):
+        """
+        Functions of custom modules are stored as references, other objects
+        aren't stored at all.
+        """
+        module = type(sys)('pycalc_cached_module')
+        module.func = lambda x: x + 1
+        module.func.__module__ = 'pycalc_cached_module'
+        module.data = object()
+        with mock.patch.dict(sys.modules, {'pycalc_cached_module': module}):
+            key = compiler._cache_key('func(x)', ('pycalc_cached_module',),
+                                      ())
+            program = compiler.compile_expression(
+                'func(x)', ['pycalc_cached_module'], use_cache=False).program
+            self.assertTrue(self.cache.store(key, key[1], program, ('x',),
+                                             None))
+            self.assertEqual(
+                self.cache.load(key, key[1])[0].run({'x': 2}), 3)
+            self.assertIsNone(self.cache.load(key, ()))
+            program = compiler.compile_expression(
+                'data', ['pycalc_cached_module'], use_cache=False).program
+            self.assertFalse(self.cache.store(key, key[1], program, (),
+                                              None))
+
+    def test_broken_entries(self):
+        """
+        Truncated, empty or foreign entries are treated as missing and
+        removed.
+        """
+        program = compiler.compile_expression('1+x', use_cache=False).program
+        data = encode('key', program, ('x',), None, ())
+        self.assertEqual(decode(data, ())[1].run({'x': 1}), 2)
+        key = compiler._cache_key('1+x', (), ())
+        for contents in (data[:-3], b'', b'PYCC\x09' + data[5:], data):
+            with self.subTest(contents=contents):
+                os.makedirs(self.path, exist_ok=True)
+                with open(self.cache.path(key), 'wb') as stream:
+                    stream.write(contents)
+                self.assertIsNone(self.cache.load(key, ()))
+                self.assertFalse(os.path.exists(self.cache.path(key)))
+
+    def test_atomic_store(self):
+        """
+        Failed write leaves neither entry nor temporary file.
+        """
+        key = compiler._cache_key('1+x', (), ())
+        program = compiler.compile_expression('1+x', use_cache=False).program
+        with mock.patch('os.replace', side_effect=OSError):
+            self.assertFalse(self.cache.store(key, (), program, ('x',),
+                                              None))
+        self.assertEqual(os.listdir(self.path), [])
+        self.assertTrue(self.cache.store(key, (), program, ('x',), None))
+        self.assertEqual(os.listdir(self.path),
+                         [os.path.basename(self.cache.path(key))])
+
+    def test_evict(self):
+        """
+        The least recently used entries are removed when total size exceeds
+        limit, loaded entries become recently used.
+        """
+        self.cache.evict_every = 1
+        program = compiler.compile_expression('1+x', use_cache=False).program
+        keys = [compiler._cache_key(str(indx), (), ()) for indx in range(4)]
+        for age, key in enumerate(keys):
+            self.cache.store(key, (), program, ('x',), None)
+            os.utime(self.cache.path(key), (age, age))
+        size = os.path.getsize(self.cache.path(keys[0]))
+        self.assertEqual(self.cache.size(), size * 4)
+        self.assertIsNotNone(self.cache.load(keys[0], ()))
+        self.cache.size_limit = size * 2
+        self.cache.evict()
+        self.assertEqual([self.cache.load(key, ()) is not None
+                          for key in keys], [True, False, False, True])
+        self.cache.clear()
+        self.assertEqual(self.cache.size(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,6 +2,7 @@
 Module contains test cases for 'exceptions.py' module's unit tests.
 Should be ran with 'unittest' module.
 """
+import pickle
 import unittest
 import pycalc.tools.exceptions as exc
 
@@ -23,3 +24,13 @@ class TestCalcExceptions(unittest.TestCase):
                 err = exc.PyCalcBaseException(*case)
                 self.assertEqual(err.message, res[counter])
                 counter += 1
+
+    def test_pickle(self):
+        """
+        Message isn't formatted twice when exception is passed between
+        processes.
+        """
+        err = pickle.loads(pickle.dumps(exc.EvaluationTimeout('One', 'exp')))
+        self.assertIsInstance(err, exc.EvaluationTimeout)
+        self.assertEqual(err.message, 'ERROR: One: "exp"')
+        self.assertEqual(str(err), err.message)
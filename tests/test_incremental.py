@@ -0,0 +1,128 @@
+"""
+This module contains test cases for incremental evaluation from
+'incremental.py' module.
+"""
+import sys
+import unittest
+import unittest.mock as mock
+from pycalc.tools.calculator import ExpressionCalculator
+from pycalc.tools.incremental import IncrementalEvaluator, UpdateStats
+from pycalc.tools.parser import ExpressionParser
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+def calculate(expression):
+    """
+    Evaluate expression from scratch.
+    :param expression: str(expression string).
+    :return: result of expression calculations.
+    """
+    calc = ExpressionCalculator(expression,
+                                ExpressionParser().parse_input(expression))
+    return calc.explore_data(calc.exp_list)
+
+
+class TestIncrementalEvaluator(unittest.TestCase):
+    """
+    Collection of test cases for 'IncrementalEvaluator' class.
+    """
+    def setUp(self):
+        """
+        Create evaluator with standard modules only.
+        """
+        self.evaluator = IncrementalEvaluator()
+
+    def tearDown(self):
+        """
+        Remove link to used evaluator.
+        """
+        self.evaluator = None
+
+    def test_results(self):
+        """
+        Every edited expression gives the same result as evaluated from
+        scratch.
+        """
+        edits = ('(1+2)*sin(3)-pow(2,3)', '(1+5)*sin(3)-pow(2,3)',
+                 '(1+5)*sin(3.5)-pow(2,3)', '(1+5)*sin(3.5)-pow(2,4)',
+                 '-(1+5)*sin(3.5)-pow(2,4)', '2(1+5)*sin(3.5)',
+                 '2(1+5)*sin(-(3.5))', '2((1+5))', '2((1+5)^2)//3',
+                 '7 % (3 + (2 * 4))')
+        for expression in edits:
+            with self.subTest(expression=expression):
+                self.assertEqual(self.evaluator.update(expression),
+                                 calculate(expression))
+                self.assertEqual(self.evaluator.expression, expression)
+
+    def test_locality(self):
+        """
+        Only changed region is parsed and only its path to the whole
+        expression is calculated.
+        """
+        expression = '(1+2)*((3-4)+(5*(6+7)))-(8/2)'
+        self.evaluator.update(expression)
+        self.assertEqual(self.evaluator.last_update,
+                         UpdateStats(len(expression), 7))
+        self.assertEqual(self.evaluator.update(expression.replace('6', '16')),
+                         calculate(expression.replace('6', '16')))
+        self.assertEqual(self.evaluator.last_update,
+                         UpdateStats(len('16+7'), 4))
+        self.assertEqual(self.evaluator.edit(1, 2, '10'),
+                         calculate('(10+2)*((3-4)+(5*(16+7)))-(8/2)'))
+        self.assertEqual(self.evaluator.last_update,
+                         UpdateStats(len('10+2'), 2))
+
+    def test_brackets_edit(self):
+        """
+        Region which isn't balanced after edit is parsed with its parents,
+        unbalanced expression is rejected and the last one is kept.
+        """
+        self.evaluator.update('(1+2)*(3+4)')
+        self.assertEqual(self.evaluator.update('(1+2)*((3)+4)'), 21)
+        self.assertEqual(self.evaluator.last_update.reparsed, len('(3)+4'))
+        with self.assertRaises(PyCalcBaseException):
+            self.evaluator.update('(1+2)*((3)+4')
+        self.assertEqual(self.evaluator.expression, '(1+2)*((3)+4)')
+        self.assertEqual(self.evaluator.update('(1+2)*((3)+5)'), 24)
+
+    def test_errors(self):
+        """
+        Regions failed to calculate are calculated again on the next update.
+        """
+        self.evaluator.update('(1/(2-1))+(3)')
+        with self.assertRaises(ZeroDivisionError):
+            self.evaluator.update('(1/(2-2))+(3)')
+        with self.assertRaises(ZeroDivisionError):
+            self.evaluator.update('(1/(2-2))+(4)')
+        self.assertEqual(self.evaluator.update('(1/(2-4))+(4)'), 3.5)
+        with self.assertRaises(PyCalcBaseException):
+            IncrementalEvaluator().edit(0, 0, '1')
+
+    def test_reused_values(self):
+        """
+        Functions in unchanged regions aren't called again, function is
+        called by region where its name is.
+        """
+        func = mock.Mock(return_value=2)
+        module = mock.Mock(spec=['func'], func=func)
+        with mock.patch.dict(sys.modules, {'pycalc_test_module': module}):
+            evaluator = IncrementalEvaluator(['pycalc_test_module'])
+            self.assertEqual(evaluator.update('(func(1)) + (2)'), 4)
+            self.assertEqual(evaluator.update('(func(1)) + (3)'), 5)
+        func.assert_called_once_with(1)
+
+    def test_deep_nesting(self):
+        """
+        Deeply nested regions are built and calculated without recursion.
+        """
+        depth = sys.getrecursionlimit() * 2
+        expression = '(' * depth + '1' + '+1)' * depth
+        self.assertEqual(self.evaluator.update(expression), depth + 1)
+        self.assertEqual(self.evaluator.edit(depth, depth + 1, '2'),
+                         depth + 2)
+        self.assertEqual(self.evaluator.last_update,
+                         UpdateStats(len('2+1'), depth + 1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,6 +4,8 @@ Provide test cases for 'main.py' module testing. Should be ran by 'unittest'.
 import unittest
 import unittest.mock as mock
 import argparse
+import json
+import math
 import sys
 from io import StringIO
 from pycalc.main import parse_args, main
@@ -39,6 +41,14 @@ class TestMain(unittest.TestCase):
         self.assertIs(result[0].module, None)
         self.assertEqual(result[1], ['1+1'])
 
+    def test_parse_args_batch(self):
+        """
+        Expression isn't required in batch mode.
+        """
+        result = parse_args(['--batch', '-'])
+        self.assertEqual(result[0].batch, '-')
+        self.assertEqual(result[1], [])
+
     def test_parse_args_exception(self):
         """
         Check if function raises exception on empty input.
@@ -47,16 +57,126 @@ class TestMain(unittest.TestCase):
             parse_args([])
         self.assertIn('ERROR:', err.exception.message)
 
-    @mock.patch('pycalc.main.ExpressionCalculator')
-    @mock.patch('pycalc.main.ExpressionParser')
-    def test_main(self, mock_parser, mock_calc):
+    @mock.patch('pycalc.tools.compiler.compile_expression')
+    def test_main(self, mock_compile):
         """
-        Test that instancec of appropriate classes created and required
-        methods called.
+        Test that expression is compiled with requested modules and result of
+        its evaluation is printed.
         """
-        parse_input = mock.Mock(side_effect=[['1']])
-        mock_parser.return_value = mock.Mock(parse_input=parse_input)
-        explore_data = mock.Mock(side_effect=[1])
-        mock_calc.return_value = mock.Mock(explore_data=explore_data)
-        main(['1'])
+        evaluate = mock.Mock(side_effect=[1, 2])
+        mock_compile.return_value = mock.Mock(evaluate=evaluate)
+        main(['-m', 'string', '1'])
+        mock_compile.assert_called_once_with('1', ['string'],
+                                             concurrent=False)
         self.assertEqual('1', self.buffer.getvalue().strip())
+        mock_compile.reset_mock()
+        main(['--concurrent', '2'])
+        mock_compile.assert_called_once_with('2', None, concurrent=True)
+
+    @mock.patch('pycalc.main.parse_args')
+    def test_main_plain(self, mock_parse):
+        """
+        Single expression without options is evaluated without 'argparse',
+        signed expressions aren't taken for options.
+        """
+        for expression, result in (('2*3', '6'), ('-1+2', '1'),
+                                   ('-.5*2', '-1.0')):
+            with self.subTest(expression=expression):
+                self.buffer.seek(0)
+                self.buffer.truncate()
+                main([expression])
+                self.assertEqual(result, self.buffer.getvalue().strip())
+        mock_parse.assert_not_called()
+
+    def test_main_negated(self):
+        """
+        Negated functions aren't taken for short options, alone or after
+        other options.
+        """
+        for expression, result in (('-bool(1)', '-1'),
+                                   ('-sin(1)', str(-math.sin(1))),
+                                   ('-cos(0)', '-1.0')):
+            for argv in ([expression], ['-m', 'math', expression]):
+                with self.subTest(argv=argv):
+                    self.buffer.seek(0)
+                    self.buffer.truncate()
+                    main(argv)
+                    self.assertEqual(result, self.buffer.getvalue().strip())
+
+    def test_main_error(self):
+        """
+        Errors of compilation are printed instead of results.
+        """
+        main(['1+'])
+        self.assertIn('ERROR:', self.buffer.getvalue())
+
+    @mock.patch('pycalc.tools.batch.run_batch')
+    def test_main_batch(self, mock_batch):
+        """
+        Batch mode passes file name and modules to 'run_batch'.
+        """
+        main(['--batch', 'input.txt', '-m', 'string',
+              '--jobs', '4'])
+        mock_batch.assert_called_once_with('input.txt', ['string'], jobs=4,
+                                           memoize=False)
+
+    @mock.patch('pycalc.tools.repl.run_repl')
+    def test_main_repl(self, mock_repl):
+        """
+        Interactive session doesn't need expression and gets modules.
+        """
+        main(['--repl', '-m', 'string', '--memoize'])
+        mock_repl.assert_called_once_with(['string'], True)
+
+    def test_main_show_source(self):
+        """
+        Generated source is printed before result.
+        """
+        main(['--show-source', '2*3'])
+        self.assertEqual(self.buffer.getvalue().splitlines()[-3:],
+                         ['    return 6', '', '6'])
+
+    def test_main_profile(self):
+        """
+        Result is printed to stdout and profile as JSON to stderr.
+        """
+        with mock.patch('sys.stderr', new_callable=StringIO) as err:
+            main(['--profile', 'sin(2) + 2*3'])
+        self.assertEqual(self.buffer.getvalue().strip(), str(math.sin(2) + 6))
+        report = json.loads(err.getvalue())
+        self.assertEqual(report['expression'], 'sin(2) + 2*3')
+        self.assertEqual(report['reductions'], 2)
+        self.assertIn('evaluate', report['phases'])
+
+    def test_main_profile_conflicts(self):
+        """
+        Switches which profiled evaluation can't honour are rejected.
+        """
+        for option in ('--concurrent', '--show-source'):
+            with self.subTest(option=option):
+                with mock.patch('sys.stderr', new_callable=StringIO) as err:
+                    with self.assertRaises(SystemExit) as exit_info:
+                        main(['--profile', option, '2*3'])
+                self.assertEqual(exit_info.exception.code, 2)
+                self.assertIn('can\'t be combined', err.getvalue())
+        self.assertEqual(self.buffer.getvalue(), '')
+
+    @mock.patch('pycalc.tools.server.serve')
+    def test_main_serve(self, mock_serve):
+        """
+        Server is started with socket path and modules.
+        """
+        main(['--serve', '/tmp/pycalc.sock', '-m', 'time'])
+        mock_serve.assert_called_once_with('/tmp/pycalc.sock', ['time'])
+
+    @mock.patch('pycalc.tools.client.query')
+    @mock.patch('pycalc.tools.client.connect')
+    def test_main_connect(self, mock_connect, mock_query):
+        """
+        Expression is sent to server and its reply is printed.
+        """
+        mock_query.return_value = iter(['4'])
+        main(['--connect', '/tmp/pycalc.sock', '--autostart', '2+2'])
+        mock_connect.assert_called_once_with('/tmp/pycalc.sock', True, None)
+        self.assertEqual(mock_query.call_args[0][1], ['2+2'])
+        self.assertEqual('4', self.buffer.getvalue().strip())
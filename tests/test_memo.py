@@ -0,0 +1,122 @@
+"""
+This module contains test cases for memoization of pure functions from
+'memo.py' module.
+"""
+import math
+import pickle
+import sys
+import unittest
+import unittest.mock as mock
+from pycalc.tools.compiler import compile_expression
+from pycalc.tools.memo import (MemoizedFunction, MemoRegistry, MemoStats,
+                               MEMO, pure)
+
+
+class TestMemoizedFunction(unittest.TestCase):
+    """
+    Collection of test cases for 'MemoizedFunction' class.
+    """
+    def test_lru(self):
+        """
+        Results are kept for repeated arguments, the least recently used one
+        is evicted first.
+        """
+        func = mock.Mock(side_effect=lambda x: x * 2)
+        memoized = MemoizedFunction(func, capacity=2)
+        for arg in (1, 2, 1, 3, 1, 2):
+            memoized(arg)
+        self.assertEqual(func.call_count, 4)
+        self.assertEqual(memoized.stats(), MemoStats(2, 4, 2, 0, 2))
+        self.assertEqual(memoized.stats().hit_rate, 2 / 6)
+
+    def test_keys(self):
+        """
+        Arguments of different types or different floats equal to each
+        other aren't mixed, 'nan' is found again.
+        """
+        memoized = MemoizedFunction(math.atan2)
+        self.assertEqual(memoized(0.0, -0.0), math.pi)
+        self.assertEqual(memoized(0.0, 0.0), 0.0)
+        memoized = MemoizedFunction(abs)
+        self.assertIs(type(memoized(1.0)), float)
+        self.assertIs(type(memoized(1)), int)
+        memoized(float('nan'))
+        memoized(float('nan'))
+        self.assertEqual(memoized.stats().hits, 1)
+
+    def test_not_kept(self):
+        """
+        Unhashable arguments, exceptions and big results aren't kept.
+        """
+        func = mock.Mock(return_value=1)
+        memoized = MemoizedFunction(func)
+        memoized([1, 2])
+        memoized([1, 2])
+        self.assertEqual(memoized.stats(), MemoStats(0, 0, 0, 2, 0))
+        memoized = MemoizedFunction(math.factorial, max_result_size=64)
+        memoized(1000)
+        with self.assertRaises(ValueError):
+            memoized(-1)
+        self.assertEqual(memoized.stats(), MemoStats(0, 2, 0, 0, 0))
+
+
+class TestMemoRegistry(unittest.TestCase):
+    """
+    Collection of test cases for 'MemoRegistry' class, 'pure' decorator and
+    memoization of compiled expressions.
+    """
+    def test_policy(self):
+        """
+        Explicit policy takes precedence over mark of decorator.
+        """
+        registry = MemoRegistry([math.gamma])
+        marked = pure(capacity=10)(lambda x: x)
+        self.assertEqual(registry.policy(math.gamma), 1024)
+        self.assertEqual(registry.policy(marked), 10)
+        self.assertEqual(registry.policy(math.sin), 0)
+        self.assertIs(registry.wrap(math.sin), math.sin)
+        registry.forbid(marked)
+        self.assertIs(registry.wrap(marked), marked)
+        registry.allow(math.sin, 5)
+        self.assertIs(registry.wrap(math.sin), registry.wrap(math.sin))
+        self.assertEqual(registry.wrap(math.sin).capacity, 5)
+
+    def test_stats(self):
+        """
+        Counters are reported by names of functions and reset by 'clear'.
+        """
+        registry = MemoRegistry([math.lgamma])
+        wrapper = registry.wrap(math.lgamma)
+        wrapper(5)
+        wrapper(5)
+        self.assertEqual(registry.stats(), {'lgamma': MemoStats(1, 1, 0, 0,
+                                                                1)})
+        registry.clear()
+        self.assertEqual(registry.stats()['lgamma'].hit_rate, 0.0)
+
+    def test_pickle(self):
+        """
+        Memoized function is restored as wrapper of process-wide registry.
+        """
+        wrapper = MEMO.wrap(math.gamma)
+        self.assertIs(pickle.loads(pickle.dumps(wrapper)), wrapper)
+
+    def test_compiled(self):
+        """
+        Marked function of custom module is called once for the same
+        arguments by all expressions compiled with memoization only.
+        """
+        func = mock.Mock(return_value=2)
+        module = mock.Mock(spec=['slow'], slow=pure(func))
+        with mock.patch.dict(sys.modules, {'pycalc_memo_module': module}):
+            for expression in ('slow(x) + 1', 'slow(x) * 2', 'slow(x) * 2'):
+                compile_expression(expression, ['pycalc_memo_module'],
+                                   memoize=True).evaluate(x=3)
+            self.assertEqual(func.call_count, 1)
+            compile_expression('slow(x) * 2', ['pycalc_memo_module']
+                               ).evaluate(x=3)
+            self.assertEqual(func.call_count, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+This module contains test cases for nodes of compiled expression tree from
+'nodes.py' module.
+"""
+import unittest
+import unittest.mock as mock
+import operator as op
+import pycalc.tools.nodes as nodes
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+class TestNodes(unittest.TestCase):
+    """
+    Collection of test cases for evaluation of every node type.
+    """
+    def test_constant(self):
+        """
+        Constant returns stored value and has no children.
+        """
+        node = nodes.Constant(2.5)
+        self.assertEqual(node.evaluate({}), 2.5)
+        self.assertEqual(node.children(), ())
+
+    def test_binary_op(self):
+        """
+        Operator is applied to evaluated operands in the right order.
+        """
+        node = nodes.BinaryOp(op.sub, nodes.Constant(5), nodes.Constant(2))
+        self.assertEqual(node.evaluate({}), 3)
+        self.assertEqual(len(node.children()), 2)
+
+    def test_variable(self):
+        """
+        Variable takes its value from bindings and reports missing ones.
+        """
+        node = nodes.Variable('x')
+        self.assertEqual(node.evaluate({'x': 7}), 7)
+        with self.assertRaises(PyCalcBaseException) as err:
+            node.evaluate({})
+        self.assertIn('"x"', err.exception.message)
+
+    def test_call(self):
+        """
+        Function receives evaluated arguments.
+        """
+        func = mock.Mock(return_value=10)
+        node = nodes.Call(func, [nodes.Constant(1), nodes.Constant(2)])
+        self.assertEqual(node.evaluate({}), 10)
+        func.assert_called_once_with(1, 2)
+
+    def test_call_signature(self):
+        """
+        Wrong number of arguments is reported with library exception.
+        """
+        node = nodes.Call(abs, [nodes.Constant(1), nodes.Constant(2)])
+        with self.assertRaises(PyCalcBaseException) as err:
+            node.evaluate({})
+        self.assertIn('ERROR:', err.exception.message)
+
+    def test_sequence(self):
+        """
+        Sequence is evaluated to list of values.
+        """
+        node = nodes.Sequence([nodes.Constant(1), nodes.Constant(2)])
+        self.assertEqual(node.evaluate({}), [1, 2])
+
+    def test_shared(self):
+        """
+        Shared subexpression is calculated once per evaluation.
+        """
+        func = mock.Mock(return_value=3)
+        shared = nodes.Shared(nodes.Call(func, [nodes.Constant(1)]))
+        node = nodes.BinaryOp(op.add, shared, shared)
+        self.assertEqual(node.evaluate({}), 6)
+        self.assertEqual(node.evaluate({}), 6)
+        self.assertEqual(func.call_count, 2)
+
+    def test_abstract(self):
+        """
+        Base node and nodes without evaluation can't be created.
+        """
+        with self.assertRaises(TypeError):
+            nodes.Node()
+        with self.assertRaises(TypeError):
+            type('Unknown', (nodes.Node,), {})()
+
+    def test_rebuild(self):
+        """
+        Rebuilt nodes keep their kind and function with new children.
+        """
+        one, two = nodes.Constant(1), nodes.Constant(2)
+        node = nodes.BinaryOp(op.sub, one, two).rebuild([two, one])
+        self.assertEqual(node.evaluate({}), 1)
+        node = nodes.Call(max, [one]).rebuild([one, two])
+        self.assertEqual(node.evaluate({}), 2)
+        self.assertIs(one.rebuild([]), one)
+
+    def test_walk(self):
+        """
+        All nodes are visited once in pre-order, shared nodes included.
+        """
+        shared = nodes.Constant(1)
+        add = nodes.BinaryOp(op.add, shared, shared)
+        root = nodes.Call(abs, [add, nodes.Constant(2)])
+        self.assertEqual(list(nodes.walk(root)),
+                         [root, add, shared, root.args[1]])
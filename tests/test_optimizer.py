@@ -0,0 +1,75 @@
+"""
+This module contains test cases for optimization pass from 'optimizer.py'
+module.
+"""
+import math
+import unittest
+import pycalc.tools.nodes as nodes
+from pycalc.tools.compiler import ExpressionCompiler
+from pycalc.tools.optimizer import optimize
+
+
+class TestOptimize(unittest.TestCase):
+    """
+    Collection of test cases for constant folding and merging of identical
+    subexpressions.
+    """
+    def setUp(self):
+        """
+        Create compiler without optimization to get original trees.
+        """
+        self.compiler = ExpressionCompiler(optimize=False)
+
+    def tearDown(self):
+        """
+        Remove compiler.
+        """
+        self.compiler = None
+
+    def test_fold(self):
+        """
+        Subtrees of constants and pure functions become constants.
+        """
+        root, stats = optimize(self.compiler.compile('2*pi/360 + sin(0)').root)
+        self.assertIsInstance(root, nodes.Constant)
+        self.assertEqual(root.value, 2 * math.pi / 360)
+        self.assertEqual(stats.folded, 4)
+        self.assertEqual(stats.removed, 7)
+
+    def test_errors_not_folded(self):
+        """
+        Subtrees which fail are left for evaluation.
+        """
+        root, stats = optimize(self.compiler.compile('x + 1/0').root)
+        self.assertIsInstance(root.right, nodes.BinaryOp)
+        self.assertEqual(stats.folded, 0)
+
+    def test_merge(self):
+        """
+        Identical pure subexpressions are calculated once.
+        """
+        compiled = self.compiler.compile('sqrt(a*a+b*b)/sqrt(a*a+b*b)')
+        root, stats = optimize(compiled.root)
+        self.assertIsInstance(root.left, nodes.Shared)
+        self.assertIs(root.left, root.right)
+        self.assertEqual(stats.merged, 10)
+        env = {'a': 3, 'b': 4}
+        self.assertEqual(root.evaluate(env), 1)
+        self.assertEqual(env[root.left], 5)
+
+    def test_impure(self):
+        """
+        Functions from custom modules are never folded or merged.
+        """
+        compiler = ExpressionCompiler(['random'], optimize=False)
+        root, stats = optimize(compiler.compile('randint(1, 9)-randint(1, 9)').root)
+        self.assertIsInstance(root.left, nodes.Call)
+        self.assertIsNot(root.left, root.right)
+        self.assertEqual((stats.folded, stats.merged), (0, 2))
+
+    def test_signed_zero(self):
+        """
+        Constants are merged only if they're exactly the same.
+        """
+        root, _ = optimize(self.compiler.compile('x*0.0 + x*(-1*0.0)').root)
+        self.assertEqual(math.copysign(1, root.right.right.value), -1)
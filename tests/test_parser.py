@@ -5,8 +5,8 @@ Includes classes:
 - TestAuxMethods.
 """
 import unittest
-import unittest.mock as mock
 from pycalc.tools.parser import ExpressionParser
+from pycalc.tools.tokenizer import tokenize
 from pycalc.tools.settings import MATH_OPERATORS
 from pycalc.tools.exceptions import PyCalcBaseException
 
@@ -143,59 +143,49 @@ class TestAuxMethods(unittest.TestCase):
 
     def test_deal_with_sign(self):
         """
-        Test conditional control flow of 'deal_with_sign' method.
-        Mock 'parse_input' method to control its output.
-        """
-        item = '-'
-        expr = ['', ' 1.0+2', '1*(2)', 'sin']
-        return_vals = [[], ['1.0'], ['1'], ['sin']]
-        result = [('-', 0), ([['-1', '*', '1.0']], 4), ([['-1', '*', '1']], 1),
-                  ([['-1', '*', 'sin']], 3)]
-        control_mock = mock.Mock(side_effect=return_vals)
-        self.parser.parse_input = control_mock
-        for indx in range(len(expr)):
+        Test conditional control flow of 'deal_with_sign' method. Sign is
+        escaped together with following number, but functions and brackets
+        are multiplied by signed '1'.
+        """
+        cases = ('-', '-1.0+2', '-(2)', '-sin(1)', '-pi', '--1')
+        result = ((['-'], 0), ([['-1', '*', '1.0']], 1),
+                  ([['-1', '*', '1'], '*'], 0), ([['-1', '*', '1'], '*'], 0),
+                  ([['-1', '*', 'pi']], 1), ([['-1', '*', '1'], '*'], 0))
+        for indx in range(len(cases)):
+            with self.subTest(indx=indx):
+                current = []
+                consumed = self.parser._deal_with_sign(
+                    current, tokenize(cases[indx]), 0)
+                self.assertEqual((current, consumed), result[indx])
+
+    def test_is_sign(self):
+        """
+        Operator is a sign at the beginning of the list and after another
+        operator only.
+        """
+        inp = ([], ['1', '+'], ['1'], [['1']], ['sin'])
+        res = (True, True, False, False, False)
+        for indx in range(len(inp)):
             with self.subTest(indx=indx):
-                self.assertEqual(self.parser._deal_with_sign(item, expr[indx]),
-                                 result[indx])
-        # Method 'deal_with_sign' called each time 'deal_with_sign' is called.
-        self.assertEqual(control_mock.call_count, len(expr))
-
-    def test_control_parsing(self):
-        """
-        Verify that 'control_parsing' method works as expected.
-        """
-        temp_strs = ['', 'alpha', '3.0']
-        items = ['3.0', '(']
-        res = ['extra', 'alpha', '3.0', 'extra', 'extra', '3.0']
-        indx = 0
-        for item in items:
-            for tmp in temp_strs:
-                with self.subTest(item=item, tmp=tmp):
-                    self.assertEqual(self.parser._control_parsing(item, tmp),
-                                     res[indx])
-                indx += 1
-
-    def test_check_operators(self):
-        """
-        Assess correctness of boolean values returned by 'check_operator'
-        method of 'ExpressionParser' class.
-        """
-        clean_mock = mock.Mock(side_effect=lambda value: value)
-        self.parser._clean_spaces = clean_mock
-        inp = [[], [[]], [1]]
-        res = [False, False, True]
-        for case in inp:
-            with self.subTest(case=case):
-                self.assertEqual(self.parser._check_operators(case),
-                                 res[inp.index(case)])
-        # 'clean_spaces' method triggered on each 'check_operator' call.
-        self.assertEqual(clean_mock.call_count, len(inp))
-
-    def test_clean_spaces(self):
-        """
-        Verify that 'clean_spaces' method removes redundant empty strings from
-        list as designed.
-        """
-        array = [1, '', '1', ' ', '1 1', 1.0]
-        res = [1, '1', '1 1', 1.0]
-        self.assertEqual(self.parser._clean_spaces(array), res)
+                self.assertEqual(self.parser._is_sign(inp[indx]), res[indx])
+
+    def test_expression_attr(self):
+        """
+        Every call to 'parse_input' saves expression for error messages.
+        """
+        self.parser.parse_input('1+1')
+        with self.assertRaises(PyCalcBaseException) as err:
+            self.parser.parse_input('1)')
+        self.assertEqual(self.parser.expression, '1)')
+        self.assertIn('"1)"', err.exception.message)
+
+    def test_long_expression(self):
+        """
+        Long and deeply nested expressions are parsed without recursion.
+        """
+        expr = '+'.join(['1'] * 10000)
+        self.assertEqual(len(self.parser.parse_input(expr)), 19999)
+        res = self.parser.parse_input('(' * 5000 + '1' + ')' * 5000)
+        for _ in range(5000):
+            res = res[0]
+        self.assertEqual(res, ['1'])
@@ -0,0 +1,81 @@
+"""
+This module contains test cases for instrumentation from 'profiler.py'
+module.
+"""
+import unittest
+import unittest.mock as mock
+from pycalc.tools.compiler import compile_expression
+from pycalc.tools.profiler import PHASES, Profile, profile
+
+
+class TestProfile(unittest.TestCase):
+    """
+    Collection of test cases for timings and counters of profiled
+    evaluation.
+    """
+    def test_result(self):
+        """
+        Profiled evaluation gives the same result as ordinary one.
+        """
+        for expression in ('2+2*2', 'sin(x)^2 + cos(x)^2', 'round(x, 2)'):
+            with self.subTest(expression=expression):
+                result, _ = profile(expression, x=1.2345)
+                self.assertEqual(result, compile_expression(expression)
+                                 .evaluate(x=1.2345))
+
+    def test_counters(self):
+        """
+        Reductions, calls by name and depth of brackets are counted.
+        """
+        _, report = profile('sin(x) + sin(y) * ((abs(x) - 1) + 2)', x=1,
+                            y=2)
+        self.assertEqual(report.reductions, 4)
+        self.assertEqual(report.calls, {'sin': 2, 'abs': 1})
+        self.assertEqual(report.max_depth, 4)
+
+    def test_phases(self):
+        """
+        Every phase is measured and total is sum of phases.
+        """
+        _, report = profile('log(100, 10) * pi + x', x=1)
+        self.assertEqual(tuple(report.phases), PHASES)
+        for phase in PHASES:
+            with self.subTest(phase=phase):
+                self.assertGreater(report.phases[phase], 0)
+        self.assertAlmostEqual(report.total, sum(report.phases.values()))
+
+    def test_exclusive(self):
+        """
+        Time of nested measurement isn't counted in outer phase.
+        """
+        report = Profile('1')
+        ticks = iter([0.0, 1.0, 3.0, 10.0])
+        with mock.patch('time.perf_counter',
+                                 side_effect=lambda: next(ticks)):
+            report.measure('build', report.measure, 'convert', int, '1')
+        self.assertEqual(report.phases['convert'], 2.0)
+        self.assertEqual(report.phases['build'], 8.0)
+
+    def test_callback(self):
+        """
+        Callback receives finished profile.
+        """
+        reports = []
+        _, report = profile('2*3', callback=reports.append)
+        self.assertEqual(reports, [report])
+        self.assertEqual(report.as_dict()['expression'], '2*3')
+
+    def test_callback_on_error(self):
+        """
+        Callback receives profile of failed evaluation.
+        """
+        reports = []
+        with self.assertRaises(ZeroDivisionError):
+            profile('abs(x)/0', callback=reports.append, x=1)
+        self.assertEqual(len(reports), 1)
+        self.assertEqual(reports[0].calls['abs'], 1)
+        self.assertGreater(reports[0].phases['evaluate'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
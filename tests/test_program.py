@@ -0,0 +1,104 @@
+"""
+This module contains test cases for register programs from 'program.py'
+module.
+"""
+import sys
+import unittest
+import unittest.mock as mock
+import operator as op
+import pycalc.tools.nodes as nodes
+from pycalc.tools.compiler import ExpressionCompiler
+from pycalc.tools.exceptions import PyCalcBaseException
+from pycalc.tools.program import assemble, CALL1, CALLN, OPERATOR, WIDTH
+
+
+class TestProgram(unittest.TestCase):
+    """
+    Collection of test cases for assembling and running of programs.
+    """
+    def test_run(self):
+        """
+        Program gives the same results as tree it was assembled from.
+        """
+        compiler = ExpressionCompiler(optimize=False)
+        test_cases = ('2+2*2', 'sin(x)^2 + cos(x)^2', 'log(x, 2) - x // 3',
+                      'pow(x, 2) == x*x', 'hypot(x, 1, 2)', 'x, 2*x',
+                      'round(x)')
+        for expression in test_cases:
+            with self.subTest(expression=expression):
+                root = compiler.compile(expression).root
+                self.assertEqual(assemble(root).run({'x': 8.5}),
+                                 root.evaluate({'x': 8.5}))
+
+    def test_layout(self):
+        """
+        Constants and parameters take registers before results of
+        instructions, every parameter takes single register.
+        """
+        root = nodes.BinaryOp(op.mul, nodes.Variable('x'), nodes.Call(
+            abs, [nodes.BinaryOp(op.sub, nodes.Constant(1),
+                                 nodes.Variable('x'))]))
+        program = assemble(root)
+        self.assertEqual(program.constants, (1,))
+        self.assertEqual(program.names, ('x',))
+        self.assertEqual(len(program), 3)
+        self.assertEqual(program.code, (OPERATOR, op.sub, 0, 1,
+                                        CALL1, abs, 2, 0,
+                                        OPERATOR, op.mul, 1, 3))
+        self.assertEqual(program.run({'x': 3}), 6)
+
+    def test_shared(self):
+        """
+        Shared subexpression is calculated once and restored as 'Shared'.
+        """
+        func = mock.Mock(return_value=3)
+        shared = nodes.Shared(nodes.Call(func, [nodes.Constant(1),
+                                                nodes.Constant(2),
+                                                nodes.Constant(3)]))
+        program = assemble(nodes.BinaryOp(op.add, shared, shared))
+        self.assertEqual(program.code[0], CALLN)
+        self.assertEqual(len(program.code), 2 * WIDTH)
+        self.assertEqual(program.run({}), 6)
+        func.assert_called_once_with(1, 2, 3)
+        tree = program.to_tree()
+        self.assertIsInstance(tree.left, nodes.Shared)
+        self.assertIs(tree.left, tree.right)
+
+    def test_to_tree(self):
+        """
+        Restored tree evaluates to the same result and keeps separate
+        variable nodes.
+        """
+        root = ExpressionCompiler(optimize=False).compile('x*x + 2').root
+        tree = assemble(root).to_tree()
+        self.assertEqual(tree.evaluate({'x': 3}), 11)
+        self.assertIsNot(tree.left.left, tree.left.right)
+
+    def test_errors(self):
+        """
+        Missing parameters and wrong signatures are reported as by nodes,
+        errors of operators aren't changed.
+        """
+        test_cases = (
+            (nodes.Variable('y'), PyCalcBaseException),
+            (nodes.Call(abs, [nodes.Constant(1), nodes.Constant(2)]),
+             PyCalcBaseException),
+            (nodes.BinaryOp(op.lt, nodes.Constant(1j), nodes.Constant(1)),
+             TypeError))
+        for root, error in test_cases:
+            with self.subTest(root=root):
+                with self.assertRaises(error):
+                    assemble(root).run({})
+
+    def test_footprint(self):
+        """
+        Program takes less memory than tree of nodes.
+        """
+        root = ExpressionCompiler(optimize=False).compile(
+            '+'.join('x*{}'.format(indx) for indx in range(100))).root
+        size = sum(sys.getsizeof(node) for node in nodes.walk(root))
+        self.assertLess(assemble(root).footprint(), size)
+
+
+if __name__ == '__main__':
+    unittest.main()
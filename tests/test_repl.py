@@ -0,0 +1,104 @@
+"""
+This module contains test cases for interactive session from 'repl.py'
+module.
+"""
+import math
+import sys
+import unittest
+import unittest.mock as mock
+from io import StringIO
+from pycalc.tools.compiler import EXPRESSION_CACHE
+from pycalc.tools.repl import Session, run_repl
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+class TestSession(unittest.TestCase):
+    """
+    Collection of test cases for 'Session' class and 'run_repl' function.
+    """
+    def setUp(self):
+        """
+        Create session with standard modules only.
+        """
+        self.session = Session()
+
+    def tearDown(self):
+        """
+        Remove link to used session.
+        """
+        self.session = None
+
+    def test_execute(self):
+        """
+        Results are reused through '_' and names, comparison isn't an
+        assignment.
+        """
+        cases = (('2+2', (None, 4)), ('_*3', (None, 12)),
+                 ('x = _ - 2', ('x', 10)), ('x == 10', (None, True)),
+                 ('y=x^2', ('y', 100)), ('sqrt(y) + x', (None, 20.0)),
+                 ('pi = 3', ('pi', 3)), ('pi * 2', (None, 6)))
+        for line, result in cases:
+            with self.subTest(line=line):
+                self.assertEqual(self.session.execute(line), result)
+
+    def test_not_recalculated(self):
+        """
+        Stored results aren't calculated again and compiled expressions are
+        taken from cache.
+        """
+        func = mock.Mock(return_value=5)
+        module = mock.Mock(spec=['func'], func=func)
+        with mock.patch.dict(sys.modules, {'pycalc_repl_module': module}):
+            session = Session(['pycalc_repl_module'])
+            session.execute('x = func(1)')
+            hits = EXPRESSION_CACHE.stats().hits
+            self.assertEqual(session.execute('x + 1'), (None, 6))
+            self.assertEqual(session.execute('x + 1'), (None, 6))
+        func.assert_called_once_with(1)
+        self.assertEqual(EXPRESSION_CACHE.stats().hits, hits + 1)
+
+    def test_cache_key(self):
+        """
+        Assignments don't make expressions which don't use assigned names
+        compile again.
+        """
+        self.session.execute('x = 1')
+        self.session.execute('log(pi) + 0.5')
+        self.session.execute('y = 2')
+        hits = EXPRESSION_CACHE.stats().hits
+        self.assertEqual(self.session.execute('log(pi) + 0.5')[1],
+                         math.log(math.pi) + 0.5)
+        self.assertEqual(EXPRESSION_CACHE.stats().hits, hits + 1)
+        self.assertEqual(self.session.execute('x + y*10'), (None, 21))
+
+    def test_errors(self):
+        """
+        Errors are formatted and keep stored results.
+        """
+        with self.assertRaises(PyCalcBaseException):
+            self.session.execute('_ + 1')
+        self.session.execute('x = 2')
+        self.assertEqual(self.session.run_line('x / 0'),
+                         'ERROR: division by zero')
+        self.assertIn('ERROR:', self.session.run_line('x +'))
+        self.assertIsNone(self.session.run_line('  '))
+        self.assertRegex(self.session.run_line('x * 2'),
+                         r'^4  # \d+\.\d{3} ms$')
+
+    def test_run_repl(self):
+        """
+        Every line of standard input gets output line, blank lines are
+        skipped and there's no prompt for pipe.
+        """
+        output = StringIO()
+        with mock.patch('sys.stdin', StringIO('a = 6\n\na // 4\nb\n')), \
+                mock.patch('sys.stdout', output):
+            run_repl()
+        lines = output.getvalue().splitlines()
+        self.assertEqual([line.split('  #')[0] for line in lines],
+                         ['a = 6', '1', 'ERROR: Value of variable wasn\'t '
+                                        'provided: "b"'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,211 @@
+"""
+This module contains test cases for evaluation server from 'server.py'
+module and its client from 'client.py' module.
+"""
+import asyncio
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+import unittest.mock as mock
+import pycalc.tools.client as client
+from pycalc.tools.server import EvaluationServer
+from pycalc.tools.exceptions import PyCalcBaseException
+
+
+class TestServer(unittest.TestCase):
+    """
+    Collection of test cases for server and client working together. Server
+    runs in background thread with its own event loop.
+    """
+    def setUp(self):
+        """
+        Start server on socket in temporary directory.
+        """
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'pycalc.sock')
+        self.start(self.path)
+
+    def tearDown(self):
+        """
+        Remove temporary directory.
+        """
+        self.directory.cleanup()
+
+    def start(self, path, modules=None):
+        """
+        Run server in background thread until the end of test.
+        :param path: str(path to socket file).
+        :param modules: iterable with names of custom modules.
+        """
+        loop = asyncio.new_event_loop()
+        server = EvaluationServer(path, modules)
+        thread = threading.Thread(target=loop.run_until_complete,
+                                  args=(server.run(),))
+        thread.start()
+        while not os.path.exists(path):
+            time.sleep(0.001)
+
+        def stop():
+            loop.call_soon_threadsafe(server.stop)
+            thread.join()
+            loop.close()
+            self.assertFalse(os.path.exists(path))
+        self.addCleanup(stop)
+
+    def test_query(self):
+        """
+        Every expression gets its result or error in input order.
+        """
+        with client.connect(self.path) as sock:
+            results = list(client.query(sock, ['2+2*2', '1/0', 'sin(0)']))
+        self.assertEqual(results, ['6', 'ERROR: division by zero', '0.0'])
+
+    def test_exit(self):
+        """
+        Expressions exiting interpreter get error reply and don't stop
+        server for other clients.
+        """
+        with client.connect(self.path) as sock:
+            results = list(client.query(sock, ['exit(3)', 'quit()', '1+1']))
+        self.assertTrue(results[0].startswith('ERROR:'))
+        self.assertTrue(results[1].startswith('ERROR:'))
+        self.assertEqual(results[2], '2')
+        with client.connect(self.path) as sock:
+            self.assertEqual(list(client.query(sock, ['2*3'])), ['6'])
+
+    def test_pipelined(self):
+        """
+        Many expressions may be sent without waiting for replies.
+        """
+        expressions = ['{}*2'.format(indx) for indx in range(5000)]
+        with client.connect(self.path) as sock:
+            results = list(client.query(sock, expressions, window=2000))
+        self.assertEqual(results, [str(indx * 2) for indx in range(5000)])
+
+    def test_big_replies(self):
+        """
+        Replies as big as requests don't deadlock client and server filling
+        socket buffers of each other.
+        """
+        expression = '1+' * 2000 + '+'
+        with client.connect(self.path) as sock:
+            sock.settimeout(15)
+            results = list(client.query(sock, [expression] * 256))
+        self.assertEqual(len(results), 256)
+        self.assertTrue(all(result.startswith('ERROR:') and
+                            result.endswith(expression + '"')
+                            for result in results))
+
+    def test_slow_expression(self):
+        """
+        Slow expression of one client doesn't stop the others.
+        """
+        path = os.path.join(self.directory.name, 'time.sock')
+        self.start(path, ['time'])
+        slow = client.connect(path, modules=['time'])
+        self.addCleanup(slow.close)
+        slow.sendall(b'sleep(1)\n')
+        with client.connect(path, modules=['time']) as sock:
+            start = time.monotonic()
+            self.assertEqual(list(client.query(sock, ['1+1'])), ['2'])
+            self.assertLess(time.monotonic() - start, 0.5)
+        self.assertEqual(slow.makefile('rb').readline(), b'None\n')
+
+    def test_modules(self):
+        """
+        Client asking for other modules than server has is refused.
+        """
+        with self.assertRaises(PyCalcBaseException) as err:
+            client.connect(self.path, modules=['time'])
+        self.assertIn('other modules', err.exception.message)
+        path = os.path.join(self.directory.name, 'time.sock')
+        self.start(path, ['time'])
+        with self.assertRaises(PyCalcBaseException):
+            client.connect(path)
+        with client.connect(path, modules=['time']) as sock:
+            self.assertEqual(list(client.query(sock, ['sleep(0)'])),
+                             ['None'])
+
+    def test_concurrent_clients(self):
+        """
+        Clients are served concurrently and get their own results.
+        """
+        results = {}
+
+        def run(indx):
+            with client.connect(self.path) as sock:
+                results[indx] = list(client.query(
+                    sock, ['{}+{}'.format(indx, num) for num in range(100)],
+                    window=7))
+
+        threads = [threading.Thread(target=run, args=(indx,))
+                   for indx in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for indx in range(8):
+            self.assertEqual(results[indx],
+                             [str(indx + num) for num in range(100)])
+
+    def test_partial_lines(self):
+        """
+        Lines split between reads and unfinished last line are evaluated.
+        """
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.path)
+            sock.sendall(b'1+')
+            time.sleep(0.01)
+            sock.sendall(b'1\n2*')
+            sock.sendall(b'3')
+            sock.shutdown(socket.SHUT_WR)
+            replies = sock.makefile('rb').read()
+        self.assertEqual(replies, b'2\n6\n')
+
+    def test_already_running(self):
+        """
+        Second server can't use socket of running one.
+        """
+        with self.assertRaises(PyCalcBaseException) as err:
+            asyncio.run(EvaluationServer(self.path).start())
+        self.assertIn('already running', err.exception.message)
+
+
+class TestClient(unittest.TestCase):
+    """
+    Collection of test cases for client without server.
+    """
+    def test_not_running(self):
+        """
+        Missing server is reported without autostart.
+        """
+        with self.assertRaises(PyCalcBaseException) as err:
+            client.connect('/nonexistent/pycalc.sock')
+        self.assertIn('ERROR:', err.exception.message)
+
+    @mock.patch('pycalc.tools.client.start_server')
+    def test_autostart(self, mock_start):
+        """
+        Server is started once and client waits for it.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'pycalc.sock')
+            with self.assertRaises(PyCalcBaseException) as err:
+                client.connect(path, autostart=True, modules=['time'],
+                               timeout=0.05)
+        self.assertIn('didn\'t start', err.exception.message)
+        mock_start.assert_called_once_with(path, ['time'])
+
+    @mock.patch('pycalc.tools.client.subprocess.Popen')
+    def test_start_server(self, mock_popen):
+        """
+        Server process receives socket path and modules.
+        """
+        client.start_server('/tmp/pycalc.sock', ['time'])
+        command = mock_popen.call_args[0][0]
+        self.assertEqual(command[-4:], ['--serve', '/tmp/pycalc.sock',
+                                        '-m', 'time'])
+        self.assertTrue(mock_popen.call_args[1]['start_new_session'])
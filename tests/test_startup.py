@@ -0,0 +1,68 @@
+"""
+This module contains regression tests for start time of command line
+utility. Imports are measured with 'python -X importtime' in fresh
+interpreter, modules already imported by interpreter itself aren't counted.
+"""
+import os
+import subprocess
+import sys
+import unittest
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Total time of imports made by evaluation of single expression, seconds.
+IMPORT_BUDGET = 0.04
+# Modules which mustn't be imported when expression is passed without options.
+HEAVY_MODULES = ('argparse', 'string', 'importlib', 'threading',
+                 'pkg_resources', 'concurrent.futures', 'multiprocessing',
+                 'numpy', 'hashlib')
+
+
+def import_times(code):
+    """
+    Run code in fresh interpreter and collect its imports.
+    :param code: str(Python code).
+    :return: dict(<module name>: <self import time in seconds>).
+    """
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code],
+                            cwd=ROOT, env=env, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, universal_newlines=True,
+                            check=True)
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_time, _, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(self_time) / 1e6
+    return times
+
+
+class TestStartup(unittest.TestCase):
+    """
+    Collection of test cases for imports of command line utility.
+    """
+    def setUp(self):
+        """
+        Measure imports of plain call several times and take the best one.
+        """
+        baseline = import_times('pass')
+        runs = [import_times('from pycalc.main import main; main(["1+1"])')
+                for _ in range(3)]
+        self.imports = [{name: value for name, value in run.items()
+                         if name not in baseline} for run in runs]
+
+    def test_heavy_modules(self):
+        """
+        Plain expression doesn't import modules needed only for options.
+        """
+        for name in HEAVY_MODULES:
+            with self.subTest(name=name):
+                self.assertNotIn(name, self.imports[0])
+
+    def test_budget(self):
+        """
+        Imports fit in the budget.
+        """
+        spent = min(sum(run.values()) for run in self.imports)
+        self.assertLess(spent, IMPORT_BUDGET)
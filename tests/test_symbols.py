@@ -0,0 +1,63 @@
+"""
+This module contains test cases for shared symbol tables from 'symbols.py'
+module.
+"""
+import unittest
+import unittest.mock as mock
+from pycalc.tools.symbols import SymbolTable, symbol_table
+
+
+class TestSymbolTable(unittest.TestCase):
+    """
+    Collection of test cases for 'SymbolTable' class and 'symbol_table'
+    function.
+    """
+    @mock.patch('pycalc.tools.symbols.import_module')
+    def test_lazy_import(self, mock_import):
+        """
+        Next module is imported only if name wasn't found in modules imported
+        before, first module takes precedence.
+        """
+        libs = {'first': mock.Mock(foo=1, bar=2),
+                'second': mock.Mock(bar=3, baz=4),
+                'third': mock.Mock()}
+        mock_import.side_effect = lambda name: libs[name]
+        table = SymbolTable(['first', 'second', 'third'])
+        self.assertEqual(table['foo'], 1)
+        self.assertEqual(table.loaded, ('first',))
+        self.assertEqual(table['baz'], 4)
+        self.assertEqual(table['bar'], 2)
+        self.assertEqual(table.loaded, ('first', 'second'))
+        self.assertNotIn('spam', table)
+        self.assertEqual(table.loaded, ('first', 'second', 'third'))
+        self.assertEqual(mock_import.call_count, 3)
+
+    @mock.patch('pycalc.tools.symbols.import_module')
+    def test_load(self, mock_import):
+        """
+        All modules are imported at once and only once.
+        """
+        mock_import.side_effect = lambda name: mock.Mock(spec=[])
+        table = SymbolTable(['first', 'second'])
+        table.load()
+        table.load()
+        self.assertEqual(table.loaded, ('first', 'second'))
+        self.assertEqual(mock_import.call_count, 2)
+
+    def test_missing(self):
+        """
+        Missing names raise KeyError.
+        """
+        table = SymbolTable(['math', 'builtins'])
+        with self.assertRaises(KeyError):
+            table['spam']
+        self.assertIn('pi', table)
+
+    def test_shared(self):
+        """
+        The same list of modules gives the same table.
+        """
+        self.assertIs(symbol_table(['math', 'builtins']),
+                      symbol_table(('math', 'builtins')))
+        self.assertIsNot(symbol_table(['math', 'builtins']),
+                         symbol_table(['builtins', 'math']))
@@ -0,0 +1,48 @@
+"""
+This module contains test cases for 'tokenize' function from 'tokenizer.py'
+module.
+"""
+import unittest
+from pycalc.tools.tokenizer import tokenize, OPEN, CLOSE, OPERATOR, ATOM
+from pycalc.tools.settings import MATH_OPERATORS
+
+
+class TestTokenize(unittest.TestCase):
+    """
+    Collection of test cases for splitting of expressions into tokens.
+    """
+    def test_operators(self):
+        """
+        Every operator is recognized as a single token by longest match.
+        """
+        for op in MATH_OPERATORS:
+            with self.subTest(op=op):
+                self.assertEqual(tokenize('1{}2'.format(op)),
+                                 [(ATOM, '1', 0), (OPERATOR, op, 1),
+                                  (ATOM, '2', 1 + len(op))])
+
+    def test_brackets(self):
+        """
+        Brackets of all kinds are separate tokens.
+        """
+        self.assertEqual([token[0] for token in tokenize('([{1}])')],
+                         [OPEN, OPEN, OPEN, ATOM, CLOSE, CLOSE, CLOSE])
+
+    def test_atoms(self):
+        """
+        Atoms are stripped and may contain commas and spaces, empty atoms are
+        skipped.
+        """
+        self.assertEqual(tokenize(' pow( 2, 3 ) '),
+                         [(ATOM, 'pow', 1), (OPEN, '(', 4),
+                          (ATOM, '2, 3', 6), (CLOSE, ')', 11)])
+        self.assertEqual(tokenize('   '), [])
+
+    def test_positions(self):
+        """
+        Offsets of tokens point into original string.
+        """
+        expr = 'sin(x) ** 2 // 3'
+        for kind, text, start in tokenize(expr):
+            with self.subTest(text=text):
+                self.assertEqual(expr[start:start + len(text)], text)
@@ -4,21 +4,26 @@ Uses 'unittest' as tests' manager.
 """
 import unittest
 import pycalc.tools.utils as utils
+import pycalc.tools.settings as rules
 
 
 class TestUtils(unittest.TestCase):
     """
     Collection of test cases for 'utils.py' module's content.
     """
-    def test_sorting_function(self):
+    def test_precedes(self):
         """
-        Check that function outputs expected values during regular expression
-        comparison and comparison of expressions with raising to power.
+        Check that operator on the stack is applied first when it has higher
+        priority or equal priority and is left-associative. Power is
+        right-associative.
         """
-        inp = ([1, ('pow', 20)], [10, ('add', 10)])
-        res = (-21, -10)
+        add, mul = rules.MATH_MAP['+'], rules.MATH_MAP['*']
+        power, less = rules.MATH_MAP['**'], rules.MATH_MAP['<']
+        inp = ((mul, add), (add, mul), (add, add), (power, power),
+               (power, mul), (less, less), (less, add))
+        res = (True, False, True, False, True, True, False)
         counter = 0
         for case in inp:
             with self.subTest(case=case):
-                self.assertEqual(utils.sorting_function(case), res[counter])
+                self.assertEqual(utils.precedes(*case), res[counter])
                 counter += 1
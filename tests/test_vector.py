@@ -0,0 +1,89 @@
+"""
+This module contains test cases for vectorized backend from 'vector.py'
+module. Tests which need NumPy are skipped when it isn't installed.
+"""
+import math
+import sys
+import unittest
+import unittest.mock as mock
+import pycalc.tools.vector as vector
+from pycalc.tools.exceptions import PyCalcBaseException
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, 'NumPy is not installed')
+class TestVectorize(unittest.TestCase):
+    """
+    Collection of test cases for evaluation over arrays.
+    """
+    def test_results(self):
+        """
+        Vectorized results match scalar results for every element.
+        """
+        cases = ('sin(x)*y + 2', 'x^2 // 3 - y % 2', '2**-1 + log(x, 2)',
+                 'max(x, y, 1.5) + abs(-x) + round(y)', '(x < y) == 1',
+                 'sqrt(hypot(x, y)) / atan2(y, x)', 'sin(x)*sin(x) + y')
+        xs, ys = [0.5, 1.0, 2.5], [3.0, 0.25, 1.5]
+        for expression in cases:
+            with self.subTest(expression=expression):
+                vectorized = vector.vectorize(expression, ['x', 'y'])
+                result = vectorized.evaluate(x=numpy.array(xs),
+                                             y=numpy.array(ys))
+                for indx in range(len(xs)):
+                    scalar = eval(expression.replace('^', '**'),
+                                  vars(math), {'x': xs[indx], 'y': ys[indx]})
+                    self.assertAlmostEqual(float(result[indx]), scalar)
+
+    def test_broadcast(self):
+        """
+        Scalars and lists are accepted as values of variables.
+        """
+        vectorized = vector.vectorize('x*y', ['x', 'y'])
+        self.assertEqual(vectorized.parameters, ('x', 'y'))
+        self.assertEqual(list(vectorized.evaluate(x=[1, 2], y=3)), [3, 6])
+
+    def test_custom_ufunc(self):
+        """
+        Custom modules may provide NumPy ufuncs directly.
+        """
+        vectorized = vector.vectorize('sign(x)', ['x'], ['numpy'])
+        self.assertEqual(list(vectorized.evaluate(x=[-2, 0, 3])), [-1, 0, 1])
+
+    def test_deep_nesting(self):
+        """
+        Nesting deeper than recursion limit is converted and evaluated.
+        """
+        depth = sys.getrecursionlimit() * 3
+        expression = 'abs(' * depth + 'x-1' + ')' * depth
+        vectorized = vector.vectorize(expression, ['x'])
+        self.assertEqual(list(vectorized.evaluate(x=[-2, 3])), [3, 2])
+
+    def test_errors(self):
+        """
+        Functions without vectorized form and missing variables are reported.
+        """
+        with self.assertRaises(PyCalcBaseException) as err:
+            vector.vectorize('factorial(x)', ['x'])
+        self.assertIn('"factorial"', err.exception.message)
+        vectorized = vector.vectorize('x+y', ['x', 'y'])
+        with self.assertRaises(PyCalcBaseException) as err:
+            vectorized.evaluate(x=[1])
+        self.assertIn('"y"', err.exception.message)
+
+
+class TestOptionalNumpy(unittest.TestCase):
+    """
+    Check behaviour without NumPy installed.
+    """
+    def test_missing_numpy(self):
+        """
+        Clear error is raised when NumPy can't be imported.
+        """
+        with mock.patch.dict('sys.modules', {'numpy': None}):
+            with self.assertRaises(PyCalcBaseException) as err:
+                vector.vectorize('x', ['x'])
+        self.assertIn('NumPy', err.exception.message)